@@ -1,5 +1,7 @@
 # 전체곡 크롤러 패키지
 from .ky_crawler import crawl_and_save as crawl_kumyoung
+from .ky_crawler import refresh as refresh_kumyoung
 from .tj_crawler import crawl_and_save as crawl_taejin
+from .tj_crawler import refresh as refresh_taejin
 
-__all__ = ["crawl_kumyoung", "crawl_taejin"]
+__all__ = ["crawl_kumyoung", "crawl_taejin", "refresh_kumyoung", "refresh_taejin"]
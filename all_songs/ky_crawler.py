@@ -1,12 +1,28 @@
-import requests
 import datetime
 import os
 from bs4 import BeautifulSoup
 from dotenv import load_dotenv
+from utils import (
+    http_get,
+    is_replaying,
+    has_class,
+    compile_xpath,
+    parse_html,
+    select_text,
+    extract_with_fallback,
+)
 from all_songs.utils import (
     run_crawler,
+    fetch_html_async,
+    make_error_result,
+    make_no_result,
+    make_unrecognized_page_result,
     process_title_singer_for_supabase,
     get_numbers_to_crawl,
+    get_archived_numbers,
+    refresh_songs,
+    REFRESH_LIMIT,
+    discover_numbers_to_crawl,
 )
 
 # 환경 변수 로드
@@ -16,7 +32,9 @@ load_dotenv()
 START_NUMBER = 101
 END_NUMBER = 100000
 PROCESSES = 4  # 멀티프로세싱 프로세스 수
+CONCURRENCY = 100  # 비동기 엔진 동시 요청 상한 (실제 값은 호스트별로 자동 조절)
 KY_TABLE_NAME = "ky_songs"
+KY_POPULAR_TABLE_NAME = "ky_popular_songs"  # DB에 없으면 먼저 크롤링할 인기 차트
 OUTPUT_FILE = "ky_songs.xlsx"
 TIMEOUT = 10  # 요청 타임아웃(초)
 
@@ -44,78 +62,209 @@ BROWSER_HEADERS = {
     "Connection": "keep-alive",
 }
 
+# 검색 결과의 첫 행 외에 나머지 행도 함께 수집할지 여부
+HARVEST_ROWS = True
+
+# 검색 결과 셀렉터 (BeautifulSoup 대체 경로용 CSS와 미리 컴파일한 XPath)
+SONG_FIELD_SELECTORS = {
+    "number": ".search_chart_num",
+    "title": ".search_chart_tit .tit",
+    "singer": ".search_chart_sng",
+    "composer": ".search_chart_cmp",
+    "lyricist": ".search_chart_wrt",
+    "release_date": ".search_chart_rel",
+}
+SEARCH_RESULTS_XPATH = compile_xpath(f"//*[{has_class('search_chart_list')}]")
+SONG_FIELD_XPATHS = {
+    "number": compile_xpath(f".//*[{has_class('search_chart_num')}]"),
+    "title": compile_xpath(
+        f".//*[{has_class('search_chart_tit')}]//*[{has_class('tit')}]"
+    ),
+    "singer": compile_xpath(f".//*[{has_class('search_chart_sng')}]"),
+    "composer": compile_xpath(f".//*[{has_class('search_chart_cmp')}]"),
+    "lyricist": compile_xpath(f".//*[{has_class('search_chart_wrt')}]"),
+    "release_date": compile_xpath(f".//*[{has_class('search_chart_rel')}]"),
+}
+
+
+def get_song_url(song_number):
+    return f"https://kysing.kr/search/?category=1&keyword={song_number}"
+
+
+def _extract_song_rows_lxml(html):
+    search_results = SEARCH_RESULTS_XPATH(parse_html(html))
+    if not search_results:
+        return None
+
+    # [0]은 헤더이므로 다음 row부터 선택
+    return [
+        {
+            field: select_text(result_row, xpath)
+            for field, xpath in SONG_FIELD_XPATHS.items()
+        }
+        for result_row in search_results[1:]
+    ]
+
+
+def _extract_song_rows_bs4(html):
+    soup = BeautifulSoup(html, "lxml")
+    search_results = soup.select(".search_chart_list")
+    if not search_results:
+        return None
+
+    # [0]은 헤더이므로 다음 row부터 선택
+    rows = []
+    for result_row in search_results[1:]:
+        row = {}
+        for field, selector in SONG_FIELD_SELECTORS.items():
+            element = result_row.select_one(selector)
+            row[field] = element.text.strip() if element else None
+        rows.append(row)
+    return rows
+
+
+def extract_song_rows(html):
+    """
+    검색 결과 행별 원본 텍스트를 추출합니다. 결과가 없으면 빈 리스트,
+    검색 결과 영역(헤더 행)을 찾지 못한 페이지면 None.
+    """
+    return extract_with_fallback(_extract_song_rows_lxml, _extract_song_rows_bs4, html)
+
+
+def build_song_data(number, row):
+    # 요소가 없으면 "정보 없음" 처리
+    title = row["title"] or "정보 없음"
+    singer = row["singer"] or "정보 없음"
+    composer = row["composer"] or "정보 없음"
+    lyricist = row["lyricist"] or "정보 없음"
+    release_date = row["release_date"] or "정보 없음"
+
+    # 기본 데이터
+    data = {
+        "number": str(number),
+        "title": title,
+        "singer": singer,
+        "composer": composer,
+        "lyricist": lyricist,
+        "release_date": release_date,
+        "created_at": datetime.date.today().isoformat(),
+    }
+
+    # 다국어 변환 적용
+    processed_data = process_title_singer_for_supabase(title, singer)
+
+    # 결과 데이터 병합
+    data.update(
+        {
+            "title_pron": processed_data["title_pron"],
+            "title_chosung": processed_data["title_chosung"],
+            "singer_pron": processed_data["singer_pron"],
+            "singer_chosung": processed_data["singer_chosung"],
+        }
+    )
+
+    return data
+
+
+def parse_song_info(song_number, html):
+    rows = extract_song_rows(html)
+
+    # 차단/점검 페이지나 바뀐 구조는 빈 번호로 기록하지 않고 다시 시도한다
+    if rows is None:
+        return make_unrecognized_page_result(song_number)
+
+    # 검색 결과 영역은 있지만 결과 행이 없으면 검색 결과 없음
+    if not rows:
+        return make_no_result(song_number)
+
+    # 검색한 번호와 같은 행만 이 번호의 결과로 사용한다.
+    # 같은 번호가 없으면(1230, 1231만 나온 123 검색 등) 검색 결과 없음으로 처리
+    primary = next((row for row in rows if row["number"] == str(song_number)), None)
+    if primary is None:
+        data = make_no_result(song_number)
+    else:
+        data = build_song_data(song_number, primary)
+
+    # 같은 페이지의 다른 곡도 각자의 번호로 함께 수집 (번호를 확인할 수 있는 행만)
+    if HARVEST_ROWS:
+        harvested = [
+            build_song_data(row["number"], row)
+            for row in rows
+            if row["number"]
+            and row["number"].isdigit()
+            and row["number"] != str(song_number)
+        ]
+        if harvested:
+            data["harvested"] = harvested
+
+    return data
+
 
 def crawl_song_info(song_number):
-    url = f"https://kysing.kr/search/?category=1&keyword={song_number}"
+    url = get_song_url(song_number)
 
     try:
-        response = requests.get(url, headers=BROWSER_HEADERS, timeout=TIMEOUT)
+        response = http_get(url, headers=BROWSER_HEADERS, timeout=TIMEOUT)
         response.raise_for_status()
 
-        soup = BeautifulSoup(response.text, "lxml")
-        search_results = soup.select(".search_chart_list")
-
-        if len(search_results) < 2:
-            return {
-                "number": str(song_number),
-                "error": True,
-                "error_message": "검색 결과 없음",
-            }
-
-        result_row = search_results[1]  # [0]은 헤더이므로 다음 row 선택
-
-        # 직접 각 요소를 선택
-        title_el = result_row.select_one(".search_chart_tit .tit")
-        singer_el = result_row.select_one(".search_chart_sng")
-        composer_el = result_row.select_one(".search_chart_cmp")
-        lyricist_el = result_row.select_one(".search_chart_wrt")
-        release_date_el = result_row.select_one(".search_chart_rel")
-
-        # 요소가 없으면 "정보 없음" 처리
-        title = title_el.text.strip() if title_el else "정보 없음"
-        singer = singer_el.text.strip() if singer_el else "정보 없음"
-        composer = composer_el.text.strip() if composer_el else "정보 없음"
-        lyricist = lyricist_el.text.strip() if lyricist_el else "정보 없음"
-        release_date = release_date_el.text.strip() if release_date_el else "정보 없음"
-
-        # 기본 데이터
-        data = {
-            "number": str(song_number),
-            "title": title,
-            "singer": singer,
-            "composer": composer,
-            "lyricist": lyricist,
-            "release_date": release_date,
-            "created_at": datetime.date.today().isoformat(),
-        }
+        return parse_song_info(song_number, response.text)
+
+    except Exception as e:
+        return make_error_result(song_number, e)
 
-        # 다국어 변환 적용
-        processed_data = process_title_singer_for_supabase(title, singer)
-
-        # 결과 데이터 병합
-        data.update(
-            {
-                "title_pron": processed_data["title_pron"],
-                "title_chosung": processed_data["title_chosung"],
-                "singer_pron": processed_data["singer_pron"],
-                "singer_chosung": processed_data["singer_chosung"],
-            }
-        )
 
-        return data
+async def fetch_song_html_async(session, song_number):
+    return await fetch_html_async(
+        session,
+        get_song_url(song_number),
+        headers=BROWSER_HEADERS,
+        timeout=TIMEOUT,
+    )
+
+
+async def crawl_song_info_async(session, song_number):
+    try:
+        html = await fetch_song_html_async(session, song_number)
+
+        return parse_song_info(song_number, html)
 
     except Exception as e:
-        return {"number": str(song_number), "error": True, "error_message": str(e)}
+        return make_error_result(song_number, e)
+
 
+def crawl_and_save(concurrency=None, full_scan=False, **crawl_options):
+    # 탐색 중 이미 크롤링한 곡 (다시 요청하지 않고 함께 저장/업로드)
+    probed_results = []
+    shard_queue = crawl_options.get("shard_queue")
 
-def crawl_and_save():
-    # 크롤링할 번호 목록 가져오기
-    numbers_to_crawl = get_numbers_to_crawl(KY_TABLE_NAME, START_NUMBER, END_NUMBER)
+    # 크롤링할 번호 목록 가져오기 (재생 모드에서는 아카이브에 있는 번호)
+    if is_replaying():
+        numbers_to_crawl = get_archived_numbers(get_song_url, START_NUMBER, END_NUMBER)
+    elif shard_queue is not None and not shard_queue.acquire_plan(KY_TABLE_NAME):
+        # 다른 노드가 탐색해 올린 샤드만 나눠 크롤링
+        numbers_to_crawl = []
+    elif full_scan:
+        numbers_to_crawl = get_numbers_to_crawl(
+            KY_TABLE_NAME, START_NUMBER, END_NUMBER, KY_POPULAR_TABLE_NAME
+        )
+    else:
+        # 빈 구간이 많으므로 탐색으로 곡이 있는 구간만 크롤링
+        numbers_to_crawl = discover_numbers_to_crawl(
+            KY_TABLE_NAME,
+            START_NUMBER,
+            END_NUMBER,
+            crawl_song_info,
+            popular_table=KY_POPULAR_TABLE_NAME,
+            crawl_budget=crawl_options.get("crawl_budget"),
+            found_results=probed_results,
+        )
 
     if numbers_to_crawl is None:
+        if shard_queue is not None:
+            shard_queue.abandon_plan(KY_TABLE_NAME)
         return False
 
-    if len(numbers_to_crawl) == 0:
+    if len(numbers_to_crawl) == 0 and not probed_results and shard_queue is None:
         return True
 
     # 크롤링 실행
@@ -127,6 +276,30 @@ def crawl_and_save():
         data_fields=DATA_FIELDS,
         service_name="금영 노래방",
         custom_numbers=numbers_to_crawl,
+        async_crawler_func=crawl_song_info_async,
+        async_fetch_func=fetch_song_html_async,
+        parse_func=parse_song_info,
+        concurrency=concurrency or CONCURRENCY,
+        prefetched_results=probed_results,
+        **crawl_options,
+    )
+
+
+def refresh(limit=None, concurrency=None, **crawl_options):
+    # 기존 곡을 오래전에 확인한 순서대로 다시 크롤링해 바뀐 행만 업서트
+    return refresh_songs(
+        KY_TABLE_NAME,
+        DATA_FIELDS,
+        limit or REFRESH_LIMIT,
+        crawler_func=crawl_song_info,
+        processes=PROCESSES,
+        output_file=OUTPUT_FILE,
+        service_name="금영 노래방",
+        async_crawler_func=crawl_song_info_async,
+        async_fetch_func=fetch_song_html_async,
+        parse_func=parse_song_info,
+        concurrency=concurrency or CONCURRENCY,
+        **crawl_options,
     )
 
 
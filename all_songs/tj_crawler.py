@@ -1,12 +1,27 @@
-import requests
 import datetime
 import os
 from bs4 import BeautifulSoup
 from dotenv import load_dotenv
+from utils import (
+    http_get,
+    is_replaying,
+    has_class,
+    compile_xpath,
+    parse_html,
+    select_text,
+    extract_with_fallback,
+)
 from all_songs.utils import (
     run_crawler,
+    fetch_html_async,
+    make_error_result,
+    make_no_result,
+    make_unrecognized_page_result,
     process_title_singer_for_supabase,
     get_numbers_to_crawl,
+    get_archived_numbers,
+    refresh_songs,
+    REFRESH_LIMIT,
 )
 
 # 환경 변수 로드
@@ -16,7 +31,9 @@ load_dotenv()
 START_NUMBER = 1
 END_NUMBER = 100
 PROCESSES = 4  # 멀티프로세싱 프로세스 수
+CONCURRENCY = 100  # 비동기 엔진 동시 요청 상한 (실제 값은 호스트별로 자동 조절)
 TJ_TABLE_NAME = "tj_songs"
+TJ_POPULAR_TABLE_NAME = "tj_popular_songs"  # DB에 없으면 먼저 크롤링할 인기 차트
 OUTPUT_FILE = "tj_songs.xlsx"
 TIMEOUT = 10  # 요청 타임아웃(초)
 
@@ -41,89 +58,202 @@ BROWSER_HEADERS = {
     "Connection": "keep-alive",
 }
 
+# 검색 결과의 첫 번째 결과 외에 나머지 결과도 함께 수집할지 여부
+HARVEST_ROWS = True
+PAGE_ROW_COUNT = 100  # 검색 한 번에 받을 결과 수
+
+# 검색 결과 셀렉터 (BeautifulSoup 대체 경로용 CSS와 미리 컴파일한 XPath)
+SONG_FIELD_SELECTORS = {
+    "number": ".grid-item .num2 .highlight",  # 노래 번호
+    "title": ".grid-item.title3 .flex-box p:last-child span",  # 노래 제목
+    "singer": ".grid-item.title4.singer p span",  # 가수 이름
+}
+SONG_LIST_XPATH = compile_xpath(f"//ul[{has_class('chart-list-area')}]/li")
+SONG_FIELD_XPATHS = {
+    "number": compile_xpath(
+        f".//*[{has_class('grid-item')}]//*[{has_class('num2')}]"
+        f"//*[{has_class('highlight')}]"
+    ),
+    "title": compile_xpath(
+        f".//*[{has_class('grid-item', 'title3')}]//*[{has_class('flex-box')}]"
+        "//p[not(following-sibling::*)]//span"
+    ),
+    "singer": compile_xpath(
+        f".//*[{has_class('grid-item', 'title4', 'singer')}]//p//span"
+    ),
+}
+
+
+def get_song_url(song_number):
+    return f"https://www.tjmedia.com/song/accompaniment_search?pageNo=1&pageRowCnt={PAGE_ROW_COUNT}&strSotrGubun=ASC&strSortType=pro&nationType=&strType=16&searchTxt={song_number}"
+
+
+def _extract_song_rows_lxml(html):
+    song_list = SONG_LIST_XPATH(parse_html(html))
+    if not song_list:
+        return None
+
+    # 첫 번째 li를 제외한 나머지 li 선택 (첫 번째는 헤더)
+    return [
+        {field: select_text(song, xpath) for field, xpath in SONG_FIELD_XPATHS.items()}
+        for song in song_list[1:]
+    ]
+
+
+def _extract_song_rows_bs4(html):
+    soup = BeautifulSoup(html, "lxml")
+
+    # 새로운 HTML 구조에 맞춰 셀렉터 수정
+    # 첫 번째 li를 제외한 나머지 li 선택 (첫 번째는 헤더)
+    song_list = soup.select("ul.chart-list-area > li")
+    if not song_list:
+        return None
+
+    rows = []
+    for song in song_list[1:]:
+        row = {}
+        for field, selector in SONG_FIELD_SELECTORS.items():
+            element = song.select_one(selector)
+            row[field] = element.text.strip() if element else None
+        rows.append(row)
+    return rows
+
+
+def extract_song_rows(html):
+    """
+    검색 결과 행별 원본 텍스트를 추출합니다. 결과가 없으면 빈 리스트,
+    검색 결과 영역(헤더 행)을 찾지 못한 페이지면 None.
+    """
+    return extract_with_fallback(_extract_song_rows_lxml, _extract_song_rows_bs4, html)
+
+
+def build_song_data(row):
+    number = row["number"]
+    title = row["title"]
+    singer = row["singer"]
+    created_at = datetime.date.today().isoformat()
+
+    # 기본 데이터
+    data = {
+        "number": number,
+        "title": title,
+        "singer": singer,
+        "created_at": created_at,
+    }
+
+    # 다국어 변환 적용
+    processed_data = process_title_singer_for_supabase(title, singer)
+
+    # 결과 데이터 병합
+    data.update(
+        {
+            "title_pron": processed_data["title_pron"],
+            "title_chosung": processed_data["title_chosung"],
+            "singer_pron": processed_data["singer_pron"],
+            "singer_chosung": processed_data["singer_chosung"],
+        }
+    )
+
+    return data
+
+
+def _is_complete_row(row):
+    return bool(row["number"] and row["title"] and row["singer"])
+
+
+def parse_song_info(song_number, html):
+    rows = extract_song_rows(html)
+
+    # 차단/점검 페이지나 바뀐 구조는 빈 번호로 기록하지 않고 다시 시도한다
+    if rows is None:
+        return make_unrecognized_page_result(song_number)
+
+    # 검색 결과 영역은 있지만 결과 행이 없으면 검색 결과 없음
+    if not rows:
+        return make_no_result(song_number)
+
+    # 검색한 번호와 같은 결과만 이 번호의 결과로 사용한다.
+    # 같은 번호가 없으면(1230, 1231만 나온 123 검색 등) 검색 결과 없음으로 처리
+    primary = next((row for row in rows if row["number"] == str(song_number)), None)
+
+    if primary is None:
+        data = make_no_result(song_number)
+    elif not _is_complete_row(primary):
+        return {
+            "number": str(song_number),
+            "error": True,
+            "error_message": "검색 결과 요소 찾기 실패",
+        }
+    else:
+        data = build_song_data(primary)
+
+    # 같은 페이지의 다른 곡도 각자의 번호로 함께 수집 (요소를 모두 찾은 행만)
+    if HARVEST_ROWS:
+        harvested = [
+            build_song_data(row)
+            for row in rows
+            if _is_complete_row(row) and row["number"] != str(song_number)
+        ]
+        if harvested:
+            data["harvested"] = harvested
+
+    return data
+
 
 def crawl_song_info(song_number):
-    url = f"https://www.tjmedia.com/song/accompaniment_search?pageNo=1&pageRowCnt=15&strSotrGubun=ASC&strSortType=pro&nationType=&strType=16&searchTxt={song_number}"
+    url = get_song_url(song_number)
 
     try:
-        response = requests.get(url, headers=BROWSER_HEADERS, timeout=TIMEOUT)
+        response = http_get(url, headers=BROWSER_HEADERS, timeout=TIMEOUT)
         response.raise_for_status()
 
         html = response.content.decode("utf-8", "replace")
-        soup = BeautifulSoup(html, "lxml")
-
-        # 새로운 HTML 구조에 맞춰 셀렉터 수정
-        # 첫 번째 li를 제외한 나머지 li 선택 (첫 번째는 헤더)
-        song_list = soup.select("ul.chart-list-area > li:not(:first-child)")
+        return parse_song_info(song_number, html)
 
-        if not song_list:
-            return {
-                "number": str(song_number),
-                "error": True,
-                "error_message": "검색 결과 없음",
-            }
-
-        # 첫 번째 결과를 가져옴
-        first_song = song_list[0]
+    except Exception as e:
+        return make_error_result(song_number, e)
 
-        # 노래 번호
-        song_number_el = first_song.select_one(".grid-item .num2 .highlight")
 
-        # 노래 제목
-        song_title_el = first_song.select_one(
-            ".grid-item.title3 .flex-box p:last-child span"
-        )
+async def fetch_song_html_async(session, song_number):
+    return await fetch_html_async(
+        session,
+        get_song_url(song_number),
+        headers=BROWSER_HEADERS,
+        timeout=TIMEOUT,
+        encoding="utf-8",
+    )
 
-        # 가수 이름
-        singer_name_el = first_song.select_one(".grid-item.title4.singer p span")
-
-        if not song_number_el or not song_title_el or not singer_name_el:
-            return {
-                "number": str(song_number),
-                "error": True,
-                "error_message": "검색 결과 요소 찾기 실패",
-            }
-
-        number = song_number_el.text.strip() if song_number_el else "정보 없음"
-        title = song_title_el.text.strip() if song_title_el else "정보 없음"
-        singer = singer_name_el.text.strip() if singer_name_el else "정보 없음"
-        created_at = datetime.date.today().isoformat()
-
-        # 기본 데이터
-        data = {
-            "number": number,
-            "title": title,
-            "singer": singer,
-            "created_at": created_at,
-        }
 
-        # 다국어 변환 적용
-        processed_data = process_title_singer_for_supabase(title, singer)
-
-        # 결과 데이터 병합
-        data.update(
-            {
-                "title_pron": processed_data["title_pron"],
-                "title_chosung": processed_data["title_chosung"],
-                "singer_pron": processed_data["singer_pron"],
-                "singer_chosung": processed_data["singer_chosung"],
-            }
-        )
+async def crawl_song_info_async(session, song_number):
+    try:
+        html = await fetch_song_html_async(session, song_number)
 
-        return data
+        return parse_song_info(song_number, html)
 
     except Exception as e:
-        return {"number": str(song_number), "error": True, "error_message": str(e)}
+        return make_error_result(song_number, e)
 
 
-def crawl_and_save():
-    # 크롤링할 번호 목록 가져오기
-    numbers_to_crawl = get_numbers_to_crawl(TJ_TABLE_NAME, START_NUMBER, END_NUMBER)
+def crawl_and_save(concurrency=None, **crawl_options):
+    shard_queue = crawl_options.get("shard_queue")
+
+    # 크롤링할 번호 목록 가져오기 (재생 모드에서는 아카이브에 있는 번호)
+    if is_replaying():
+        numbers_to_crawl = get_archived_numbers(get_song_url, START_NUMBER, END_NUMBER)
+    elif shard_queue is not None and not shard_queue.acquire_plan(TJ_TABLE_NAME):
+        # 다른 노드가 계획해 올린 샤드만 나눠 크롤링
+        numbers_to_crawl = []
+    else:
+        numbers_to_crawl = get_numbers_to_crawl(
+            TJ_TABLE_NAME, START_NUMBER, END_NUMBER, TJ_POPULAR_TABLE_NAME
+        )
 
     if numbers_to_crawl is None:
+        if shard_queue is not None:
+            shard_queue.abandon_plan(TJ_TABLE_NAME)
         return False
 
-    if len(numbers_to_crawl) == 0:
+    if len(numbers_to_crawl) == 0 and shard_queue is None:
         return True
 
     # 크롤링 실행
@@ -135,6 +265,29 @@ def crawl_and_save():
         data_fields=DATA_FIELDS,
         service_name="태진 노래방",
         custom_numbers=numbers_to_crawl,
+        async_crawler_func=crawl_song_info_async,
+        async_fetch_func=fetch_song_html_async,
+        parse_func=parse_song_info,
+        concurrency=concurrency or CONCURRENCY,
+        **crawl_options,
+    )
+
+
+def refresh(limit=None, concurrency=None, **crawl_options):
+    # 기존 곡을 오래전에 확인한 순서대로 다시 크롤링해 바뀐 행만 업서트
+    return refresh_songs(
+        TJ_TABLE_NAME,
+        DATA_FIELDS,
+        limit or REFRESH_LIMIT,
+        crawler_func=crawl_song_info,
+        processes=PROCESSES,
+        output_file=OUTPUT_FILE,
+        service_name="태진 노래방",
+        async_crawler_func=crawl_song_info_async,
+        async_fetch_func=fetch_song_html_async,
+        parse_func=parse_song_info,
+        concurrency=concurrency or CONCURRENCY,
+        **crawl_options,
     )
 
 
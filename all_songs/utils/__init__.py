@@ -1,17 +1,58 @@
 # 전체곡 크롤러 유틸리티 패키지
 
 # 결과 처리 유틸리티
-from .result_utils import process_results, print_failed_results
+from .result_utils import (
+    process_results,
+    print_failed_results,
+    get_failure,
+    is_transient_error,
+    make_error_result,
+    make_no_result,
+    make_unrecognized_page_result,
+    is_no_result,
+    expand_harvested,
+)
 
 # 프로세싱 유틸리티
-from .process_utils import crawl_with_multiprocessing
+from .process_utils import crawl_with_multiprocessing, stream_with_multiprocessing
+from .async_utils import crawl_with_asyncio, stream_with_asyncio, fetch_html_async
+from .pipeline_utils import stream_with_pipeline
 
 # 데이터 저장 및 업로드 유틸리티
-from .data_utils import save_and_upload_results
+from .data_utils import save_and_upload_results, UploadBuffer
 
 # DB 유틸리티
 from .db_utils import get_numbers_to_crawl
 
+# 번호 계획 유틸리티
+from .planner_utils import NumberPlanner, ChunkedNumbers
+
+# 크롤링 우선순위 유틸리티
+from .priority_utils import take_prioritized
+
+# 번호 탐색 유틸리티
+from .discovery_utils import discover_numbers_to_crawl
+
+# 네거티브 캐시 유틸리티
+from .negative_cache_utils import NegativeCache
+
+# 크롤링 예산 유틸리티
+from .budget_utils import CrawlBudget
+
+# 샤드 작업 큐 유틸리티
+from .shard_utils import (
+    ShardQueue,
+    SQLiteShardBackend,
+    SupabaseShardBackend,
+    open_shard_backend,
+)
+
+# 기존 곡 변경 감지 유틸리티
+from .refresh_utils import refresh_songs, REFRESH_LIMIT
+
+# 아카이브 재생 유틸리티
+from .replay_utils import get_archived_numbers
+
 # 텍스트 처리 유틸리티
 from .text_normalizers import extract_korean_chosung, normalize_english
 from .japanese_utils import (
@@ -32,8 +73,21 @@ from .main_utils import run_crawler
 __all__ = [
     "process_results",
     "print_failed_results",
+    "get_failure",
+    "is_transient_error",
+    "make_error_result",
+    "make_no_result",
+    "make_unrecognized_page_result",
+    "is_no_result",
+    "expand_harvested",
     "crawl_with_multiprocessing",
+    "stream_with_multiprocessing",
+    "crawl_with_asyncio",
+    "stream_with_asyncio",
+    "fetch_html_async",
+    "stream_with_pipeline",
     "save_and_upload_results",
+    "UploadBuffer",
     "run_crawler",
     "extract_korean_chosung",
     "normalize_english",
@@ -44,4 +98,17 @@ __all__ = [
     "convert_mixed_text_with_info",
     "process_title_singer_for_supabase",
     "get_numbers_to_crawl",
+    "get_archived_numbers",
+    "NegativeCache",
+    "discover_numbers_to_crawl",
+    "NumberPlanner",
+    "ChunkedNumbers",
+    "take_prioritized",
+    "CrawlBudget",
+    "ShardQueue",
+    "SQLiteShardBackend",
+    "SupabaseShardBackend",
+    "open_shard_backend",
+    "refresh_songs",
+    "REFRESH_LIMIT",
 ]
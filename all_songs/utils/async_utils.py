@@ -0,0 +1,192 @@
+"""
+asyncio/aiohttp 기반 비동기 크롤링 유틸리티 함수
+"""
+
+import time
+import asyncio
+import aiohttp
+from utils import (
+    record_transport_stats,
+    get_host_controller,
+    check_cache,
+    update_cache,
+    get_replayed_response,
+    record_response,
+)
+from utils.http_cache import get_conditional_headers
+from utils.rate_limit import parse_retry_after
+
+DEFAULT_CONCURRENCY = 100  # 기본 동시 요청 수
+
+
+async def fetch_html_async(session, url, headers=None, timeout=10, encoding=None):
+    """
+    aiohttp 세션으로 페이지를 요청하고 HTML 문자열을 반환합니다.
+    호스트 컨트롤러가 허용하는 만큼만 동시에 요청합니다.
+
+    Args:
+        session (aiohttp.ClientSession): 요청에 사용할 세션
+        url (str): 요청할 URL
+        headers (dict): 요청 헤더
+        timeout (int): 요청 타임아웃(초)
+        encoding (str): 본문 디코딩 인코딩. None이면 응답 헤더를 따름
+
+    Returns:
+        str: 응답 HTML 문자열
+    """
+    replayed_response = get_replayed_response(url)
+    if replayed_response is not None:
+        replayed_response.raise_for_status()
+        return replayed_response.content.decode(
+            encoding or replayed_response.encoding, "replace"
+        )
+
+    cached_response, entry = check_cache(url)
+    if cached_response is not None:
+        return cached_response.content.decode(
+            encoding or cached_response.encoding, "replace"
+        )
+
+    if entry is not None:
+        headers = {**(headers or {}), **get_conditional_headers(entry)}
+
+    controller = get_host_controller(url)
+    await controller.acquire_async()
+    started = time.monotonic()
+    client_timeout = aiohttp.ClientTimeout(total=timeout)
+
+    released = False
+    try:
+        async with session.get(
+            url, headers=headers, timeout=client_timeout
+        ) as response:
+            body = await response.read()
+            controller.release(
+                time.monotonic() - started,
+                status_code=response.status,
+                retry_after=parse_retry_after(response.headers.get("Retry-After")),
+            )
+            released = True
+            body_encoding = encoding or response.get_encoding()
+    finally:
+        # 취소되거나 예상하지 못한 오류로 빠져나가도 슬롯은 반드시 반납한다
+        if not released:
+            controller.release(time.monotonic() - started, failed=True)
+
+    record_response(url, response.status, response.headers, body)
+    revalidated = update_cache(url, entry, response.status, body, response.headers)
+    if revalidated is not None:
+        return revalidated.content.decode(encoding or revalidated.encoding, "replace")
+
+    response.raise_for_status()
+    return body.decode(body_encoding, "replace")
+
+
+def _create_stats_trace_config():
+    """
+    요청 수와 새 연결 수를 전송 통계에 기록하는 aiohttp 트레이스 설정을 만듭니다.
+
+    Returns:
+        aiohttp.TraceConfig: 통계 기록용 트레이스 설정
+    """
+
+    async def on_request_start(session, context, params):
+        record_transport_stats(request_count=1)
+
+    async def on_connection_create_end(session, context, params):
+        record_transport_stats(connection_count=1)
+
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_request_start.append(on_request_start)
+    trace_config.on_connection_create_end.append(on_connection_create_end)
+    return trace_config
+
+
+async def _crawl_all(crawler_func, numbers, concurrency, on_result, skip_numbers):
+    """
+    고정 개수의 워커 태스크로 번호 목록을 비동기 크롤링합니다.
+
+    Args:
+        crawler_func (coroutine function): (session, number)를 받는 비동기 크롤링 함수
+        numbers (list or range): 크롤링할 번호 목록
+        concurrency (int): 동시에 진행할 최대 요청 수
+        on_result (function): 결과 하나를 받아 처리하는 함수
+        skip_numbers (set): 요청 직전에 확인해 건너뛸 번호(문자열) 세트
+    """
+    total = len(numbers)
+    number_iter = iter(numbers)
+    completed = 0
+
+    # 커넥터 제한으로 동시 연결 수도 함께 묶어둔다
+    connector = aiohttp.TCPConnector(limit=concurrency, limit_per_host=concurrency)
+
+    async with aiohttp.ClientSession(
+        connector=connector, trace_configs=[_create_stats_trace_config()]
+    ) as session:
+
+        async def worker():
+            nonlocal completed
+
+            # 이터레이터를 공유하므로 번호마다 태스크를 만들지 않는다
+            for number in number_iter:
+                # 다른 검색 결과에서 이미 수집한 번호는 요청하지 않는다
+                if str(number) in skip_numbers:
+                    continue
+                on_result(await crawler_func(session, number))
+                completed += 1
+                if completed % 1000 == 0:
+                    print(f"크롤링 진행 중: {completed}/{total} 완료")
+
+        workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+        await asyncio.gather(*workers)
+
+
+def crawl_with_asyncio(crawler_func, numbers, concurrency=DEFAULT_CONCURRENCY):
+    """
+    asyncio로 크롤링을 실행합니다.
+
+    Args:
+        crawler_func (coroutine function): (session, number)를 받는 비동기 크롤링 함수
+        numbers (list or range): 크롤링할 번호 목록
+        concurrency (int): 동시에 진행할 최대 요청 수
+
+    Returns:
+        list: 크롤링 결과 리스트 또는 None (오류 발생 시)
+    """
+    results = []
+    if not stream_with_asyncio(crawler_func, numbers, concurrency, results.append):
+        return None
+    return results
+
+
+def stream_with_asyncio(
+    crawler_func,
+    numbers,
+    concurrency=DEFAULT_CONCURRENCY,
+    on_result=None,
+    skip_numbers=frozenset(),
+):
+    """
+    asyncio로 크롤링하면서 완료되는 순서대로 결과를 전달합니다.
+
+    Args:
+        crawler_func (coroutine function): (session, number)를 받는 비동기 크롤링 함수
+        numbers (list or range): 크롤링할 번호 목록
+        concurrency (int): 동시에 진행할 최대 요청 수. 실제 동시 요청 수는
+            호스트 컨트롤러가 응답 상태에 따라 이 값 안에서 조절
+        on_result (function): 결과 하나를 받아 처리하는 함수
+        skip_numbers (set): 요청 직전에 확인해 건너뛸 번호(문자열) 세트.
+            크롤링 중에 채워지는 세트를 넘기면 그 번호는 더 요청하지 않음
+
+    Returns:
+        bool: 크롤링 완료 여부
+    """
+    try:
+        concurrency = max(1, min(concurrency, len(numbers)))
+        asyncio.run(
+            _crawl_all(crawler_func, numbers, concurrency, on_result, skip_numbers)
+        )
+        return True
+    except Exception as e:
+        print(f"크롤링 중 오류 발생: {str(e)}")
+        return False
@@ -0,0 +1,187 @@
+"""
+크롤링 시간/요청 예산 관련 유틸리티 함수
+
+정해진 시각(마감)이나 요청 수 안에서만 크롤링하도록 번호를 내주는 것을 멈춥니다.
+관측한 처리량으로 남은 요청을 마치는 데 걸릴 시간과 결과를 업로드할 시간을 남겨 두고
+멈추므로, 예약 작업 시간이 끝나 중간에 강제 종료되는 대신 받은 결과를 업로드하고
+끝납니다. 번호는 우선순위 순서로 내주므로 예산 안에서는 가치가 큰 번호부터 크롤링됩니다.
+"""
+
+import time
+import threading
+
+UPLOAD_ROWS_PER_SECOND = 100  # 업로드 시간 추정에 사용할 초당 업로드 행 수
+MIN_RESERVE_SECONDS = 10  # 마감 전에 항상 남겨 둘 시간(초)
+ESTIMATE_AFTER_SECONDS = 30  # 처리량 추정치를 출력할 시점(크롤링 시작 후 초)
+MIN_SAMPLES = 20  # 처리량으로 남은 요청 시간을 추정하기 전에 필요한 완료 수
+
+
+class CrawlBudget:
+    """
+    여러 번의 run_crawler 실행이 함께 쓰는 마감 시각과 요청 예산.
+
+    Args:
+        deadline (float, optional): 크롤링을 끝내야 하는 시각 (time.time() 기준)
+        max_requests (int, optional): 요청할 수 있는 최대 번호 수 (재시도 포함)
+    """
+
+    def __init__(self, deadline=None, max_requests=None):
+        self.deadline = deadline
+        self.max_requests = max_requests
+        self.issued = 0
+        self.stopped_reason = None
+        self.lock = threading.RLock()
+        self.start_run()
+
+    def start_run(self, flush_size=None, concurrency=1):
+        """
+        run_crawler 실행 하나의 처리량 측정을 시작합니다.
+
+        Args:
+            flush_size (int, optional): 스트리밍 모드의 업로드 단위.
+                None이면 모든 결과를 마지막에 한 번에 업로드하는 것으로 보고 시간을 남김
+            concurrency (int): 동시에 진행하는 최대 요청 수
+        """
+        self.run_started = time.time()
+        self.run_issued = 0
+        self.run_completed = 0
+        self.run_rows = 0
+        self.flush_size = flush_size
+        self.concurrency = concurrency
+        self.estimated = False
+
+    def record(self, result):
+        """
+        완료된 결과 하나를 처리량과 업로드할 행 수에 반영합니다.
+
+        Args:
+            result (dict): 크롤링 결과
+        """
+        with self.lock:
+            self.run_completed += 1
+            if not result.get("error", False):
+                self.run_rows += 1
+
+    def _throughput(self):
+        elapsed = time.time() - self.run_started
+        return self.run_completed / elapsed if elapsed > 0 else 0.0
+
+    def _reserve_seconds(self, throughput):
+        # 진행 중인 요청을 마칠 시간 + 남은 결과를 업로드할 시간
+        # (엔진이 번호를 미리 가져가도 동시에 진행하는 요청은 동시 요청 수까지)
+        in_flight = min(self.run_issued - self.run_completed, self.concurrency)
+        drain = 0.0
+        if self.run_completed >= MIN_SAMPLES and throughput > 0:
+            drain = in_flight / throughput
+        upload_rows = self.run_rows if self.flush_size is None else self.flush_size
+        return MIN_RESERVE_SECONDS + drain + upload_rows / UPLOAD_ROWS_PER_SECOND
+
+    def exhausted(self):
+        """
+        새 번호를 더 내주면 안 되는지 확인합니다.
+
+        Returns:
+            bool: 예산을 다 썼으면 True
+        """
+        with self.lock:
+            if self.stopped_reason:
+                return True
+
+            if self.max_requests is not None and self.issued >= self.max_requests:
+                self.stopped_reason = f"요청 예산 {self.max_requests}건 소진"
+            elif self.deadline is not None:
+                throughput = self._throughput()
+                remaining = self.deadline - time.time()
+                reserve = self._reserve_seconds(throughput)
+                self._print_estimate(throughput, remaining - reserve)
+                if remaining <= reserve:
+                    self.stopped_reason = (
+                        f"마감까지 {max(0, remaining):.0f}초 남음 "
+                        f"(업로드 등에 {reserve:.0f}초 필요)"
+                    )
+            return self.stopped_reason is not None
+
+    def _print_estimate(self, throughput, usable_seconds):
+        if self.estimated or time.time() - self.run_started < ESTIMATE_AFTER_SECONDS:
+            return
+        self.estimated = True
+        print(
+            f"관측 처리량: 초당 {throughput:.1f}개, "
+            f"마감 전까지 약 {int(max(0, usable_seconds) * throughput)}개 더 크롤링 가능"
+        )
+
+    def take(self):
+        """
+        요청 하나를 예산에 반영합니다. 예산을 다 썼으면 반영하지 않습니다.
+
+        Returns:
+            bool: 요청해도 되면 True
+        """
+        with self.lock:
+            if self.exhausted():
+                return False
+            self.issued += 1
+            self.run_issued += 1
+            return True
+
+    def iter_numbers(self, numbers):
+        """
+        예산이 남아 있는 동안만 번호를 내줍니다.
+
+        Args:
+            numbers (iterable): 크롤링할 번호 목록
+
+        Yields:
+            int: 번호
+        """
+        for number in numbers:
+            if not self.take():
+                return
+            yield number
+
+
+class BudgetedNumbers:
+    """
+    크롤링 엔진에 넘길 번호 목록. len은 원래 목록 크기를 유지하고,
+    반복할 때는 예산이 남아 있는 동안만 번호를 내줍니다.
+
+    Args:
+        numbers (list or ChunkedNumbers): 크롤링할 번호 목록
+        budget (CrawlBudget): 크롤링 예산
+    """
+
+    def __init__(self, numbers, budget):
+        self.numbers = numbers
+        self.budget = budget
+
+    def __len__(self):
+        return len(self.numbers)
+
+    def __iter__(self):
+        return self.budget.iter_numbers(self.numbers)
+
+
+def summarize_numbers(numbers, limit=5):
+    """
+    번호 목록을 "시작-끝" 연속 구간 문자열로 줄여 앞쪽 몇 개만 보여 줍니다.
+
+    Args:
+        numbers (list): 번호 목록
+        limit (int): 보여 줄 구간 수
+
+    Returns:
+        str: 구간 요약 문자열
+    """
+    runs = []
+    for number in sorted(numbers):
+        if runs and number == runs[-1][1] + 1:
+            runs[-1][1] = number
+        else:
+            runs.append([number, number])
+
+    text = ", ".join(
+        f"{start}-{end}" if start != end else str(start) for start, end in runs[:limit]
+    )
+    if len(runs) > limit:
+        text += f" 외 {len(runs) - limit}개 구간"
+    return text
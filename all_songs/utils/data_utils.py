@@ -6,14 +6,49 @@ from utils import (
     save_to_excel,
     upload_to_supabase,
     filter_data_fields,
+    row_fingerprint,
+    get_mirror_rows,
+    BackgroundWriter,
 )
 
 
+def select_changed_rows(table_name, rows, data_fields, key_column="number"):
+    """
+    로컬 미러의 행과 필드 해시가 다른 행(또는 미러에 없는 행)만 골라냅니다.
+    미러를 동기화한 적 없는 테이블이면 모든 행을 바뀐 것으로 봅니다.
+
+    Args:
+        table_name (str): Supabase 테이블 이름
+        rows (list): 크롤링한 행 목록
+        data_fields (list): 해시를 계산할 데이터 필드 목록 (created_at 제외)
+        key_column (str): 행을 구분하는 컬럼 (기본값: "number")
+
+    Returns:
+        list: 바뀐 행 목록
+    """
+    mirrored = get_mirror_rows(table_name, [row.get(key_column) for row in rows])
+    changed = []
+    for row in rows:
+        mirrored_row = mirrored.get(str(row.get(key_column)))
+        if mirrored_row is None or row_fingerprint(row, data_fields) != row_fingerprint(
+            mirrored_row, data_fields
+        ):
+            changed.append(row)
+    return changed
+
+
 def save_and_upload_results(
-    success_results, output_file, table_name, data_fields, conflict_column="number"
+    success_results,
+    output_file,
+    table_name,
+    data_fields,
+    conflict_column="number",
+    dry_run=False,
+    skip_unchanged=True,
 ):
     """
     성공한 크롤링 결과를 저장하고 업로드합니다.
+    엑셀에는 모든 결과를 저장하고, 업로드는 로컬 미러와 내용이 다른 행만 합니다.
 
     Args:
         success_results (list): 성공한 크롤링 결과 리스트
@@ -21,6 +56,8 @@ def save_and_upload_results(
         table_name (str): 업로드할 Supabase 테이블 이름
         data_fields (list): 데이터 필드 목록
         conflict_column (str): 충돌 컬럼 이름 (기본값: "number")
+        dry_run (bool): True면 엑셀만 저장하고 Supabase 업로드는 건너뜀
+        skip_unchanged (bool): True면 로컬 미러와 필드 해시가 같은 행은 업로드하지 않음
 
     Returns:
         bool: 저장 및 업로드 성공 여부
@@ -33,9 +70,21 @@ def save_and_upload_results(
     # 엑셀 파일로 저장
     save_to_excel(success_results, output_file, data_fields)
 
+    if dry_run:
+        print("dry-run 모드: Supabase 업로드를 건너뜁니다.")
+        return True
+
     # Supabase에 업로드
     print("\nSupabase에 데이터 업로드 중...")
     upload_data = filter_data_fields(success_results, data_fields)
+    if skip_unchanged:
+        upload_data = _skip_unchanged_rows(
+            table_name, upload_data, data_fields, conflict_column
+        )
+        if not upload_data:
+            print("업로드할 변경 사항이 없습니다.")
+            return True
+
     upload_success = upload_to_supabase(
         upload_data, table_name, conflict_column=conflict_column, update_mode="upsert"
     )
@@ -48,3 +97,138 @@ def save_and_upload_results(
     else:
         print("Supabase 업로드에 실패했습니다.")
         return False
+
+
+def _skip_unchanged_rows(table_name, rows, data_fields, conflict_column):
+    changed = select_changed_rows(table_name, rows, data_fields, conflict_column)
+    if len(changed) < len(rows):
+        print(
+            f"내용이 같은 행 {len(rows) - len(changed)}개는 업로드하지 않습니다. "
+            f"(업로드: {len(changed)}개)"
+        )
+    return changed
+
+
+class UploadBuffer:
+    """
+    크롤링 결과를 모았다가 일정 개수가 차면 Supabase에 업서트하는 버퍼.
+    스트리밍 모드에서 결과가 도착하는 대로 업로드해 메모리 사용량을 일정하게 유지합니다.
+    background가 True면 업로드는 백그라운드 작업자가 맡아 크롤링을 막지 않습니다.
+
+    Args:
+        table_name (str): 업로드할 Supabase 테이블 이름
+        data_fields (list): 데이터 필드 목록
+        flush_size (int): 한 번에 업서트할 행 수
+        conflict_column (str): 충돌 컬럼 이름 (기본값: "number")
+        skip_unchanged (bool): True면 로컬 미러와 필드 해시가 같은 행은 업로드하지 않음
+        background (bool): True면 가득 찬 버퍼를 백그라운드 작업자에게 넘기고 바로 반환
+    """
+
+    def __init__(
+        self,
+        table_name,
+        data_fields,
+        flush_size=500,
+        conflict_column="number",
+        skip_unchanged=True,
+        background=True,
+    ):
+        self.table_name = table_name
+        self.data_fields = data_fields
+        self.flush_size = flush_size
+        self.conflict_column = conflict_column
+        self.skip_unchanged = skip_unchanged
+        self.rows = []
+        self.uploaded_count = 0
+        self.unchanged_count = 0
+        self.failed_count = 0
+        self.writer = (
+            BackgroundWriter(self._upload, name=f"upload-{table_name}")
+            if background
+            else None
+        )
+
+    def add(self, row):
+        """
+        행을 버퍼에 추가하고, 버퍼가 가득 차면 업로드합니다.
+
+        Args:
+            row (dict): 성공한 크롤링 결과
+        """
+        self.rows.append(row)
+        if len(self.rows) >= self.flush_size:
+            self.flush()
+
+    def flush(self):
+        """
+        버퍼에 남은 행을 업서트합니다. 백그라운드 작업자가 있으면 넘기기만 합니다.
+
+        Returns:
+            bool: 업로드 성공 여부 (백그라운드 작업자에게 넘겼으면 True)
+        """
+        if not self.rows:
+            return True
+
+        rows, self.rows = self.rows, []
+        if self.writer is not None:
+            self.writer.put(rows)
+            return True
+        return self._upload(rows)
+
+    def _upload(self, rows):
+        upload_data = filter_data_fields(rows, self.data_fields)
+        if self.skip_unchanged:
+            changed = select_changed_rows(
+                self.table_name, upload_data, self.data_fields, self.conflict_column
+            )
+            self.unchanged_count += len(upload_data) - len(changed)
+            upload_data = changed
+            if not upload_data:
+                return True
+
+        upload_success = upload_to_supabase(
+            upload_data,
+            self.table_name,
+            conflict_column=self.conflict_column,
+            update_mode="upsert",
+        )
+
+        if upload_success:
+            self.uploaded_count += len(upload_data)
+        else:
+            self.failed_count += len(upload_data)
+            print(
+                f"Supabase 업로드 실패: {len(upload_data)}개 행을 업로드하지 못했습니다."
+            )
+        return upload_success
+
+    def close(self):
+        """
+        남은 행을 모두 업로드하고 결과를 출력합니다.
+
+        Returns:
+            bool: 업로드한 행이 있고 실패한 행이 없으면 True
+        """
+        self.flush()
+        if self.writer is not None:
+            self.writer.close()
+
+        if self.uploaded_count == 0 and self.failed_count == 0:
+            if self.unchanged_count:
+                print(
+                    f"업로드할 변경 사항이 없습니다. "
+                    f"(내용이 같은 행 {self.unchanged_count}개)"
+                )
+                return True
+            print("크롤링에 성공한 노래 정보가 없습니다.")
+            return False
+
+        print(
+            f"Supabase '{self.table_name}' 테이블에 {self.uploaded_count}개의 노래 정보 업로드 완료!"
+        )
+        if self.unchanged_count:
+            print(f"내용이 같아 업로드하지 않은 노래 정보: {self.unchanged_count}개")
+        if self.failed_count:
+            print(f"업로드에 실패한 노래 정보: {self.failed_count}개")
+            return False
+        return True
@@ -3,105 +3,272 @@
 """
 
 import os
+import threading
 import requests
-import time
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor
+from utils import sync_table_mirror, load_mirror_numbers
+from .negative_cache_utils import NegativeCache
+from .planner_utils import NumberPlanner, EXISTING, NEGATIVE
+from .priority_utils import take_prioritized, get_probed_days
 
+PAGE_SIZE = 1000  # Supabase의 기본 제한
+SNAPSHOT_WORKERS = 4  # 기존 곡 번호를 동시에 조회할 스레드 수
+PARTITIONS_PER_WORKER = 4  # 스레드 하나가 맡을 번호 구간 수
+SNAPSHOT_CSV = os.getenv("SUPABASE_SNAPSHOT_CSV", "1") == "1"  # CSV로 받을지 여부
+TIMEOUT = 30  # 요청 타임아웃(초)
 
-def get_all_existing_song_numbers(table_name):
+_session = None
+_session_lock = threading.Lock()
+
+
+def _get_session():
+    # 조회 스레드들이 연결을 재사용하도록 풀 크기를 스레드 수에 맞춘 세션 하나를 공유
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=SNAPSHOT_WORKERS)
+            _session.mount("https://", adapter)
+            _session.mount("http://", adapter)
+        return _session
+
+
+def _fetch_numbers(
+    table_name, filters, csv=SNAPSHOT_CSV, limit=PAGE_SIZE, descending=False
+):
     """
-    DB에 존재하는 모든 곡 번호를 페이지네이션을 통해 가져옵니다.
+    번호 컬럼만 번호 순서대로 한 페이지 조회합니다.
 
     Args:
         table_name (str): 조회할 Supabase 테이블 이름
+        filters (list): PostgREST 필터 (컬럼, 조건) 튜플 목록
+        csv (bool): True면 CSV로 받아 응답 크기를 줄임 (값은 모두 문자열)
+        limit (int): 페이지 크기
+        descending (bool): True면 큰 번호부터 조회
 
     Returns:
-        set: 존재하는 모든 곡 번호 세트 또는 None (오류 발생 시)
+        list: 번호 값 목록
     """
-    try:
-        print("DB에서 기존 곡 번호 목록을 가져오는 중...")
+    supabase_url = os.getenv("SUPABASE_URL")
+    supabase_key = os.getenv("SUPABASE_KEY")
 
-        # Supabase 설정
-        supabase_url = os.getenv("SUPABASE_URL")
-        supabase_key = os.getenv("SUPABASE_KEY")
+    headers = {
+        "apikey": supabase_key,
+        "Authorization": f"Bearer {supabase_key}",
+        "Accept": "text/csv" if csv else "application/json",
+    }
+    order = "number.desc" if descending else "number.asc"
+    params = [("select", "number"), ("order", order), ("limit", limit)]
 
-        headers = {
-            "apikey": supabase_key,
-            "Authorization": f"Bearer {supabase_key}",
-            "Content-Type": "application/json",
-            "Prefer": "return=representation",
-        }
+    response = _get_session().get(
+        f"{supabase_url}/rest/v1/{table_name}",
+        headers=headers,
+        params=params + filters,
+        timeout=TIMEOUT,
+    )
 
-        # 페이지네이션으로 모든 노래 번호 가져오기
-        all_records = []
-        page = 0
-        limit = 1000  # Supabase의 기본 제한
+    if response.status_code != 200:
+        raise RuntimeError(
+            f"기존 곡 조회 오류. 상태 코드: {response.status_code}, "
+            f"오류 내용: {response.text}"
+        )
 
-        while True:
-            offset = page * limit
-            query_params = {"select": "number", "limit": limit, "offset": offset}
+    if csv:
+        # 첫 줄은 헤더
+        return [line.strip('"') for line in response.text.splitlines()[1:] if line]
+    return [row["number"] for row in response.json()]
 
-            print(f"페이지 {page+1} 요청 중 (offset: {offset}, limit: {limit})...")
 
-            response = requests.get(
-                f"{supabase_url}/rest/v1/{table_name}",
-                headers=headers,
-                params=query_params,
-            )
+def _scan_numbers(table_name, filters, on_numbers):
+    """
+    키셋 페이지네이션으로 조건에 맞는 번호를 끝까지 조회합니다.
+    offset 대신 마지막 번호 다음부터 조회하므로 페이지마다 조회 비용이 일정합니다.
+    숫자가 아닌 번호 값은 건너뛰고 개수만 출력합니다.
+
+    Returns:
+        int: 넘긴 번호 수
+    """
+    after = None
+    count = 0
+    malformed = 0
+    while True:
+        cursor = [("number", f"gt.{after}")] if after is not None else []
+        values = _fetch_numbers(table_name, filters + cursor)
+        if not values:
+            break
+
+        numbers = [int(value) for value in values if str(value).strip().isdigit()]
+        malformed += len(values) - len(numbers)
+        if numbers:
+            on_numbers(numbers)
+        count += len(numbers)
 
-            if response.status_code != 200:
-                print(f"기존 곡 조회 오류. 상태 코드: {response.status_code}")
-                print("오류 내용:", response.text)
-                return None
+        if len(values) < PAGE_SIZE:
+            break
+        # 건너뛴 값이라도 원래 값 다음부터 이어서 조회한다
+        after = values[-1]
+
+    if malformed:
+        print(f"숫자가 아닌 곡 번호 {malformed}개를 건너뛰었습니다. ({table_name})")
+    return count
+
+
+def _split_range(low, high, parts):
+    step = max(1, -(-(high - low + 1) // parts))
+    return [
+        (part_start, min(part_start + step - 1, high))
+        for part_start in range(low, high + 1, step)
+    ]
+
+
+def load_existing_song_numbers(
+    table_name, on_numbers, start_number=None, end_number=None, use_mirror=True
+):
+    """
+    DB에 존재하는 곡 번호를 페이지 단위로 조회해 on_numbers에 바로 넘깁니다.
+    로컬 미러를 원격과 맞출 수 있으면 미러에서 읽고, 그렇지 않으면 원격에서 조회합니다.
+    번호 컬럼이 숫자형이면 번호 범위를 나눠 여러 스레드가 동시에 조회하고,
+    문자형이면 정렬 순서가 숫자와 다르므로 한 스레드가 처음부터 끝까지 조회합니다.
+
+    Args:
+        table_name (str): 조회할 Supabase 테이블 이름
+        on_numbers (function): 번호(int) 목록 하나를 받아 처리하는 함수.
+            여러 스레드에서 호출되지만 한 번에 하나씩만 실행됨
+        start_number (int, optional): 조회할 최소 번호 (숫자형 컬럼에만 적용)
+        end_number (int, optional): 조회할 최대 번호 (숫자형 컬럼에만 적용)
+        use_mirror (bool): False면 로컬 미러를 사용하지 않고 원격에서 조회
+
+    Returns:
+        int: 조회한 번호 수 또는 None (오류 발생 시)
+    """
+    if use_mirror and sync_table_mirror(table_name):
+        count = load_mirror_numbers(table_name, on_numbers, start_number, end_number)
+        print(f"로컬 미러에서 총 {count}개 기존 곡 번호를 가져왔습니다.")
+        return count
+
+    try:
+        print("DB에서 기존 곡 번호 목록을 가져오는 중...")
+        lock = threading.Lock()
 
-            page_results = response.json()
-            if not page_results:
-                print("더 이상 데이터가 없습니다.")
-                break
+        def handle_numbers(numbers):
+            with lock:
+                on_numbers(numbers)
 
-            all_records.extend(page_results)
-            print(f"현재까지 {len(all_records)}개 레코드 로드됨")
+        # 가장 작은 번호 하나를 JSON으로 받아 컬럼 타입을 확인한다
+        range_filters = []
+        if start_number is not None:
+            range_filters.append(("number", f"gte.{start_number}"))
+        if end_number is not None:
+            range_filters.append(("number", f"lte.{end_number}"))
+        first = _fetch_numbers(table_name, range_filters, csv=False, limit=1)
 
-            page += 1
-            # DB 부하를 줄이기 위한 짧은 딜레이
-            time.sleep(0.2)
+        if first and isinstance(first[0], int):
+            last = _fetch_numbers(
+                table_name, range_filters, csv=False, limit=1, descending=True
+            )
+            partitions = _split_range(
+                first[0], last[0], SNAPSHOT_WORKERS * PARTITIONS_PER_WORKER
+            )
+            with ThreadPoolExecutor(max_workers=SNAPSHOT_WORKERS) as executor:
+                counts = executor.map(
+                    lambda part: _scan_numbers(
+                        table_name,
+                        [("number", f"gte.{part[0]}"), ("number", f"lte.{part[1]}")],
+                        handle_numbers,
+                    ),
+                    partitions,
+                )
+                count = sum(counts)
+        elif first:
+            count = _scan_numbers(table_name, [], handle_numbers)
+        else:
+            count = 0
 
-        # 번호 목록을 세트로 변환
-        existing_numbers = set(int(item["number"]) for item in all_records)
-        print(f"DB에서 총 {len(existing_numbers)}개 기존 곡 번호를 가져왔습니다.")
-        print(existing_numbers)
-        return existing_numbers
+        print(f"DB에서 총 {count}개 기존 곡 번호를 가져왔습니다.")
+        return count
     except Exception as e:
         print(f"기존 곡 목록 조회 중 오류 발생: {str(e)}")
         return None
 
 
-def get_numbers_to_crawl(table_name, start_number, end_number):
+def get_all_existing_song_numbers(table_name):
     """
-    크롤링이 필요한 번호 목록을 계산합니다.
+    DB에 존재하는 모든 곡 번호를 가져옵니다.
+
+    Args:
+        table_name (str): 조회할 Supabase 테이블 이름
+
+    Returns:
+        set: 존재하는 모든 곡 번호 세트 또는 None (오류 발생 시)
+    """
+    existing_numbers = set()
+    if load_existing_song_numbers(table_name, existing_numbers.update) is None:
+        return None
+    return existing_numbers
+
+
+def get_popular_song_numbers(popular_table):
+    """
+    인기 차트 테이블에 있는 곡 번호를 가져옵니다.
+
+    Args:
+        popular_table (str): 조회할 인기 차트 Supabase 테이블 이름
+
+    Returns:
+        list: 곡 번호(int) 목록. 오류가 나면 빈 목록
+    """
+    try:
+        values = _fetch_numbers(popular_table, [], csv=False)
+        return [int(value) for value in values if str(value).isdigit()]
+    except Exception as e:
+        print(f"인기 차트 곡 번호 조회 중 오류 발생: {str(e)}")
+        return []
+
+
+def get_numbers_to_crawl(table_name, start_number, end_number, popular_table=None):
+    """
+    크롤링이 필요한 번호 목록을 계산합니다. 번호는 우선순위가 높은 구간부터 내줍니다.
 
     Args:
         table_name (str): 조회할 Supabase 테이블 이름
         start_number (int): 시작 번호
         end_number (int): 종료 번호
+        popular_table (str, optional): DB에 없으면 먼저 크롤링할 인기 차트 테이블 이름
 
     Returns:
-        list: 크롤링할 번호 목록 또는 None (DB 조회 오류 시)
+        ChunkedNumbers: 크롤링할 번호 목록 또는 None (DB 조회 오류 시)
     """
-    # DB에 이미 존재하는 모든 곡 번호 가져오기 (한 번만 조회)
-    existing_songs = get_all_existing_song_numbers(table_name)
-    print(existing_songs)
+    # DB에 이미 존재하는 곡 번호를 받는 대로 플래너에 표시 (한 번만 조회)
+    planner = NumberPlanner(start_number, end_number)
+    loaded = load_existing_song_numbers(
+        table_name,
+        lambda numbers: planner.mark(numbers, EXISTING),
+        start_number,
+        end_number,
+    )
 
-    if existing_songs is None:
+    if loaded is None:
         print("기존 곡 목록을 가져올 수 없어 크롤링을 중단합니다.")
         return None
 
+    # 최근에 빈 번호로 확인된 번호는 TTL이 지날 때까지 건너뛴다
+    negative_cache = NegativeCache(table_name)
+    skip_numbers = negative_cache.get_skip_numbers(start_number, end_number)
+    probed_days = get_probed_days(negative_cache, start_number, end_number)
+    negative_cache.close()
+
     # 없는 곡 번호 확인
     print("크롤링이 필요한 번호 확인 중...")
-    all_numbers = set(range(start_number, end_number + 1))
-    numbers_to_crawl = list(all_numbers - existing_songs)
-    numbers_to_crawl.sort()  # 오름차순 정렬
+    planner.mark(skip_numbers, NEGATIVE)
+    numbers_to_crawl = take_prioritized(
+        planner,
+        get_popular_song_numbers(popular_table) if popular_table else (),
+        probed_days,
+        negative_cache.ttl_days,
+    )
 
-    if not numbers_to_crawl:
+    if len(numbers_to_crawl) == 0:
         print(f"크롤링할 새 곡이 없습니다. (범위: {start_number}-{end_number})")
         return []
 
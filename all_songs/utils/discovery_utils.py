@@ -0,0 +1,282 @@
+"""
+곡 번호 탐색(디스커버리) 유틸리티 함수
+
+번호 범위 전체를 매번 요청하지 않도록, 몇 개 번호만 미리 찔러 보고(probe)
+실제 곡이 있는 구간과 카탈로그의 끝(프런티어)을 추정합니다.
+- 프런티어: DB의 가장 큰 번호(하이 워터 마크) 위로 블록 간격을 두 배씩 늘려 가며
+  찔러 본 뒤(지수 탐색), 마지막으로 곡이 있던 블록과 그 다음 빈 블록 사이를 이분 탐색
+- 블록 밀도: 프런티어 아래에서 DB에 곡이 하나도 없는 블록은 번호 몇 개를
+  무작위로 찔러 보고, 곡이 나온 블록만 전체 크롤링
+- 하이 워터 마크와 프런티어 위로는 안전 여유분만큼 빠짐없이 크롤링
+찔러 본 결과는 버리지 않습니다. 빈 번호는 네거티브 캐시에 기록하고, 곡이 나온 번호는
+본 크롤링에서 다시 요청하지 않고 그 결과를 그대로 저장/업로드합니다.
+"""
+
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from .result_utils import is_no_result, expand_harvested
+from .db_utils import load_existing_song_numbers, get_popular_song_numbers
+from .negative_cache_utils import NegativeCache
+from .planner_utils import NumberPlanner, EXISTING, NEGATIVE, EXCLUDED
+from .priority_utils import take_prioritized, get_probed_days
+
+BLOCK_SIZE = 1000  # 밀도를 추정할 번호 블록 크기
+SAMPLES_PER_BLOCK = 8  # 블록마다 찔러 볼 번호 수
+SAFETY_MARGIN = 2000  # 하이 워터 마크와 프런티어 위로 더 크롤링할 번호 수
+PROBE_WORKERS = 8  # 블록 샘플링에 사용할 스레드 수
+
+
+class ProbeLog:
+    """
+    탐색 중에 찔러 본 번호의 크롤링 결과를 모아 두는 기록.
+    여러 스레드에서 probe를 호출해도 되고, 요청마다 크롤링 예산을 씁니다.
+
+    Args:
+        probe_func (function): 번호 하나를 크롤링해 결과를 반환하는 함수
+        crawl_budget (CrawlBudget, optional): 탐색 요청도 함께 반영할 크롤링 예산
+    """
+
+    def __init__(self, probe_func, crawl_budget=None):
+        self.probe_func = probe_func
+        self.crawl_budget = crawl_budget
+        self.results = []
+        self.lock = threading.Lock()
+
+    def probe(self, number):
+        """
+        번호 하나를 크롤링하고 결과를 기록합니다.
+
+        Args:
+            number (int): 찔러 볼 번호
+
+        Returns:
+            dict: 크롤링 결과 또는 None (예산을 다 써서 요청하지 않은 경우)
+        """
+        if self.crawl_budget and not self.crawl_budget.take():
+            return None
+        result = self.probe_func(number)
+        with self.lock:
+            self.results.append(result)
+        return result
+
+    def split_results(self):
+        """
+        기록한 결과를 함께 수집한 곡까지 펼쳐 빈 번호와 성공한 결과로 나눕니다.
+        일시적 오류 등 확인하지 못한 번호는 본 크롤링에서 다시 요청하도록 뺍니다.
+
+        Returns:
+            tuple: (검색 결과 없음 결과 리스트, 성공한 결과 리스트)
+        """
+        empty = {}
+        found = {}
+        for result in self.results:
+            for item in expand_harvested(result):
+                number = str(item["number"])
+                if is_no_result(item):
+                    empty[number] = item
+                elif not item.get("error", False):
+                    found[number] = item
+        # 다른 페이지에서 곡으로 수집된 번호는 빈 번호로 보지 않는다
+        return [item for number, item in empty.items() if number not in found], list(
+            found.values()
+        )
+
+
+def _probe_block(probe_func, block_start, block_end, samples, known_empty):
+    """
+    블록에서 번호 몇 개를 무작위로 찔러 보고 곡이 하나라도 있는지 확인합니다.
+    응답을 확인하지 못한 번호(일시적 오류, 파싱 실패, 예산 소진)는 곡이 있는 것으로 보고,
+    네거티브 캐시에 있는 번호는 요청하지 않고 빈 번호로 봅니다.
+    """
+    numbers = range(block_start, block_end + 1)
+    for number in random.sample(numbers, min(samples, len(numbers))):
+        if number in known_empty:
+            continue
+        result = probe_func(number)
+        if result is None or not is_no_result(result):
+            return True
+    return False
+
+
+def find_frontier(
+    probe_func, high_water, end_number, block_size, samples, known_empty=frozenset()
+):
+    """
+    하이 워터 마크 위에서 곡이 있는 마지막 블록을 찾습니다.
+
+    Args:
+        probe_func (function): 번호 하나를 크롤링해 결과를 반환하는 함수.
+            None을 반환하면 확인하지 못한 것으로 보고 곡이 있는 것으로 간주
+        high_water (int): DB에 있는 가장 큰 번호
+        end_number (int): 탐색할 최대 번호
+        block_size (int): 블록 크기
+        samples (int): 블록마다 찔러 볼 번호 수
+        known_empty (set): 요청 없이 빈 번호로 볼 번호 세트
+
+    Returns:
+        int: 곡이 있는 것으로 추정되는 가장 큰 번호
+    """
+    # 지수 탐색: 간격을 두 배씩 늘려 가며 범위 끝까지 찔러 본다
+    # (중간에 빈 구간이 있어도 그 위의 구간을 놓치지 않도록 끝까지 확인)
+    probe_starts = []
+    step = block_size
+    while high_water + step <= end_number:
+        probe_starts.append(high_water + step)
+        step *= 2
+
+    with ThreadPoolExecutor(max_workers=PROBE_WORKERS) as executor:
+        hits = list(
+            executor.map(
+                lambda block_start: _probe_block(
+                    probe_func,
+                    block_start,
+                    min(block_start + block_size - 1, end_number),
+                    samples,
+                    known_empty,
+                ),
+                probe_starts,
+            )
+        )
+
+    last_hit = high_water
+    empty_start = end_number + 1
+    for i, hit in enumerate(hits):
+        if hit:
+            last_hit = min(probe_starts[i] + block_size - 1, end_number)
+            empty_start = (
+                probe_starts[i + 1] if i + 1 < len(probe_starts) else end_number + 1
+            )
+
+    # 이분 탐색: 마지막으로 곡이 있던 블록과 그 다음 빈 블록 사이를 좁힌다
+    while empty_start - last_hit > block_size:
+        block_start = (last_hit + empty_start) // 2
+        block_end = min(block_start + block_size - 1, end_number)
+        if _probe_block(probe_func, block_start, block_end, samples, known_empty):
+            last_hit = block_end
+        else:
+            empty_start = block_start
+
+    return min(last_hit, end_number)
+
+
+def discover_numbers_to_crawl(
+    table_name,
+    start_number,
+    end_number,
+    probe_func,
+    block_size=BLOCK_SIZE,
+    samples=SAMPLES_PER_BLOCK,
+    margin=SAFETY_MARGIN,
+    popular_table=None,
+    crawl_budget=None,
+    found_results=None,
+):
+    """
+    탐색으로 곡이 있을 만한 구간을 추정하고 그 안에서 크롤링할 번호 목록을 계산합니다.
+    찔러 본 번호 중 빈 번호는 네거티브 캐시에 기록하고, 곡이 나온 번호는 크롤링할
+    번호 목록에서 빼고 found_results에 담습니다.
+
+    Args:
+        table_name (str): 조회할 Supabase 테이블 이름
+        start_number (int): 시작 번호
+        end_number (int): 종료 번호
+        probe_func (function): 번호 하나를 크롤링해 결과를 반환하는 함수
+        block_size (int): 밀도를 추정할 번호 블록 크기
+        samples (int): 블록마다 찔러 볼 번호 수
+        margin (int): 하이 워터 마크와 프런티어 위로 더 크롤링할 번호 수
+        popular_table (str, optional): DB에 없으면 먼저 크롤링할 인기 차트 테이블 이름
+        crawl_budget (CrawlBudget, optional): 탐색 요청도 반영할 크롤링 예산
+        found_results (list, optional): 탐색 중 크롤링에 성공한 결과를 담을 리스트.
+            run_crawler의 prefetched_results로 넘기면 다시 요청하지 않고 업로드
+
+    Returns:
+        ChunkedNumbers: 우선순위 순서의 크롤링할 번호 목록 또는 None (DB 조회 오류 시)
+    """
+    # DB에 이미 존재하는 곡 번호를 받는 대로 플래너에 표시
+    planner = NumberPlanner(start_number, end_number)
+    loaded = load_existing_song_numbers(
+        table_name,
+        lambda numbers: planner.mark(numbers, EXISTING),
+        start_number,
+        end_number,
+    )
+
+    if loaded is None:
+        print("기존 곡 목록을 가져올 수 없어 크롤링을 중단합니다.")
+        return None
+
+    high_water = planner.max_number(EXISTING) or start_number - 1
+
+    # 최근에 빈 번호로 확인된 번호는 찔러 보지도, 크롤링하지도 않는다
+    negative_cache = NegativeCache(table_name)
+    skip_numbers = negative_cache.get_skip_numbers(start_number, end_number)
+    probed_days = get_probed_days(negative_cache, start_number, end_number)
+    planner.mark(skip_numbers, NEGATIVE)
+
+    print(f"번호 탐색을 시작합니다... (하이 워터 마크: {high_water})")
+
+    probe_log = ProbeLog(probe_func, crawl_budget)
+    frontier = find_frontier(
+        probe_log.probe, high_water, end_number, block_size, samples, skip_numbers
+    )
+    print(f"추정 프런티어: {frontier}")
+
+    # DB에 곡이 있는 블록은 그대로 크롤링하고, 없는 블록만 샘플링한다
+    block_counts = planner.count_per_block(EXISTING, block_size)
+    blocks = [
+        (block_start, min(block_start + block_size - 1, frontier))
+        for block_start in range(start_number, frontier + 1, block_size)
+    ]
+    unknown_blocks = [block for i, block in enumerate(blocks) if block_counts[i] == 0]
+
+    with ThreadPoolExecutor(max_workers=PROBE_WORKERS) as executor:
+        hits = list(
+            executor.map(
+                lambda block: _probe_block(
+                    probe_log.probe, block[0], block[1], samples, skip_numbers
+                ),
+                unknown_blocks,
+            )
+        )
+
+    # 샘플에서 곡이 나오지 않은 블록과 프런티어 여유분 위는 이번 실행에서 제외한다
+    sparse_blocks = [block for block, hit in zip(unknown_blocks, hits) if not hit]
+    print(
+        f"블록 {len(blocks)}개 중 {len(blocks) - len(sparse_blocks)}개에 곡이 있습니다. "
+        f"(샘플링한 블록 {len(unknown_blocks)}개)"
+    )
+    for block_start, block_end in sparse_blocks:
+        planner.mark(range(block_start, block_end + 1), EXCLUDED)
+    planner.mark(range(frontier + margin + 1, end_number + 1), EXCLUDED)
+
+    # 하이 워터 마크 위의 안전 여유분은 샘플과 관계없이 모두 크롤링한다
+    planner.clear(range(high_water + 1, high_water + margin + 1), EXCLUDED)
+
+    # 찔러 본 결과: 빈 번호는 캐시에 기록하고, 곡이 나온 번호는 다시 요청하지 않는다
+    empty_results, probe_hits = probe_log.split_results()
+    for result in empty_results:
+        negative_cache.record(result)
+    negative_cache.close()
+    planner.mark([int(result["number"]) for result in empty_results], NEGATIVE)
+    if found_results is not None:
+        planner.mark([int(result["number"]) for result in probe_hits], EXISTING)
+        found_results.extend(probe_hits)
+    print(
+        f"탐색 요청 {len(probe_log.results)}건: 곡 {len(probe_hits)}개, "
+        f"빈 번호 {len(empty_results)}개"
+    )
+
+    numbers_to_crawl = take_prioritized(
+        planner,
+        get_popular_song_numbers(popular_table) if popular_table else (),
+        probed_days,
+        negative_cache.ttl_days,
+    )
+
+    print(
+        f"총 {len(numbers_to_crawl)}개 번호 크롤링 예정 "
+        f"(범위: {start_number}-{end_number}, "
+        f"탐색으로 {planner.count(EXCLUDED)}개 번호 제외)"
+    )
+    return numbers_to_crawl
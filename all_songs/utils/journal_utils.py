@@ -0,0 +1,131 @@
+"""
+크롤링 체크포인트 저널 관련 유틸리티 함수
+"""
+
+import os
+import glob
+import json
+import datetime
+from utils import get_state_path
+
+FSYNC_INTERVAL = 100  # 몇 건마다 디스크에 강제로 기록할지
+KEEP_ROTATED_JOURNALS = 3  # 새로 시작할 때 옮겨 둔 이전 저널을 몇 개까지 보관할지
+
+
+class CrawlJournal:
+    """
+    완료된 번호와 파싱 결과를 한 줄씩 덧붙여 기록하는 append-only 저널.
+    프로세스가 죽어도 기록된 결과는 남아 있어 --resume으로 이어서 실행할 수 있습니다.
+
+    Args:
+        table_name (str): 저널을 구분할 Supabase 테이블 이름
+    """
+
+    def __init__(self, table_name):
+        self.path = get_state_path("journal", f"{table_name}.jsonl")
+        self.file = None
+        self.pending_sync = 0
+
+    def load(self):
+        """
+        저널에 기록된 결과를 읽어옵니다. 마지막 줄이 잘려 있으면 무시합니다.
+
+        Returns:
+            list: 기록된 크롤링 결과 리스트
+        """
+        if not os.path.exists(self.path):
+            return []
+
+        results = []
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    results.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+        return results
+
+    def open(self, resume=False):
+        """
+        저널 파일을 엽니다. 새로 시작할 때 이전 실행의 기록이 남아 있으면 지우지 않고
+        "<저널>.<시각>" 파일로 옮겨 둡니다 (최근 KEEP_ROTATED_JOURNALS개만 보관).
+
+        Args:
+            resume (bool): True면 기존 기록 뒤에 이어 쓰고, False면 새로 시작
+        """
+        if not resume and os.path.exists(self.path) and os.path.getsize(self.path):
+            self._rotate()
+        self.file = open(self.path, "a", encoding="utf-8")
+
+    def _rotate(self):
+        timestamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+        rotated_path = f"{self.path}.{timestamp}"
+        os.replace(self.path, rotated_path)
+        print(
+            f"이전 실행의 저널을 {rotated_path}로 옮겼습니다. "
+            f"(복원하려면 원래 이름으로 되돌린 뒤 --resume)"
+        )
+
+        # 시각 문자열 순서가 곧 오래된 순서
+        rotated = sorted(glob.glob(glob.escape(self.path) + ".*"))
+        for old_path in rotated[:-KEEP_ROTATED_JOURNALS]:
+            os.remove(old_path)
+
+    def record(self, result):
+        """
+        크롤링 결과 하나를 저널에 기록합니다.
+
+        Args:
+            result (dict): 크롤링 결과
+        """
+        self.file.write(json.dumps(result, ensure_ascii=False) + "\n")
+        self.file.flush()
+
+        self.pending_sync += 1
+        if self.pending_sync >= FSYNC_INTERVAL:
+            os.fsync(self.file.fileno())
+            self.pending_sync = 0
+
+    def close(self):
+        """저널 파일을 닫습니다."""
+        if self.file:
+            self.file.flush()
+            os.fsync(self.file.fileno())
+            self.file.close()
+            self.file = None
+
+    def complete(self):
+        """업로드까지 끝난 실행의 저널을 삭제합니다."""
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def resume_from_journal(journal, numbers):
+    """
+    저널에서 성공한 결과를 꺼내고, 남은 크롤링 번호 목록을 계산합니다.
+    "검색 결과 없음"처럼 확정된 실패는 건너뛰고, 일시적 오류로 실패한 번호만 다시 크롤링합니다.
+
+    Args:
+        journal (CrawlJournal): 이전 실행의 저널
+        numbers (list): 크롤링할 번호 목록
+
+    Returns:
+        tuple: (저널에서 복원한 성공 결과 리스트, 남은 번호 목록)
+    """
+    replayed = {}
+    completed = set()
+    for result in journal.load():
+        number = str(result["number"])
+        if not result.get("error", False):
+            replayed[number] = result
+            completed.add(number)
+        elif not result.get("retryable", False):
+            # "검색 결과 없음" 같은 확정된 실패는 다시 요청하지 않는다
+            completed.add(number)
+
+    remaining = [number for number in numbers if str(number) not in completed]
+    print(
+        f"저널에서 {len(replayed)}개 결과를 복원했습니다. 남은 번호: {len(remaining)}개"
+    )
+    return list(replayed.values()), remaining
@@ -2,11 +2,25 @@
 크롤러 메인 실행 유틸리티 함수
 """
 
+import os
 import time
-from utils import calculate_elapsed_time
-from .result_utils import process_results, print_failed_results
-from .process_utils import crawl_with_multiprocessing
-from .data_utils import save_and_upload_results
+from utils import calculate_elapsed_time, print_transport_stats, save_to_excel
+from .result_utils import (
+    process_results,
+    print_failed_results,
+    get_failure,
+    expand_harvested,
+)
+from .process_utils import stream_with_multiprocessing
+from .async_utils import stream_with_asyncio, DEFAULT_CONCURRENCY
+from .pipeline_utils import stream_with_pipeline
+from .data_utils import save_and_upload_results, UploadBuffer
+from .journal_utils import CrawlJournal, resume_from_journal
+from .negative_cache_utils import NegativeCache
+from .retry_utils import RetryScheduler, MAX_RETRY_ROUNDS
+from .budget_utils import BudgetedNumbers, summarize_numbers
+
+STREAM_FLUSH_SIZE = 500  # 스트리밍 모드에서 한 번에 업서트할 행 수
 
 
 def run_crawler(
@@ -17,6 +31,22 @@ def run_crawler(
     data_fields,
     service_name="노래방",
     custom_numbers=None,
+    engine="process",
+    async_crawler_func=None,
+    async_fetch_func=None,
+    parse_func=None,
+    concurrency=DEFAULT_CONCURRENCY,
+    parse_processes=None,
+    stream=False,
+    flush_size=STREAM_FLUSH_SIZE,
+    resume=False,
+    max_retry_rounds=MAX_RETRY_ROUNDS,
+    dry_run=False,
+    shard_queue=None,
+    run_name=None,
+    upload_filter=None,
+    crawl_budget=None,
+    prefetched_results=None,
 ):
     """
     크롤러를 실행하고 결과를 처리합니다.
@@ -29,6 +59,35 @@ def run_crawler(
         data_fields (list): 데이터 필드 목록
         service_name (str): 크롤링 대상 서비스 이름
         custom_numbers (list, optional): 크롤링할 번호 목록
+        engine (str): 크롤링 엔진
+            - "process": 기본값. 멀티프로세싱으로 crawler_func 실행
+            - "async": asyncio로 async_crawler_func 실행
+            - "pipeline": async_fetch_func로 받은 HTML을 프로세스 풀에서 parse_func로 파싱
+        async_crawler_func (coroutine function, optional): (session, number)를 받는
+            비동기 크롤링 함수. "async" 엔진에서 사용
+        async_fetch_func (coroutine function, optional): (session, number)를 받아
+            HTML을 반환하는 비동기 요청 함수. "pipeline" 엔진에서 사용
+        parse_func (function, optional): (number, html)을 받는 파싱 함수.
+            "pipeline" 엔진에서 사용
+        concurrency (int): "async"/"pipeline" 엔진의 최대 동시 요청 수
+        parse_processes (int, optional): "pipeline" 엔진의 파싱 프로세스 수.
+            None이면 CPU 수
+        stream (bool): True면 결과를 모으지 않고 도착하는 대로 업서트 (엑셀 저장 생략)
+        flush_size (int): 크롤링 중에 한 번에 업서트할 행 수
+        resume (bool): True면 이전 실행의 저널을 복원하고 남은 번호만 크롤링
+        max_retry_rounds (int): 일시적 오류로 실패한 번호를 다시 크롤링할 최대 라운드 수
+        dry_run (bool): True면 엑셀만 저장하고 Supabase 업로드는 건너뜀
+            (스트리밍 모드는 사용하지 않음)
+        shard_queue (ShardQueue, optional): 지정하면 번호 목록을 샤드로 나눠 작업 큐에
+            올리고, 임대한 샤드마다 이 함수를 다시 실행. 번호 목록이 비어 있으면
+            다른 노드가 올린 샤드만 나눠 받음
+        run_name (str, optional): 저널과 엑셀 파일을 구분할 실행 이름 (샤드 이름 등)
+        upload_filter (function, optional): 성공한 결과 리스트를 받아 저장하고
+            업로드할 행만 골라 반환하는 함수 (스트리밍 모드는 사용하지 않음)
+        crawl_budget (CrawlBudget, optional): 마감 시각/요청 예산. 예산을 다 쓰면
+            새 번호를 내주지 않고 받은 결과를 업로드한 뒤 미룬 번호를 보고
+        prefetched_results (list, optional): 번호 탐색 등에서 이미 크롤링에 성공한 결과.
+            다시 요청하지 않고 저널에 기록한 뒤 크롤링 결과와 함께 저장/업로드
 
     Returns:
         bool: 크롤링 및 저장 성공 여부
@@ -36,33 +95,370 @@ def run_crawler(
     # 시작 시간 기록
     start_time = time.time()
 
-    # custom_numbers 확인
-    if custom_numbers is None or len(custom_numbers) == 0:
+    # custom_numbers 확인 (이미 크롤링한 결과만 저장/업로드하는 실행이나
+    # 다른 노드가 올린 샤드만 나눠 받는 실행은 비어 있어도 됨)
+    if (
+        (custom_numbers is None or len(custom_numbers) == 0)
+        and not prefetched_results
+        and shard_queue is None
+    ):
         print("오류: 크롤링할 번호 목록(custom_numbers)이 필요합니다.")
         return False
 
-    numbers_to_crawl = custom_numbers
+    if engine not in ("process", "async", "pipeline"):
+        print(f"유효하지 않은 크롤링 엔진입니다: {engine}")
+        return False
+
+    if engine == "async" and async_crawler_func is None:
+        print(
+            "오류: async 엔진에는 비동기 크롤링 함수(async_crawler_func)가 필요합니다."
+        )
+        return False
+
+    if engine == "pipeline" and (async_fetch_func is None or parse_func is None):
+        print(
+            "오류: pipeline 엔진에는 비동기 요청 함수(async_fetch_func)와 "
+            "파싱 함수(parse_func)가 필요합니다."
+        )
+        return False
+
+    if shard_queue is not None:
+        run_options = {
+            "crawler_func": crawler_func,
+            "processes": processes,
+            "output_file": output_file,
+            "table_name": table_name,
+            "data_fields": data_fields,
+            "service_name": service_name,
+            "engine": engine,
+            "async_crawler_func": async_crawler_func,
+            "async_fetch_func": async_fetch_func,
+            "parse_func": parse_func,
+            "concurrency": concurrency,
+            "parse_processes": parse_processes,
+            "stream": stream,
+            "flush_size": flush_size,
+            "resume": resume,
+            "max_retry_rounds": max_retry_rounds,
+            "dry_run": dry_run,
+            "upload_filter": upload_filter,
+            "crawl_budget": crawl_budget,
+        }
+
+        # 이미 크롤링한 결과는 샤드로 나누지 않고 이 노드에서 바로 저장/업로드한다
+        prefetched_success = True
+        if prefetched_results:
+            prefetched_success = run_crawler(
+                **run_options,
+                custom_numbers=[],
+                run_name="prefetched",
+                prefetched_results=prefetched_results,
+            )
+        sharded_success = shard_queue.run(
+            table_name,
+            custom_numbers if custom_numbers is not None else [],
+            lambda shard_numbers, shard_name: run_crawler(
+                **run_options, custom_numbers=shard_numbers, run_name=shard_name
+            ),
+            crawl_budget,
+        )
+        return sharded_success and prefetched_success
+
+    numbers_to_crawl = custom_numbers if custom_numbers is not None else []
+
+    # 같은 머신에서 여러 샤드를 동시에 실행해도 저널과 엑셀 파일이 겹치지 않게 한다
+    journal_name = table_name
+    if run_name:
+        journal_name = f"{table_name}.{run_name}"
+        output_base, output_ext = os.path.splitext(output_file)
+        output_file = f"{output_base}_{run_name}{output_ext}"
+
+    if dry_run and stream:
+        print("dry-run 모드에서는 스트리밍 업로드를 사용하지 않습니다.")
+        stream = False
+
+    if upload_filter and stream:
+        print("업로드할 행을 골라내는 실행에서는 스트리밍 업로드를 사용하지 않습니다.")
+        stream = False
+
+    # 도착하는 결과를 저널에 기록해 두고, 재개 시에는 기록된 결과를 먼저 복원
+    # (dry-run 저널은 실제 실행의 저널과 섞이지 않게 따로 둔다)
+    journal = CrawlJournal(f"{journal_name}.dry_run" if dry_run else journal_name)
+    replayed_results = []
+    if resume:
+        replayed_results, numbers_to_crawl = resume_from_journal(
+            journal, numbers_to_crawl
+        )
+    journal.open(resume=resume)
+
+    # 이미 크롤링한 결과는 재개할 때 다시 쓸 수 있도록 저널에 기록하고 업로드 대상에 넣는다
+    if prefetched_results:
+        replayed = {str(result["number"]): result for result in replayed_results}
+        for result in prefetched_results:
+            number = str(result["number"])
+            if number not in replayed:
+                journal.record(result)
+                replayed[number] = result
+        replayed_results = list(replayed.values())
+        print(f"이미 크롤링한 결과 {len(prefetched_results)}개를 함께 저장합니다.")
+
+    # 빈 번호는 다음 실행에서 건너뛰도록 기록한다 (재생/dry-run 결과는 기록하지 않음)
+    negative_cache = None if dry_run else NegativeCache(table_name)
+
     print(f"{len(numbers_to_crawl)}개 {service_name} 곡 번호 크롤링을 시작합니다...")
-    print(f"사용 프로세스 수: {processes}")
 
-    # 멀티프로세싱으로 크롤링
-    results = crawl_with_multiprocessing(crawler_func, numbers_to_crawl, processes)
-    if results is None:
+    if engine == "async":
+        print(f"최대 동시 요청 수: {concurrency}")
+    elif engine == "pipeline":
+        print(
+            f"최대 동시 요청 수: {concurrency}, "
+            f"파싱 프로세스 수: {parse_processes or os.cpu_count()}"
+        )
+    else:
+        print(f"사용 프로세스 수: {processes}")
+
+    # 업로드할 행을 골라내거나 dry-run이 아니면 크롤링하는 동안 flush_size개씩 업로드한다
+    upload_while_crawling = not dry_run and upload_filter is None
+
+    if crawl_budget:
+        crawl_budget.start_run(
+            flush_size if upload_while_crawling else None,
+            processes if engine == "process" else concurrency,
+        )
+
+    def run_engine(on_result):
+        # 일시적 오류는 바로 실패 처리하지 않고 다음 라운드에 다시 크롤링한다
+        retry_scheduler = RetryScheduler(len(numbers_to_crawl), max_retry_rounds)
+
+        # 결과가 확정된 번호 (예산을 다 써서 멈췄을 때 미룬 번호를 계산하는 데 사용)
+        finished = set()
+
+        # 검색 페이지에서 함께 수집한 번호까지 포함해 이미 성공한 번호.
+        # 비동기 엔진은 요청 직전에 이 세트를 확인해 남은 번호에서 건너뛴다
+        resolved = {str(result["number"]) for result in replayed_results}
+
+        def record_and_handle(result):
+            if crawl_budget:
+                crawl_budget.record(result)
+            for item in expand_harvested(result):
+                number = str(item["number"])
+                # 다른 페이지에서 이미 수집한 번호는 중복으로 기록하지 않는다
+                if number in resolved:
+                    continue
+                if not item.get("error", False):
+                    resolved.add(number)
+
+                journal.record(item)
+                if negative_cache:
+                    negative_cache.record(item)
+                if not retry_scheduler.schedule(item):
+                    finished.add(number)
+                    on_result(item)
+
+        numbers = numbers_to_crawl
+        while numbers:
+            if crawl_budget:
+                numbers = BudgetedNumbers(numbers, crawl_budget)
+            if engine == "async":
+                crawled = stream_with_asyncio(
+                    async_crawler_func,
+                    numbers,
+                    concurrency,
+                    record_and_handle,
+                    resolved,
+                )
+            elif engine == "pipeline":
+                crawled = stream_with_pipeline(
+                    async_fetch_func,
+                    parse_func,
+                    numbers,
+                    concurrency,
+                    parse_processes,
+                    record_and_handle,
+                    resolved,
+                )
+            else:
+                # 풀은 번호를 미리 워커에 나눠 주므로 건너뛰지 못하고 결과만 중복 제거
+                crawled = stream_with_multiprocessing(
+                    crawler_func,
+                    numbers,
+                    processes,
+                    record_and_handle,
+                    should_stop=crawl_budget.exhausted if crawl_budget else None,
+                )
+            if not crawled:
+                return False
+            # 예산을 다 썼으면 재시도 라운드도 다음 실행으로 미룬다
+            if crawl_budget and crawl_budget.exhausted():
+                break
+            numbers = [
+                number
+                for number in retry_scheduler.next_round()
+                if str(number) not in resolved
+            ]
+
+        if retry_scheduler.retried_count:
+            print(
+                f"일시적 오류로 총 {retry_scheduler.retried_count}건을 재시도했습니다."
+            )
+
+        if crawl_budget and crawl_budget.stopped_reason:
+            deferred = [
+                number for number in numbers_to_crawl if str(number) not in finished
+            ]
+            print(
+                f"예산 소진({crawl_budget.stopped_reason})으로 "
+                f"{len(deferred)}개 번호를 다음 실행으로 미뤘습니다."
+            )
+            if deferred:
+                print(f"미룬 번호: {summarize_numbers(deferred)}")
+        return True
+
+    if stream:
+        success = _stream_and_upload(
+            run_engine, replayed_results, table_name, data_fields, flush_size
+        )
+    else:
+        success = _crawl_and_upload(
+            run_engine,
+            replayed_results,
+            output_file,
+            table_name,
+            data_fields,
+            dry_run,
+            upload_filter,
+            flush_size,
+        )
+
+    if negative_cache:
+        negative_cache.close()
+
+    # 업로드까지 끝났으면 저널을 지우고, 아니면 다음 --resume을 위해 남겨둔다
+    if success:
+        journal.complete()
+    else:
+        journal.close()
+        print(f"저널을 보존합니다: {journal.path} (--resume으로 이어서 실행)")
+
+    # 경과 시간 계산
+    elapsed_time = calculate_elapsed_time(start_time)
+    print(f"크롤링 완료! 소요 시간: {elapsed_time:.2f}초")
+
+    return success
+
+
+def _crawl_and_upload(
+    run_engine,
+    replayed_results,
+    output_file,
+    table_name,
+    data_fields,
+    dry_run,
+    upload_filter=None,
+    flush_size=STREAM_FLUSH_SIZE,
+):
+    """
+    모든 결과를 모아 엑셀로 저장합니다. 업로드는 도착한 결과를 flush_size개씩
+    백그라운드 작업자에게 넘겨 크롤링과 겹쳐 진행하고, 업로드할 행을 골라내야 하거나
+    dry-run이면 크롤링이 끝난 뒤 한 번에 처리합니다.
+    """
+    if dry_run or upload_filter:
+        return _crawl_then_upload(
+            run_engine,
+            replayed_results,
+            output_file,
+            table_name,
+            data_fields,
+            dry_run,
+            upload_filter,
+        )
+
+    results = list(replayed_results)
+    upload_buffer = UploadBuffer(table_name, data_fields, flush_size)
+    for result in replayed_results:
+        upload_buffer.add(result)
+
+    def on_result(result):
+        results.append(result)
+        if not get_failure(result):
+            upload_buffer.add(result)
+
+    crawled = run_engine(on_result)
+
+    print_transport_stats()
+    success_results, failed_results = process_results(results)
+    print_failed_results(failed_results)
+
+    # 업로드 작업자가 남은 행을 올리는 동안 엑셀 파일을 저장한다
+    # (크롤링이 중간에 실패해도 이미 받은 결과는 업로드하고, 엑셀은 저장하지 않음)
+    upload_buffer.flush()
+    if crawled and success_results:
+        save_to_excel(success_results, output_file, data_fields)
+
+    upload_success = upload_buffer.close()
+    return crawled and upload_success
+
+
+def _crawl_then_upload(
+    run_engine,
+    replayed_results,
+    output_file,
+    table_name,
+    data_fields,
+    dry_run,
+    upload_filter=None,
+):
+    """모든 결과를 모은 뒤 엑셀로 저장하고 한 번에 업로드합니다."""
+    results = list(replayed_results)
+    if not run_engine(results.append):
         return False
 
+    # 연결 재사용 통계 출력
+    print_transport_stats()
+
     # 결과 처리
     success_results, failed_results = process_results(results)
 
     # 실패한 결과 출력
     print_failed_results(failed_results)
 
+    # 업로드할 행만 골라내기 (골라낸 행이 없으면 할 일이 없으므로 성공)
+    if upload_filter and success_results:
+        success_results = upload_filter(success_results)
+        if not success_results:
+            print("업로드할 변경 사항이 없습니다.")
+            return True
+
     # 저장 및 업로드
-    success = save_and_upload_results(
-        success_results, output_file, table_name, data_fields
+    return save_and_upload_results(
+        success_results, output_file, table_name, data_fields, dry_run=dry_run
     )
 
-    # 경과 시간 계산
-    elapsed_time = calculate_elapsed_time(start_time)
-    print(f"크롤링 완료! 소요 시간: {elapsed_time:.2f}초")
 
-    return success
+def _stream_and_upload(
+    run_engine, replayed_results, table_name, data_fields, flush_size
+):
+    """결과가 도착하는 대로 버퍼에 모아 일정 개수마다 업서트합니다."""
+    print(f"스트리밍 모드: {flush_size}개 단위로 업로드합니다. (엑셀 저장 생략)")
+    upload_buffer = UploadBuffer(table_name, data_fields, flush_size)
+    failed_results = []
+
+    def on_result(result):
+        failure = get_failure(result)
+        if failure:
+            failed_results.append(failure)
+        else:
+            upload_buffer.add(result)
+
+    for result in replayed_results:
+        upload_buffer.add(result)
+
+    crawled = run_engine(on_result)
+
+    # 크롤링이 중간에 실패해도 이미 받은 결과는 업로드한다
+    upload_success = upload_buffer.close()
+
+    print_transport_stats()
+    print_failed_results(failed_results)
+
+    return crawled and upload_success
@@ -0,0 +1,149 @@
+"""
+검색 결과가 없는 번호(네거티브 캐시) 관련 유틸리티 함수
+
+"검색 결과 없음"으로 확인된 번호와 마지막으로 확인한 시각을 노래방별로 기록해 두고,
+TTL이 지나기 전까지는 크롤링 대상에서 뺍니다. 새 곡이 빈 번호에 추가되는 경우를
+놓치지 않도록 가장 오래전에 확인한 번호 일부는 TTL 안이라도 매번 다시 확인합니다.
+"""
+
+import os
+import math
+import sqlite3
+import datetime
+from utils import get_state_path
+from .result_utils import is_no_result
+
+NEGATIVE_CACHE_TTL_DAYS = int(os.getenv("NEGATIVE_CACHE_TTL_DAYS", "30"))
+REPROBE_RATIO = float(os.getenv("NEGATIVE_CACHE_REPROBE_RATIO", "0.02"))
+COMMIT_INTERVAL = 500  # 몇 건마다 커밋할지
+
+
+class NegativeCache:
+    """
+    노래방별로 검색 결과가 없는 번호와 마지막 확인 시각을 보관하는 SQLite 캐시.
+
+    Args:
+        table_name (str): 캐시를 구분할 Supabase 테이블 이름
+        ttl_days (int): 다시 확인하지 않고 건너뛸 기간(일). 0이면 건너뛰지 않음
+        reprobe_ratio (float): TTL 안이라도 매번 다시 확인할 번호 비율
+    """
+
+    def __init__(
+        self,
+        table_name,
+        ttl_days=NEGATIVE_CACHE_TTL_DAYS,
+        reprobe_ratio=REPROBE_RATIO,
+    ):
+        self.table_name = table_name
+        self.ttl_days = ttl_days
+        self.reprobe_ratio = reprobe_ratio
+        self.pending_commit = 0
+        self.connection = sqlite3.connect(
+            get_state_path("negative_cache.sqlite"), timeout=30
+        )
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS empty_numbers (
+                vendor TEXT NOT NULL,
+                number INTEGER NOT NULL,
+                probed_at TEXT NOT NULL,
+                PRIMARY KEY (vendor, number)
+            )
+            """)
+
+    def get_skip_numbers(self, start_number, end_number):
+        """
+        이번 실행에서 건너뛸 번호를 계산합니다.
+
+        Args:
+            start_number (int): 시작 번호
+            end_number (int): 종료 번호
+
+        Returns:
+            set: TTL 안에 확인했고 재확인 표본에 들지 않은 번호 세트
+        """
+        if self.ttl_days <= 0:
+            return set()
+
+        cutoff = (
+            datetime.datetime.now() - datetime.timedelta(days=self.ttl_days)
+        ).isoformat(timespec="seconds")
+        # 오래전에 확인한 번호부터 정렬해 앞쪽 일부를 재확인 표본으로 쓴다
+        # (재확인하면 시각이 갱신되므로 실행마다 표본이 돌아가며 바뀜)
+        numbers = [
+            number
+            for (number,) in self.connection.execute(
+                "SELECT number FROM empty_numbers "
+                "WHERE vendor = ? AND number BETWEEN ? AND ? AND probed_at > ? "
+                "ORDER BY probed_at, number",
+                (self.table_name, start_number, end_number, cutoff),
+            )
+        ]
+        reprobe_count = math.ceil(len(numbers) * self.reprobe_ratio)
+        skip_numbers = set(numbers[reprobe_count:])
+
+        if numbers:
+            print(
+                f"네거티브 캐시: 빈 번호 {len(skip_numbers)}개 건너뜀, "
+                f"{reprobe_count}개 재확인 (TTL: {self.ttl_days}일)"
+            )
+        return skip_numbers
+
+    def iter_probed_at(self, start_number, end_number):
+        """
+        범위 안에서 빈 번호로 확인한 번호와 마지막 확인 시각을 내줍니다.
+
+        Args:
+            start_number (int): 시작 번호
+            end_number (int): 종료 번호
+
+        Yields:
+            tuple: (번호, 확인 시각 ISO 문자열)
+        """
+        yield from self.connection.execute(
+            "SELECT number, probed_at FROM empty_numbers "
+            "WHERE vendor = ? AND number BETWEEN ? AND ?",
+            (self.table_name, start_number, end_number),
+        )
+
+    def record(self, result):
+        """
+        크롤링 결과를 캐시에 반영합니다. 검색 결과가 없으면 확인 시각을 기록하고,
+        곡이 있으면 캐시에서 지웁니다. 그 밖의 실패는 무시합니다.
+
+        Args:
+            result (dict): 크롤링 결과
+        """
+        try:
+            number = int(result["number"])
+        except (KeyError, ValueError):
+            return
+
+        if is_no_result(result):
+            self.connection.execute(
+                "INSERT OR REPLACE INTO empty_numbers (vendor, number, probed_at) "
+                "VALUES (?, ?, ?)",
+                (
+                    self.table_name,
+                    number,
+                    datetime.datetime.now().isoformat(timespec="seconds"),
+                ),
+            )
+        elif not result.get("error", False):
+            self.connection.execute(
+                "DELETE FROM empty_numbers WHERE vendor = ? AND number = ?",
+                (self.table_name, number),
+            )
+        else:
+            return
+
+        self.pending_commit += 1
+        if self.pending_commit >= COMMIT_INTERVAL:
+            self.connection.commit()
+            self.pending_commit = 0
+
+    def close(self):
+        """기록을 커밋하고 연결을 닫습니다."""
+        if self.connection:
+            self.connection.commit()
+            self.connection.close()
+            self.connection = None
@@ -0,0 +1,154 @@
+"""
+I/O 단계와 CPU 단계를 나눈 파이프라인 크롤링 유틸리티 함수
+
+비동기 요청 단계가 받은 원본 HTML을 크기 제한이 있는 큐에 넣으면, 프로세스 풀의
+파싱 워커가 꺼내 파싱과 다국어 변환을 수행합니다. 동시 요청 수와 파싱 프로세스
+수를 따로 정할 수 있고, 파싱이 밀리면 큐가 차서 요청 단계가 자동으로 기다립니다.
+"""
+
+import os
+import asyncio
+import aiohttp
+from concurrent.futures import ProcessPoolExecutor
+from .async_utils import DEFAULT_CONCURRENCY, _create_stats_trace_config
+from .result_utils import make_error_result
+
+QUEUE_SIZE_PER_PROCESS = 8  # 파싱 프로세스 하나당 대기시킬 HTML 수
+
+
+def _parse_in_worker(parse_func, number, html):
+    # 워커 프로세스에서 실행된다. 예외도 결과로 돌려 파이프라인이 멈추지 않게 한다
+    try:
+        return parse_func(number, html)
+    except Exception as e:
+        return make_error_result(number, e)
+
+
+async def _run_pipeline(
+    fetch_func,
+    parse_func,
+    numbers,
+    concurrency,
+    executor,
+    processes,
+    on_result,
+    skip_numbers,
+):
+    """
+    요청 태스크와 파싱 태스크를 함께 실행합니다.
+
+    Args:
+        fetch_func (coroutine function): (session, number)를 받아 HTML을 반환하는 함수
+        parse_func (function): (number, html)을 받아 결과를 반환하는 함수
+        numbers (list or range): 크롤링할 번호 목록
+        concurrency (int): 동시에 진행할 최대 요청 수
+        executor (ProcessPoolExecutor): 파싱 워커 풀
+        processes (int): 파싱 프로세스 수
+        on_result (function): 결과 하나를 받아 처리하는 함수
+        skip_numbers (set): 요청 직전에 확인해 건너뛸 번호(문자열) 세트
+    """
+    loop = asyncio.get_running_loop()
+    total = len(numbers)
+    number_iter = iter(numbers)
+    completed = 0
+    html_queue = asyncio.Queue(maxsize=processes * QUEUE_SIZE_PER_PROCESS)
+
+    def handle_result(result):
+        nonlocal completed
+        on_result(result)
+        completed += 1
+        if completed % 1000 == 0:
+            print(f"크롤링 진행 중: {completed}/{total} 완료")
+
+    connector = aiohttp.TCPConnector(limit=concurrency, limit_per_host=concurrency)
+
+    async with aiohttp.ClientSession(
+        connector=connector, trace_configs=[_create_stats_trace_config()]
+    ) as session:
+
+        async def fetcher():
+            for number in number_iter:
+                # 다른 검색 결과에서 이미 수집한 번호는 요청하지 않는다
+                if str(number) in skip_numbers:
+                    continue
+                try:
+                    html = await fetch_func(session, number)
+                except Exception as e:
+                    handle_result(make_error_result(number, e))
+                    continue
+                # 큐가 가득 차면 파싱 워커가 따라잡을 때까지 요청을 멈춘다
+                await html_queue.put((number, html))
+
+        async def parser():
+            while True:
+                item = await html_queue.get()
+                if item is None:
+                    return
+                number, html = item
+                result = await loop.run_in_executor(
+                    executor, _parse_in_worker, parse_func, number, html
+                )
+                handle_result(result)
+
+        # 워커마다 하나씩 더 보내 두어 결과를 기다리는 동안에도 쉬지 않게 한다
+        parsers = [asyncio.create_task(parser()) for _ in range(processes * 2)]
+        fetchers = [asyncio.create_task(fetcher()) for _ in range(concurrency)]
+
+        try:
+            await asyncio.gather(*fetchers)
+            for _ in parsers:
+                await html_queue.put(None)
+            await asyncio.gather(*parsers)
+        finally:
+            for task in fetchers + parsers:
+                task.cancel()
+
+
+def stream_with_pipeline(
+    fetch_func,
+    parse_func,
+    numbers,
+    concurrency=DEFAULT_CONCURRENCY,
+    processes=None,
+    on_result=None,
+    skip_numbers=frozenset(),
+):
+    """
+    비동기 요청과 프로세스 풀 파싱을 파이프라인으로 실행하면서
+    완료되는 순서대로 결과를 전달합니다.
+
+    Args:
+        fetch_func (coroutine function): (session, number)를 받아 HTML을 반환하는
+            비동기 요청 함수. 예외는 해당 번호의 오류 결과로 처리
+        parse_func (function): (number, html)을 받아 결과를 반환하는 파싱 함수.
+            워커 프로세스로 보내므로 모듈 최상위 함수여야 함
+        numbers (list or range): 크롤링할 번호 목록
+        concurrency (int): 동시에 진행할 최대 요청 수
+        processes (int): 파싱 프로세스 수. None이면 CPU 수
+        on_result (function): 결과 하나를 받아 처리하는 함수
+        skip_numbers (set): 요청 직전에 확인해 건너뛸 번호(문자열) 세트.
+            크롤링 중에 채워지는 세트를 넘기면 그 번호는 더 요청하지 않음
+
+    Returns:
+        bool: 크롤링 완료 여부
+    """
+    try:
+        concurrency = max(1, min(concurrency, len(numbers)))
+        processes = processes or os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            asyncio.run(
+                _run_pipeline(
+                    fetch_func,
+                    parse_func,
+                    numbers,
+                    concurrency,
+                    executor,
+                    processes,
+                    on_result,
+                    skip_numbers,
+                )
+            )
+        return True
+    except Exception as e:
+        print(f"크롤링 중 오류 발생: {str(e)}")
+        return False
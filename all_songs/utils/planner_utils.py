@@ -0,0 +1,204 @@
+"""
+번호 공간 계획(플래너) 유틸리티
+
+번호 하나당 1바이트짜리 NumPy 상태 배열로 DB에 있는 번호, 네거티브 캐시의 빈 번호,
+크롤링 중인 번호, 완료한 번호를 관리합니다. 파이썬 int 세트를 만들고 빼고 정렬하는
+대신 배열 연산으로 남은 번호를 계산하고, 번호 공간의 연속 구간 단위로 작업을 내줍니다.
+"""
+
+import numpy as np
+
+# 번호별 상태 비트
+EXISTING = 1  # DB에 이미 있는 번호
+NEGATIVE = 2  # 최근에 검색 결과 없음으로 확인된 번호
+IN_FLIGHT = 4  # 작업으로 내준 번호
+DONE = 8  # 크롤링을 마친 번호
+EXCLUDED = 16  # 탐색 결과 이번 실행에서 제외한 번호
+
+# 이 중 하나라도 켜져 있으면 크롤링할 필요가 없다
+SKIP_MASK = EXISTING | NEGATIVE | IN_FLIGHT | DONE | EXCLUDED
+
+DEFAULT_CHUNK_SIZE = 1000  # 작업 구간 하나의 길이
+
+
+class ChunkedNumbers:
+    """
+    구간 목록으로 표현한 번호 목록. 크롤링 엔진이 사용하는 len/iter를 지원합니다.
+    연속 구간은 range로 들고 있어 번호 수와 관계없이 메모리를 거의 쓰지 않고,
+    드문드문한 구간도 번호당 4바이트만 사용합니다.
+
+    Args:
+        chunks (list): range 또는 번호 배열(numpy.ndarray) 목록
+    """
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.total = sum(len(chunk) for chunk in chunks)
+
+    def __len__(self):
+        return self.total
+
+    def __iter__(self):
+        for chunk in self.chunks:
+            # 배열 구간은 한 구간씩만 파이썬 int로 바꿔 내준다
+            yield from (chunk if isinstance(chunk, range) else chunk.tolist())
+
+
+class NumberPlanner:
+    """
+    한 노래방의 번호 범위에 대한 상태 비트맵.
+
+    Args:
+        start_number (int): 시작 번호
+        end_number (int): 종료 번호
+    """
+
+    def __init__(self, start_number, end_number):
+        self.start_number = start_number
+        self.end_number = end_number
+        self.flags = np.zeros(end_number - start_number + 1, dtype=np.uint8)
+
+    def _to_indexes(self, numbers):
+        # 범위 밖 번호는 무시한다
+        if isinstance(numbers, range) and numbers.step == 1:
+            start = max(numbers.start, self.start_number)
+            stop = min(numbers.stop, self.end_number + 1)
+            return slice(
+                start - self.start_number, max(stop, start) - self.start_number
+            )
+
+        numbers = np.fromiter(numbers, dtype=np.int64)
+        numbers = numbers[(numbers >= self.start_number) & (numbers <= self.end_number)]
+        return numbers - self.start_number
+
+    def mark(self, numbers, flag):
+        """
+        번호에 상태 비트를 켭니다.
+
+        Args:
+            numbers (iterable): 번호 목록 (range면 복사 없이 구간 단위로 처리)
+            flag (int): 켤 상태 비트
+        """
+        self.flags[self._to_indexes(numbers)] |= flag
+
+    def clear(self, numbers, flag):
+        """
+        번호의 상태 비트를 끕니다.
+
+        Args:
+            numbers (iterable): 번호 목록
+            flag (int): 끌 상태 비트
+        """
+        self.flags[self._to_indexes(numbers)] &= ~np.uint8(flag)
+
+    def count(self, flag):
+        """
+        상태 비트가 켜진 번호 수를 반환합니다.
+
+        Args:
+            flag (int): 확인할 상태 비트
+
+        Returns:
+            int: 번호 수
+        """
+        return int(np.count_nonzero(self.flags & flag))
+
+    def max_number(self, flag):
+        """
+        상태 비트가 켜진 가장 큰 번호를 반환합니다.
+
+        Args:
+            flag (int): 확인할 상태 비트
+
+        Returns:
+            int: 가장 큰 번호 또는 None (없는 경우)
+        """
+        indexes = np.flatnonzero(self.flags & flag)
+        if len(indexes) == 0:
+            return None
+        return self.start_number + int(indexes[-1])
+
+    def count_per_block(self, flag, block_size):
+        """
+        시작 번호부터 block_size 단위로 나눈 블록마다 상태 비트가 켜진 번호 수를 셉니다.
+
+        Args:
+            flag (int): 확인할 상태 비트
+            block_size (int): 블록 크기
+
+        Returns:
+            numpy.ndarray: 블록별 번호 수
+        """
+        block_count = -(-len(self.flags) // block_size)
+        return np.bincount(
+            np.flatnonzero(self.flags & flag) // block_size, minlength=block_count
+        )
+
+    def pending_count(self):
+        """
+        아직 크롤링할 필요가 있는 번호 수를 반환합니다.
+
+        Returns:
+            int: 남은 번호 수
+        """
+        return int(np.count_nonzero((self.flags & SKIP_MASK) == 0))
+
+    def select_pending(self, numbers):
+        """
+        번호 목록 중 아직 크롤링할 필요가 있는 번호만 골라 오름차순으로 반환합니다.
+
+        Args:
+            numbers (iterable): 번호 목록
+
+        Returns:
+            numpy.ndarray: 남은 번호 배열
+        """
+        indexes = np.unique(self._to_indexes(list(numbers)))
+        indexes = indexes[(self.flags[indexes] & SKIP_MASK) == 0]
+        return indexes + self.start_number
+
+    def mark_pending(self, flag):
+        """
+        아직 크롤링할 필요가 있는 번호 전체에 상태 비트를 켭니다.
+
+        Args:
+            flag (int): 켤 상태 비트
+        """
+        self.flags[(self.flags & SKIP_MASK) == 0] |= flag
+
+    def iter_chunks(self, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        번호 공간을 chunk_size 단위 구간으로 나눠 남은 번호를 오름차순으로 내줍니다.
+        구간 안의 남은 번호가 연속이면 range로, 드문드문하면 uint32 배열로 내줍니다.
+
+        Args:
+            chunk_size (int): 구간 하나의 길이
+
+        Yields:
+            range or numpy.ndarray: 한 구간의 남은 번호
+        """
+        for window_start in range(0, len(self.flags), chunk_size):
+            window = self.flags[window_start : window_start + chunk_size]
+            indexes = np.flatnonzero((window & SKIP_MASK) == 0)
+            if len(indexes) == 0:
+                continue
+
+            first_number = self.start_number + window_start + int(indexes[0])
+            if int(indexes[-1]) - int(indexes[0]) + 1 == len(indexes):
+                yield range(first_number, first_number + len(indexes))
+            else:
+                yield (indexes + self.start_number + window_start).astype(np.uint32)
+
+    def take_pending(self, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        남은 번호를 구간 목록으로 반환하고 모두 크롤링 중으로 표시합니다.
+
+        Args:
+            chunk_size (int): 구간 하나의 길이
+
+        Returns:
+            ChunkedNumbers: 크롤링할 번호 목록
+        """
+        chunks = list(self.iter_chunks(chunk_size))
+        self.mark_pending(IN_FLIGHT)
+        return ChunkedNumbers(chunks)
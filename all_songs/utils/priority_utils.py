@@ -0,0 +1,129 @@
+"""
+크롤링 순서(우선순위) 스케줄러 유틸리티
+
+남은 번호를 번호 오름차순으로 내주는 대신, 플래너의 작업 구간마다 점수를 매겨
+우선순위 큐(heapq)에서 점수가 높은 구간부터 내줍니다. 짧게 끝나거나 중간에 끊긴
+실행에서도 가치가 큰 행부터 업로드되도록 다음 신호를 합산합니다.
+- 하이 워터 마크 근접도: DB의 가장 큰 번호 바로 위(새로 나온 곡)일수록 높음
+- 주변 블록 밀도: 양옆 블록까지 포함해 DB에 곡이 많은 구간일수록 높음
+- 인기 차트 누락: 인기 차트에는 있지만 전체곡 DB에 없는 번호는 가장 먼저
+- 마지막 확인 후 경과 시간: 네거티브 캐시에서 최근에 빈 번호로 확인한 번호일수록 낮음
+"""
+
+import math
+import heapq
+import datetime
+import numpy as np
+from .planner_utils import ChunkedNumbers, EXISTING, IN_FLIGHT, DEFAULT_CHUNK_SIZE
+
+HIGH_WATER_WEIGHT = 1.0  # 하이 워터 마크 근접도 가중치
+DENSITY_WEIGHT = 1.0  # 주변 블록 밀도 가중치
+POPULAR_WEIGHT = 10.0  # 인기 차트 누락 가중치 (다른 신호의 합보다 크게)
+AGE_WEIGHT = 0.5  # 마지막 확인 후 경과 시간 가중치
+HIGH_WATER_SCALE = 5000  # 근접도가 1/e로 줄어드는 거리(번호 수)
+BELOW_HIGH_WATER_RATIO = 0.5  # 하이 워터 마크 아래(빈 번호 채우기) 근접도 비율
+
+
+def _high_water_score(first_number, last_number, high_water):
+    if high_water is None:
+        return 0.0
+    if first_number > high_water:
+        return math.exp(-(first_number - high_water - 1) / HIGH_WATER_SCALE)
+    # 하이 워터 마크 아래의 빈 번호는 새 곡보다 덜 급하다
+    distance = max(0, high_water - last_number)
+    return BELOW_HIGH_WATER_RATIO * math.exp(-distance / HIGH_WATER_SCALE)
+
+
+def _age_score(numbers, probed_days, probed_numbers, ttl_days):
+    # 한 번도 확인하지 않은 번호는 1, TTL 안에 최근 확인한 번호일수록 0에 가깝다
+    first, last = np.searchsorted(probed_numbers, [numbers[0], numbers[-1] + 1])
+    if first == last or ttl_days <= 0:
+        return 1.0
+    total = sum(
+        min(1.0, probed_days[number] / ttl_days) if number in probed_days else 1.0
+        for number in numbers
+    )
+    return total / len(numbers)
+
+
+def take_prioritized(
+    planner,
+    popular_numbers=(),
+    probed_days=None,
+    ttl_days=30,
+    chunk_size=DEFAULT_CHUNK_SIZE,
+):
+    """
+    남은 번호를 점수가 높은 구간부터 내주는 번호 목록으로 반환하고,
+    모두 크롤링 중으로 표시합니다.
+
+    Args:
+        planner (NumberPlanner): DB에 있는 번호가 EXISTING으로 표시된 플래너
+        popular_numbers (iterable): 인기 차트에 있는 번호 목록
+        probed_days (dict, optional): 번호를 마지막으로 빈 번호로 확인한 뒤 지난 일수
+        ttl_days (int): 네거티브 캐시 TTL(일). 경과 시간 점수의 기준
+        chunk_size (int): 구간 하나의 길이 (밀도를 계산할 블록 크기와 같음)
+
+    Returns:
+        ChunkedNumbers: 우선순위 순서의 크롤링할 번호 목록
+    """
+    high_water = planner.max_number(EXISTING)
+    block_counts = planner.count_per_block(EXISTING, chunk_size)
+    probed_days = probed_days or {}
+    probed_numbers = np.array(sorted(probed_days), dtype=np.int64)
+
+    heap = []
+
+    # 인기 차트에 있지만 DB에 없는 번호는 하나의 구간으로 묶어 가장 먼저 내준다
+    popular = planner.select_pending(popular_numbers)
+    if len(popular):
+        planner.mark(popular.tolist(), IN_FLIGHT)
+        heapq.heappush(
+            heap, (-POPULAR_WEIGHT, int(popular[0]), popular.astype(np.uint32))
+        )
+        print(
+            f"인기 차트에 있지만 DB에 없는 번호 {len(popular)}개를 먼저 크롤링합니다."
+        )
+
+    for chunk in planner.iter_chunks(chunk_size):
+        numbers = chunk if isinstance(chunk, range) else chunk.tolist()
+        first_number, last_number = numbers[0], numbers[-1]
+
+        # 구간이 속한 블록과 양옆 블록의 DB 곡 비율
+        block = (first_number - planner.start_number) // chunk_size
+        neighbours = block_counts[max(0, block - 1) : block + 2]
+        density = float(neighbours.sum()) / (len(neighbours) * chunk_size)
+
+        score = (
+            HIGH_WATER_WEIGHT * _high_water_score(first_number, last_number, high_water)
+            + DENSITY_WEIGHT * density
+            + AGE_WEIGHT * _age_score(numbers, probed_days, probed_numbers, ttl_days)
+        )
+        heapq.heappush(heap, (-score, first_number, chunk))
+
+    planner.mark_pending(IN_FLIGHT)
+
+    chunks = []
+    while heap:
+        chunks.append(heapq.heappop(heap)[2])
+    return ChunkedNumbers(chunks)
+
+
+def get_probed_days(negative_cache, start_number, end_number):
+    """
+    네거티브 캐시에서 번호별로 마지막 확인 후 지난 일수를 계산합니다.
+
+    Args:
+        negative_cache (NegativeCache): 네거티브 캐시
+        start_number (int): 시작 번호
+        end_number (int): 종료 번호
+
+    Returns:
+        dict: 번호를 지난 일수(float)로 매핑한 딕셔너리
+    """
+    now = datetime.datetime.now()
+    return {
+        number: (now - datetime.datetime.fromisoformat(probed_at)).total_seconds()
+        / 86400
+        for number, probed_at in negative_cache.iter_probed_at(start_number, end_number)
+    }
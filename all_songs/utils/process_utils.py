@@ -2,7 +2,23 @@
 멀티프로세싱 관련 유틸리티 함수
 """
 
+import threading
 from multiprocessing import Pool
+from utils import (
+    get_transport_config,
+    create_shared_stats,
+    init_transport_worker,
+    merge_transport_stats,
+)
+
+FEED_CHUNKS_PER_PROCESS = 4  # 결과를 기다리는 동안 미리 넘겨 둘 번호 묶음 수 (프로세스당)
+
+
+def _get_worker_config(processes):
+    # 워커들이 호스트별 초당 요청 상한을 나눠 쓰도록 비율을 조정한다
+    config = get_transport_config()
+    config["rate_scale"] = config["rate_scale"] / processes
+    return config
 
 
 def crawl_with_multiprocessing(crawler_func, numbers, processes=4):
@@ -18,11 +34,88 @@ def crawl_with_multiprocessing(crawler_func, numbers, processes=4):
         list: 크롤링 결과 리스트 또는 None (오류 발생 시)
     """
     try:
-        pool = Pool(processes=processes)
+        # 워커마다 부모의 전송 설정을 적용하고 연결 통계를 공유 카운터로 모은다
+        shared_stats = create_shared_stats()
+        pool = Pool(
+            processes=processes,
+            initializer=init_transport_worker,
+            initargs=(_get_worker_config(processes), shared_stats),
+        )
         results = pool.map(crawler_func, numbers)
         pool.close()
         pool.join()
+        merge_transport_stats(shared_stats)
         return results
     except Exception as e:
         print(f"크롤링 중 오류 발생: {str(e)}")
         return None
+
+
+def stream_with_multiprocessing(
+    crawler_func, numbers, processes=4, on_result=None, chunksize=16, should_stop=None
+):
+    """
+    멀티프로세싱으로 크롤링하면서 완료되는 순서대로 결과를 전달합니다.
+    결과를 모아두지 않으므로 번호 수와 관계없이 메모리 사용량이 일정합니다.
+    풀의 작업 공급 스레드는 결과를 받지 않은 번호가 일정 개수를 넘으면 기다리므로
+    번호 목록(BudgetedNumbers 등)을 미리 다 읽지 않고, 워커는 쉬지 않고 계속 일합니다.
+
+    Args:
+        crawler_func (function): 각 번호를 크롤링하는 함수
+        numbers (list or range): 크롤링할 번호 목록
+        processes (int): 사용할 프로세스 수
+        on_result (function): 결과 하나를 받아 처리하는 함수
+        chunksize (int): 워커에 한 번에 넘길 번호 수
+        should_stop (function, optional): 결과마다 호출해 True를 반환하면
+            진행 중인 작업을 버리고 멈춤 (풀은 번호를 미리 나눠 주므로 중간에 멈추려면 필요)
+
+    Returns:
+        bool: 크롤링 완료 여부 (should_stop으로 멈춘 경우도 True)
+    """
+    try:
+        shared_stats = create_shared_stats()
+        pool = Pool(
+            processes=processes,
+            initializer=init_transport_worker,
+            initargs=(_get_worker_config(processes), shared_stats),
+        )
+        # 결과를 받을 때마다 자리를 하나씩 돌려줘 미리 꺼낸 번호 수를 제한한다
+        slots = threading.Semaphore(
+            max(chunksize, processes * chunksize * FEED_CHUNKS_PER_PROCESS)
+        )
+        stopped = threading.Event()
+
+        def feed():
+            number_iter = iter(numbers)
+            while True:
+                slots.acquire()
+                if stopped.is_set():
+                    return
+                try:
+                    number = next(number_iter)
+                except StopIteration:
+                    return
+                yield number
+
+        def stop_feeding():
+            # 자리를 기다리는 공급 스레드를 깨워 끝낸다 (풀을 종료하기 전에 필요)
+            stopped.set()
+            slots.release()
+
+        try:
+            for result in pool.imap_unordered(crawler_func, feed(), chunksize):
+                slots.release()
+                on_result(result)
+                if should_stop and should_stop():
+                    stop_feeding()
+                    pool.terminate()
+                    break
+        finally:
+            stop_feeding()
+        pool.close()
+        pool.join()
+        merge_transport_stats(shared_stats)
+        return True
+    except Exception as e:
+        print(f"크롤링 중 오류 발생: {str(e)}")
+        return False
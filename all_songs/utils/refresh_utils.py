@@ -0,0 +1,136 @@
+"""
+기존 곡 변경 감지(리프레시) 유틸리티 함수
+
+DB에 이미 있는 번호를 오래전에 확인한 순서대로 일정 개수씩 다시 크롤링하고,
+파싱한 필드의 해시를 로컬 미러의 행 해시와 비교해 바뀐 행만 업서트합니다.
+업체 사이트에서 곡명이나 가수명이 고쳐져도 전체를 다시 업로드하지 않고 반영할 수 있고,
+실행마다 확인할 개수를 제한하므로 번호 탐색 크롤링 옆에서 계속 돌릴 수 있습니다.
+"""
+
+import os
+import sqlite3
+import datetime
+from utils import get_state_path, sync_table_mirror, load_mirror_numbers
+from .main_utils import run_crawler
+from .data_utils import select_changed_rows
+
+REFRESH_LIMIT = int(os.getenv("REFRESH_LIMIT", "2000"))  # 실행마다 확인할 번호 수
+
+
+class RefreshState:
+    """
+    노래방별로 기존 곡 번호를 마지막으로 다시 확인한 시각을 보관하는 SQLite 기록.
+
+    Args:
+        table_name (str): 기록을 구분할 Supabase 테이블 이름
+    """
+
+    def __init__(self, table_name):
+        self.table_name = table_name
+        self.connection = sqlite3.connect(get_state_path("refresh.sqlite"), timeout=30)
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS refreshed_numbers (
+                vendor TEXT NOT NULL,
+                number INTEGER NOT NULL,
+                checked_at TEXT NOT NULL,
+                PRIMARY KEY (vendor, number)
+            )
+            """)
+
+    def pick_numbers(self, numbers, limit):
+        """
+        한 번도 확인하지 않은 번호부터, 그다음은 오래전에 확인한 번호부터 고릅니다.
+
+        Args:
+            numbers (list): DB에 있는 곡 번호 목록
+            limit (int): 고를 번호 수
+
+        Returns:
+            list: 이번 실행에서 다시 크롤링할 번호 목록
+        """
+        checked_at = dict(
+            self.connection.execute(
+                "SELECT number, checked_at FROM refreshed_numbers WHERE vendor = ?",
+                (self.table_name,),
+            )
+        )
+        return sorted(numbers, key=lambda number: (checked_at.get(number, ""), number))[
+            :limit
+        ]
+
+    def mark_checked(self, numbers):
+        """
+        번호를 방금 확인한 것으로 기록합니다.
+
+        Args:
+            numbers (iterable): 확인한 번호 목록
+        """
+        checked_at = datetime.datetime.now().isoformat(timespec="seconds")
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO refreshed_numbers (vendor, number, checked_at) "
+                "VALUES (?, ?, ?)",
+                [(self.table_name, int(number), checked_at) for number in numbers],
+            )
+
+    def close(self):
+        """연결을 닫습니다."""
+        self.connection.close()
+
+
+def refresh_songs(table_name, data_fields, limit=REFRESH_LIMIT, **crawler_options):
+    """
+    기존 곡을 일정 개수만 다시 크롤링하고 바뀐 행만 업서트합니다.
+
+    Args:
+        table_name (str): Supabase 테이블 이름
+        data_fields (list): 데이터 필드 목록
+        limit (int): 이번 실행에서 다시 확인할 번호 수
+        **crawler_options: run_crawler에 넘길 나머지 인자 (크롤링 함수, 엔진 등)
+
+    Returns:
+        bool: 리프레시 성공 여부
+    """
+    # 바뀌었는지는 미러의 행과 비교하므로 미러가 원격과 맞아야 한다
+    if not sync_table_mirror(table_name):
+        print("로컬 미러를 동기화할 수 없어 리프레시를 중단합니다.")
+        return False
+
+    existing_numbers = []
+    load_mirror_numbers(table_name, existing_numbers.extend)
+    if not existing_numbers:
+        print(f"'{table_name}' 테이블에 다시 확인할 곡이 없습니다.")
+        return True
+
+    state = RefreshState(table_name)
+    numbers = state.pick_numbers(existing_numbers, limit)
+    print(
+        f"기존 곡 {len(existing_numbers)}개 중 {len(numbers)}개를 다시 확인합니다. "
+        f"(오래전에 확인한 순서)"
+    )
+
+    # 크롤링한 행(함께 수집한 행 포함)의 번호. 업로드에 성공한 뒤 확인한 번호로 기록
+    crawled_numbers = []
+
+    def upload_filter(rows):
+        # 바뀐 행만 업로드한다
+        crawled_numbers.extend(row["number"] for row in rows)
+        changed = select_changed_rows(table_name, rows, data_fields)
+        print(f"변경 감지: {len(rows)}개 중 {len(changed)}개 행이 바뀌었습니다.")
+        return changed
+
+    success = run_crawler(
+        table_name=table_name,
+        data_fields=data_fields,
+        custom_numbers=numbers,
+        upload_filter=upload_filter,
+        run_name="refresh",
+        **crawler_options,
+    )
+
+    # 업로드까지 성공했을 때만 확인 시각을 기록한다.
+    # 검색 결과가 없어진 번호 등도 다음 순번으로 넘기도록 고른 번호 전체를 기록
+    if success:
+        state.mark_checked(list(numbers) + crawled_numbers)
+    state.close()
+    return success
@@ -0,0 +1,27 @@
+"""
+아카이브 재생 관련 유틸리티 함수
+"""
+
+from utils import is_archived
+
+
+def get_archived_numbers(url_func, start_number, end_number):
+    """
+    재생 아카이브에 응답이 기록된 번호 목록을 계산합니다.
+    재생 모드에서는 DB 대신 이 목록으로 크롤링할 번호를 정합니다.
+
+    Args:
+        url_func (function): 번호를 받아 요청 URL을 만드는 함수
+        start_number (int): 시작 번호
+        end_number (int): 종료 번호
+
+    Returns:
+        list: 아카이브에 있는 번호 목록
+    """
+    numbers = [
+        number
+        for number in range(start_number, end_number + 1)
+        if is_archived(url_func(number))
+    ]
+    print(f"재생 아카이브에서 {len(numbers)}개 번호를 찾았습니다.")
+    return numbers
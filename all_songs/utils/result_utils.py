@@ -2,6 +2,152 @@
 결과 처리 관련 유틸리티 함수
 """
 
+import asyncio
+import aiohttp
+import httpx
+import requests
+
+# 다시 시도하면 성공할 수 있는 응답 상태 코드
+TRANSIENT_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+# 검색 결과가 없는 번호의 오류 메시지
+NO_RESULT_MESSAGE = "검색 결과 없음"
+
+# 검색 결과 영역을 찾지 못한 페이지(차단, 점검, 구조 변경 등)의 오류 메시지
+UNRECOGNIZED_PAGE_MESSAGE = "검색 결과 영역을 찾을 수 없는 페이지"
+
+
+def is_transient_error(error):
+    """
+    다시 시도하면 성공할 수 있는 일시적 오류인지 판단합니다.
+    네트워크 오류, 타임아웃, 5xx/429 응답이 해당합니다.
+
+    Args:
+        error (Exception): 크롤링 중 발생한 예외
+
+    Returns:
+        bool: 일시적 오류 여부
+    """
+    if isinstance(
+        error,
+        (
+            requests.ConnectionError,
+            requests.Timeout,
+            aiohttp.ClientConnectionError,
+            aiohttp.ClientPayloadError,
+            asyncio.TimeoutError,
+            httpx.TransportError,
+        ),
+    ):
+        return True
+
+    # requests/httpx는 response.status_code, aiohttp는 status에 상태 코드가 있다
+    response = getattr(error, "response", None)
+    status_code = getattr(response, "status_code", None) or getattr(
+        error, "status", None
+    )
+    return status_code in TRANSIENT_STATUS_CODES
+
+
+def make_error_result(number, error):
+    """
+    예외로 실패한 번호의 크롤링 결과를 만듭니다.
+
+    Args:
+        number (int or str): 크롤링한 번호
+        error (Exception): 크롤링 중 발생한 예외
+
+    Returns:
+        dict: 오류 결과. 일시적 오류면 retryable이 True
+    """
+    return {
+        "number": str(number),
+        "error": True,
+        "error_message": str(error),
+        "retryable": is_transient_error(error),
+    }
+
+
+def make_no_result(number):
+    """
+    검색 결과가 없는 번호의 크롤링 결과를 만듭니다.
+
+    Args:
+        number (int or str): 크롤링한 번호
+
+    Returns:
+        dict: 검색 결과 없음 오류 결과
+    """
+    return {
+        "number": str(number),
+        "error": True,
+        "error_message": NO_RESULT_MESSAGE,
+    }
+
+
+def make_unrecognized_page_result(number):
+    """
+    검색 결과 영역(헤더)을 찾지 못한 페이지의 크롤링 결과를 만듭니다.
+    차단/점검 페이지나 바뀐 페이지 구조일 수 있으므로 검색 결과 없음으로 확정하지 않고
+    다시 시도할 오류로 처리합니다.
+
+    Args:
+        number (int or str): 크롤링한 번호
+
+    Returns:
+        dict: 다시 시도할 오류 결과
+    """
+    return {
+        "number": str(number),
+        "error": True,
+        "error_message": UNRECOGNIZED_PAGE_MESSAGE,
+        "retryable": True,
+    }
+
+
+def is_no_result(result):
+    """
+    검색 결과가 없는 번호의 결과인지 확인합니다.
+
+    Args:
+        result (dict): 크롤링 결과
+
+    Returns:
+        bool: 검색 결과 없음 여부
+    """
+    return result.get("error_message") == NO_RESULT_MESSAGE
+
+
+def expand_harvested(result):
+    """
+    검색 페이지에서 함께 수집한 곡(harvested)을 개별 결과로 펼칩니다.
+
+    Args:
+        result (dict): 크롤링 결과
+
+    Returns:
+        list: 원래 결과와 함께 수집한 결과를 담은 리스트
+    """
+    harvested = result.pop("harvested", None)
+    if not harvested:
+        return [result]
+    return [result] + harvested
+
+
+def get_failure(result):
+    """
+    크롤링 결과가 실패인 경우 (번호, 오류 메시지) 튜플을 반환합니다.
+
+    Args:
+        result (dict): 크롤링 결과
+
+    Returns:
+        tuple: (number, error_message) 또는 None (성공한 결과인 경우)
+    """
+    if result.get("error", False):
+        return (result["number"], result.get("error_message", "알 수 없는 오류"))
+    return None
+
 
 def process_results(results):
     """
@@ -17,10 +163,9 @@ def process_results(results):
     failed_results = []
 
     for result in results:
-        if result.get("error", False):
-            failed_results.append(
-                (result["number"], result.get("error_message", "알 수 없는 오류"))
-            )
+        failure = get_failure(result)
+        if failure:
+            failed_results.append(failure)
         else:
             success_results.append(result)
 
@@ -0,0 +1,86 @@
+"""
+일시적 오류 재시도 관련 유틸리티 함수
+"""
+
+import time
+import random
+
+MAX_RETRY_ROUNDS = 3  # 최대 재시도 라운드 수
+RETRY_BASE_DELAY = 2.0  # 첫 재시도 전 기본 대기 시간(초)
+RETRY_MAX_DELAY = 60.0  # 재시도 대기 시간 상한(초)
+RETRY_BUDGET_RATIO = 0.2  # 계획한 번호 수 대비 재시도 허용 비율
+RETRY_BUDGET_MIN = 100  # 재시도 허용 횟수 최솟값
+
+
+class RetryScheduler:
+    """
+    일시적 오류로 실패한 번호만 모아 다음 라운드에 다시 크롤링하도록 예약하는 스케줄러.
+    라운드 사이에는 지터를 준 지수 백오프로 대기하고, 전체 재시도 횟수는 예산으로 제한합니다.
+
+    Args:
+        total (int): 처음 계획한 번호 수
+        max_rounds (int): 최대 재시도 라운드 수
+        base_delay (float): 첫 재시도 전 기본 대기 시간(초)
+        budget (int): 전체 재시도 허용 횟수. None이면 번호 수에 비례해 계산
+    """
+
+    def __init__(
+        self,
+        total,
+        max_rounds=MAX_RETRY_ROUNDS,
+        base_delay=RETRY_BASE_DELAY,
+        budget=None,
+    ):
+        self.max_rounds = max_rounds
+        self.base_delay = base_delay
+        self.budget = (
+            budget
+            if budget is not None
+            else max(RETRY_BUDGET_MIN, int(total * RETRY_BUDGET_RATIO))
+        )
+        self.round = 0
+        self.pending = []
+        self.retried_count = 0
+
+    def schedule(self, result):
+        """
+        실패한 결과를 다음 라운드에 재시도할지 결정하고, 재시도할 경우 예약합니다.
+
+        Args:
+            result (dict): 크롤링 결과
+
+        Returns:
+            bool: 재시도 예약 여부. False면 결과를 그대로 처리해야 함
+        """
+        if not result.get("retryable", False):
+            return False
+        if self.round >= self.max_rounds or self.budget <= 0:
+            return False
+
+        self.budget -= 1
+        self.retried_count += 1
+        self.pending.append(int(result["number"]))
+        return True
+
+    def next_round(self):
+        """
+        백오프 후 다음 라운드에 크롤링할 번호 목록을 반환합니다.
+
+        Returns:
+            list: 재시도할 번호 목록. 없으면 빈 리스트
+        """
+        if not self.pending:
+            return []
+
+        numbers, self.pending = sorted(self.pending), []
+        delay = min(RETRY_MAX_DELAY, self.base_delay * (2**self.round))
+        # 재시도 요청이 한꺼번에 몰리지 않도록 대기 시간의 절반 범위에서 지터 적용
+        delay = random.uniform(delay / 2, delay)
+        self.round += 1
+
+        print(
+            f"일시적 오류 {len(numbers)}건 재시도 (라운드 {self.round}/{self.max_rounds}, "
+            f"{delay:.1f}초 후, 남은 예산 {self.budget}건)"
+        )
+        time.sleep(delay)
+        return numbers
@@ -0,0 +1,706 @@
+"""
+여러 노드가 나눠 크롤링하는 샤드 작업 큐 유틸리티
+
+계획한 번호를 번호 공간의 고정 구간(shard_span) 단위 샤드로 나눠 작업 큐에 올리고,
+노드마다 샤드를 임대(lease)해 크롤링합니다. 임대는 하트비트로 연장하며, 노드가
+죽어 연장이 끊기면 만료된 샤드를 다른 노드가 가져갑니다. 결과는 샤드마다 평소의
+업로드 경로(run_crawler)로 업서트되므로 노드 사이에 따로 합칠 필요가 없습니다.
+
+번호 계획(탐색)은 계획 임대를 얻은 노드 하나만 하고, 다른 노드는 계획이 올라올 때까지
+기다렸다가 샤드만 나눠 받습니다. 샤드는 계획의 우선순위 순서대로 임대됩니다.
+샤드 번호가 번호 구간으로 정해지므로 여러 노드가 계획을 올려도 같은 샤드는
+먼저 올라간 것 하나만 남습니다. 큐 저장소는 교체할 수 있습니다.
+- SQLiteShardBackend: 한 머신(또는 공유 디스크)의 여러 프로세스용 로컬 큐
+- SupabaseShardBackend: 여러 머신이 공유하는 PostgREST 큐 (sql/crawl_shards.sql)
+"""
+
+import os
+import json
+import time
+import socket
+import sqlite3
+import threading
+import requests
+import numpy as np
+from datetime import datetime
+from utils import get_state_path
+from .planner_utils import ChunkedNumbers
+
+DEFAULT_SHARD_SPAN = 10000  # 샤드 하나가 맡을 번호 구간 길이
+DEFAULT_LEASE_SECONDS = 300  # 하트비트 없이 임대가 유지되는 시간(초)
+MAX_SHARD_ATTEMPTS = 3  # 실패로 반납된 샤드를 다시 내줄 최대 횟수
+SHARD_TABLE = "crawl_shards"
+PLAN_TABLE = "crawl_plans"
+TIMEOUT = 30  # 요청 타임아웃(초)
+
+
+def encode_numbers(numbers):
+    """
+    번호 배열을 [시작, 끝] 연속 구간 목록으로 줄입니다. 구간 순서는 배열 순서를 따릅니다.
+
+    Args:
+        numbers (numpy.ndarray): 번호 배열 (1씩 증가하는 부분이 한 구간이 됨)
+
+    Returns:
+        list: [시작 번호, 끝 번호] 목록
+    """
+    if len(numbers) == 0:
+        return []
+    breaks = np.flatnonzero(np.diff(numbers) != 1) + 1
+    starts = np.concatenate(([0], breaks))
+    ends = np.concatenate((breaks - 1, [len(numbers) - 1]))
+    return [[int(numbers[s]), int(numbers[e])] for s, e in zip(starts, ends)]
+
+
+def decode_numbers(runs):
+    """
+    [시작, 끝] 연속 구간 목록을 크롤링 엔진이 사용하는 번호 목록으로 바꿉니다.
+
+    Args:
+        runs (list): [시작 번호, 끝 번호] 목록
+
+    Returns:
+        ChunkedNumbers: 번호 목록
+    """
+    return ChunkedNumbers([range(start, end + 1) for start, end in runs])
+
+
+def split_into_shards(numbers, shard_span=DEFAULT_SHARD_SPAN):
+    """
+    번호 목록을 번호 공간의 shard_span 구간 단위 샤드로 나눕니다.
+    샤드는 번호 목록에서 처음 나온 순서대로, 샤드 안의 번호도 목록 순서대로 둡니다.
+
+    Args:
+        numbers (iterable): 우선순위 순서의 크롤링할 번호 목록
+        shard_span (int): 샤드 하나가 맡을 번호 구간 길이
+
+    Returns:
+        dict: 샤드 번호를 [시작, 끝] 연속 구간 목록으로 매핑한 딕셔너리 (우선순위 순서)
+    """
+    numbers = np.fromiter(numbers, dtype=np.int64)
+    # 중복 번호는 처음 나온 것만 남기고 순서는 그대로 둔다
+    _, first_index = np.unique(numbers, return_index=True)
+    numbers = numbers[np.sort(first_index)]
+
+    shard_ids = numbers // shard_span
+    unique_ids, first_seen = np.unique(shard_ids, return_index=True)
+    order = np.argsort(shard_ids, kind="stable")
+    parts = np.split(numbers[order], np.flatnonzero(np.diff(shard_ids[order])) + 1)
+    return {
+        int(unique_ids[i]): encode_numbers(parts[i]) for i in np.argsort(first_seen)
+    }
+
+
+class SQLiteShardBackend:
+    """
+    SQLite 파일에 샤드 상태를 보관하는 로컬 작업 큐.
+    같은 파일을 여는 프로세스끼리 임대를 나눠 가집니다.
+
+    Args:
+        path (str): SQLite 파일 경로. None이면 상태 디렉터리의 shards.sqlite
+    """
+
+    def __init__(self, path=None):
+        self.path = path or get_state_path("shards.sqlite")
+        connection = self._connect()
+        try:
+            connection.execute("""
+                CREATE TABLE IF NOT EXISTS crawl_shards (
+                    job TEXT NOT NULL,
+                    shard_id INTEGER NOT NULL,
+                    numbers TEXT NOT NULL,
+                    state TEXT NOT NULL DEFAULT 'pending',
+                    owner TEXT,
+                    lease_expires REAL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    priority INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (job, shard_id)
+                )
+                """)
+            columns = [
+                row[1] for row in connection.execute("PRAGMA table_info(crawl_shards)")
+            ]
+            if "priority" not in columns:
+                # 우선순위 컬럼이 없던 예전 큐 파일
+                connection.execute(
+                    "ALTER TABLE crawl_shards "
+                    "ADD COLUMN priority INTEGER NOT NULL DEFAULT 0"
+                )
+            connection.execute("""
+                CREATE TABLE IF NOT EXISTS crawl_plans (
+                    job TEXT PRIMARY KEY,
+                    state TEXT NOT NULL,
+                    owner TEXT,
+                    lease_expires REAL
+                )
+                """)
+        finally:
+            connection.close()
+
+    def _connect(self):
+        # 하트비트 스레드에서도 호출하므로 호출마다 연결을 새로 연다
+        connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        connection.execute("PRAGMA busy_timeout = 30000")
+        return connection
+
+    def publish(self, job, shards):
+        connection = self._connect()
+        try:
+            connection.execute("BEGIN IMMEDIATE")
+            connection.executemany(
+                "INSERT OR IGNORE INTO crawl_shards "
+                "(job, shard_id, numbers, priority) VALUES (?, ?, ?, ?)",
+                [
+                    (job, shard_id, json.dumps(runs), priority)
+                    for priority, (shard_id, runs) in enumerate(shards.items())
+                ],
+            )
+            connection.execute("COMMIT")
+        finally:
+            connection.close()
+
+    def start_plan(self, job, owner, lease_seconds):
+        connection = self._connect()
+        try:
+            connection.execute("BEGIN IMMEDIATE")
+            now = time.time()
+            row = connection.execute(
+                "SELECT state, lease_expires FROM crawl_plans WHERE job = ?", (job,)
+            ).fetchone()
+            if row is None or (row[0] == "planning" and row[1] < now):
+                connection.execute(
+                    "INSERT OR REPLACE INTO crawl_plans "
+                    "(job, state, owner, lease_expires) VALUES (?, 'planning', ?, ?)",
+                    (job, owner, now + lease_seconds),
+                )
+                state = "planning"
+            else:
+                state = "published" if row[0] == "published" else "waiting"
+            connection.execute("COMMIT")
+            return state
+        finally:
+            connection.close()
+
+    def _update_plan(self, job, owner, statement, params):
+        connection = self._connect()
+        try:
+            cursor = connection.execute(
+                f"{statement} WHERE job = ? AND owner = ? AND state = 'planning'",
+                params + (job, owner),
+            )
+            return cursor.rowcount == 1
+        finally:
+            connection.close()
+
+    def renew_plan(self, job, owner, lease_seconds):
+        return self._update_plan(
+            job,
+            owner,
+            "UPDATE crawl_plans SET lease_expires = ?",
+            (time.time() + lease_seconds,),
+        )
+
+    def finish_plan(self, job, owner):
+        return self._update_plan(
+            job,
+            owner,
+            "UPDATE crawl_plans SET state = 'published', lease_expires = NULL",
+            (),
+        )
+
+    def abandon_plan(self, job, owner):
+        return self._update_plan(job, owner, "DELETE FROM crawl_plans", ())
+
+    def claim(self, job, owner, lease_seconds):
+        connection = self._connect()
+        try:
+            # 다른 프로세스가 같은 샤드를 가져가지 못하게 쓰기 잠금을 먼저 잡는다
+            connection.execute("BEGIN IMMEDIATE")
+            now = time.time()
+            row = connection.execute(
+                "SELECT shard_id, numbers, attempts FROM crawl_shards "
+                "WHERE job = ? AND (state = 'pending' "
+                "OR (state = 'leased' AND lease_expires < ?)) "
+                "ORDER BY priority, shard_id LIMIT 1",
+                (job, now),
+            ).fetchone()
+            if row is None:
+                connection.execute("COMMIT")
+                return None
+            shard_id, numbers, attempts = row
+            connection.execute(
+                "UPDATE crawl_shards SET state = 'leased', owner = ?, "
+                "lease_expires = ?, attempts = attempts + 1 "
+                "WHERE job = ? AND shard_id = ?",
+                (owner, now + lease_seconds, job, shard_id),
+            )
+            connection.execute("COMMIT")
+            return {
+                "shard_id": shard_id,
+                "numbers": json.loads(numbers),
+                "attempts": attempts + 1,
+            }
+        finally:
+            connection.close()
+
+    def _update_lease(self, job, shard_id, owner, assignments, params):
+        connection = self._connect()
+        try:
+            cursor = connection.execute(
+                f"UPDATE crawl_shards SET {assignments} "
+                "WHERE job = ? AND shard_id = ? AND owner = ? AND state = 'leased'",
+                params + (job, shard_id, owner),
+            )
+            return cursor.rowcount == 1
+        finally:
+            connection.close()
+
+    def heartbeat(self, job, shard_id, owner, lease_seconds):
+        return self._update_lease(
+            job, shard_id, owner, "lease_expires = ?", (time.time() + lease_seconds,)
+        )
+
+    def complete(self, job, shard_id, owner):
+        return self._update_lease(
+            job, shard_id, owner, "state = 'done', lease_expires = NULL", ()
+        )
+
+    def release(self, job, shard_id, owner, state):
+        return self._update_lease(
+            job,
+            shard_id,
+            owner,
+            "state = ?, owner = NULL, lease_expires = NULL",
+            (state,),
+        )
+
+    def progress(self, job):
+        connection = self._connect()
+        try:
+            now = time.time()
+            counts = {}
+            for state, expired, count in connection.execute(
+                "SELECT state, state = 'leased' AND lease_expires < ?, COUNT(*) "
+                "FROM crawl_shards WHERE job = ? GROUP BY 1, 2",
+                (now, job),
+            ):
+                # 만료된 임대는 다시 가져갈 수 있으므로 대기 중으로 센다
+                key = "pending" if expired else state
+                counts[key] = counts.get(key, 0) + count
+            return counts
+        finally:
+            connection.close()
+
+
+class SupabaseShardBackend:
+    """
+    Supabase(PostgREST)의 crawl_shards 테이블과 임대 함수를 사용하는 작업 큐.
+    임대 만료는 DB 서버 시각으로 판단하므로 노드 사이의 시계 차이에 영향받지 않습니다.
+    테이블과 함수는 sql/crawl_shards.sql로 만듭니다.
+
+    Args:
+        supabase_url (str): Supabase URL. None이면 SUPABASE_URL 환경 변수
+        supabase_key (str): Supabase 키. None이면 SUPABASE_KEY 환경 변수
+    """
+
+    def __init__(self, supabase_url=None, supabase_key=None):
+        self.base_url = f"{supabase_url or os.getenv('SUPABASE_URL')}/rest/v1"
+        key = supabase_key or os.getenv("SUPABASE_KEY")
+        self.headers = {
+            "apikey": key,
+            "Authorization": f"Bearer {key}",
+            "Content-Type": "application/json",
+        }
+
+    def _request(self, method, path, params=None, body=None, prefer=None):
+        headers = dict(self.headers)
+        if prefer:
+            headers["Prefer"] = prefer
+        response = requests.request(
+            method,
+            f"{self.base_url}/{path}",
+            headers=headers,
+            params=params,
+            json=body,
+            timeout=TIMEOUT,
+        )
+        if response.status_code >= 300:
+            raise RuntimeError(
+                f"샤드 큐 요청 오류. 상태 코드: {response.status_code}, "
+                f"오류 내용: {response.text}"
+            )
+        return response.json() if response.content else None
+
+    def _rpc(self, function_name, **arguments):
+        return self._request("POST", f"rpc/{function_name}", body=arguments)
+
+    def publish(self, job, shards):
+        rows = [
+            {"job": job, "shard_id": shard_id, "numbers": runs, "priority": priority}
+            for priority, (shard_id, runs) in enumerate(shards.items())
+        ]
+        for i in range(0, len(rows), 500):
+            self._request(
+                "POST",
+                SHARD_TABLE,
+                params={"on_conflict": "job,shard_id"},
+                body=rows[i : i + 500],
+                prefer="resolution=ignore-duplicates,return=minimal",
+            )
+
+    def start_plan(self, job, owner, lease_seconds):
+        return self._rpc(
+            "start_crawl_plan",
+            p_job=job,
+            p_owner=owner,
+            p_lease_seconds=lease_seconds,
+        )
+
+    def renew_plan(self, job, owner, lease_seconds):
+        return bool(
+            self._rpc(
+                "renew_crawl_plan",
+                p_job=job,
+                p_owner=owner,
+                p_lease_seconds=lease_seconds,
+            )
+        )
+
+    def _update_plan(self, method, job, owner, values=None):
+        rows = self._request(
+            method,
+            PLAN_TABLE,
+            params={
+                "job": f"eq.{job}",
+                "owner": f"eq.{owner}",
+                "state": "eq.planning",
+                "select": "job",
+            },
+            body=values,
+            prefer="return=representation",
+        )
+        return bool(rows)
+
+    def finish_plan(self, job, owner):
+        return self._update_plan(
+            "PATCH", job, owner, {"state": "published", "lease_expires": None}
+        )
+
+    def abandon_plan(self, job, owner):
+        return self._update_plan("DELETE", job, owner)
+
+    def claim(self, job, owner, lease_seconds):
+        rows = self._rpc(
+            "claim_crawl_shard",
+            p_job=job,
+            p_owner=owner,
+            p_lease_seconds=lease_seconds,
+        )
+        if not rows:
+            return None
+        row = rows[0]
+        return {
+            "shard_id": row["shard_id"],
+            "numbers": row["numbers"],
+            "attempts": row["attempts"],
+        }
+
+    def heartbeat(self, job, shard_id, owner, lease_seconds):
+        return bool(
+            self._rpc(
+                "renew_crawl_shard",
+                p_job=job,
+                p_shard_id=shard_id,
+                p_owner=owner,
+                p_lease_seconds=lease_seconds,
+            )
+        )
+
+    def _update_lease(self, job, shard_id, owner, values):
+        rows = self._request(
+            "PATCH",
+            SHARD_TABLE,
+            params={
+                "job": f"eq.{job}",
+                "shard_id": f"eq.{shard_id}",
+                "owner": f"eq.{owner}",
+                "state": "eq.leased",
+                "select": "shard_id",
+            },
+            body=values,
+            prefer="return=representation",
+        )
+        return bool(rows)
+
+    def complete(self, job, shard_id, owner):
+        return self._update_lease(
+            job, shard_id, owner, {"state": "done", "lease_expires": None}
+        )
+
+    def release(self, job, shard_id, owner, state):
+        return self._update_lease(
+            job,
+            shard_id,
+            owner,
+            {"state": state, "owner": None, "lease_expires": None},
+        )
+
+    def progress(self, job):
+        counts = {}
+        for row in self._rpc("crawl_shard_progress", p_job=job) or []:
+            counts[row["state"]] = row["count"]
+        return counts
+
+
+def open_shard_backend(spec):
+    """
+    큐 지정 문자열로 샤드 큐 저장소를 엽니다.
+
+    Args:
+        spec (str): "supabase" 또는 "sqlite" / "sqlite:<파일 경로>"
+
+    Returns:
+        SQLiteShardBackend or SupabaseShardBackend: 샤드 큐 저장소
+    """
+    if spec == "supabase":
+        return SupabaseShardBackend()
+    if spec == "sqlite":
+        return SQLiteShardBackend()
+    if spec.startswith("sqlite:"):
+        return SQLiteShardBackend(spec[len("sqlite:") :])
+    raise ValueError(f"알 수 없는 샤드 큐입니다: {spec}")
+
+
+class _LeaseHeartbeat(threading.Thread):
+    """샤드를 크롤링하거나 번호를 계획하는 동안 주기적으로 임대를 연장하는 스레드."""
+
+    def __init__(self, queue, name, renew):
+        super().__init__(daemon=True)
+        self.queue = queue
+        self.name = name
+        self.renew = renew
+        self.stopped = threading.Event()
+        self.lost = False
+
+    def run(self):
+        interval = max(1.0, self.queue.lease_seconds / 3)
+        while not self.stopped.wait(interval):
+            try:
+                renewed = self.renew()
+            except Exception as e:
+                print(f"{self.name} 임대 연장 중 오류 발생: {str(e)}")
+                continue
+            if not renewed and not self.lost:
+                # 업서트는 중복돼도 안전하므로 크롤링은 멈추지 않고 알리기만 한다
+                self.lost = True
+                print(f"{self.name}의 임대를 다른 노드가 가져갔습니다.")
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+
+class ShardQueue:
+    """
+    샤드 작업 큐에서 임대한 샤드를 차례로 크롤링하는 노드 설정.
+
+    Args:
+        backend (SQLiteShardBackend or SupabaseShardBackend): 샤드 큐 저장소
+        job (str): 작업 이름. 같은 이름을 쓰는 노드끼리 샤드를 나눠 가짐.
+            None이면 오늘 날짜
+        node_id (str): 노드 이름. None이면 "호스트 이름-프로세스 ID"
+        lease_seconds (int): 하트비트 없이 임대가 유지되는 시간(초)
+        shard_span (int): 샤드 하나가 맡을 번호 구간 길이
+    """
+
+    def __init__(
+        self,
+        backend,
+        job=None,
+        node_id=None,
+        lease_seconds=DEFAULT_LEASE_SECONDS,
+        shard_span=DEFAULT_SHARD_SPAN,
+    ):
+        self.backend = backend
+        self.job = job or datetime.now().strftime("%Y%m%d")
+        self.node_id = node_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.lease_seconds = lease_seconds
+        self.shard_span = shard_span
+        self.plan_heartbeats = {}  # 이 노드가 계획 중인 작업별 임대 연장 스레드
+
+    def get_job_name(self, table_name):
+        """테이블별 작업 이름을 반환합니다."""
+        return f"{self.job}/{table_name}"
+
+    def acquire_plan(self, table_name):
+        """
+        작업의 번호 계획(탐색)을 이 노드가 맡을지 정합니다.
+        다른 노드가 계획하는 중이면 계획이 올라오거나 그 노드의 임대가 만료될 때까지
+        기다립니다. 계획을 맡으면 run으로 올릴 때까지 계획 임대를 연장합니다.
+
+        Args:
+            table_name (str): 업로드할 Supabase 테이블 이름
+
+        Returns:
+            bool: 이 노드가 번호를 계획해야 하면 True,
+                다른 노드가 올린 계획이 있으면 False
+        """
+        job = self.get_job_name(table_name)
+        waiting = False
+        while True:
+            try:
+                state = self.backend.start_plan(job, self.node_id, self.lease_seconds)
+            except Exception as e:
+                # 같은 샤드는 먼저 올라간 것만 남으므로 직접 계획해도 안전하다
+                print(f"샤드 작업 계획 확인 중 오류 발생: {str(e)}")
+                return True
+
+            if state == "planning":
+                heartbeat = _LeaseHeartbeat(
+                    self,
+                    "번호 계획",
+                    lambda: self.backend.renew_plan(
+                        job, self.node_id, self.lease_seconds
+                    ),
+                )
+                heartbeat.start()
+                self.plan_heartbeats[job] = heartbeat
+                return True
+            if state == "published":
+                print(
+                    f"샤드 작업 '{job}'의 계획이 이미 있으므로 번호 탐색을 건너뜁니다."
+                )
+                return False
+
+            if not waiting:
+                waiting = True
+                print(f"다른 노드가 샤드 작업 '{job}'의 번호를 계획하는 중입니다...")
+            time.sleep(min(30, self.lease_seconds / 4))
+
+    def _end_plan(self, job, published):
+        heartbeat = self.plan_heartbeats.pop(job, None)
+        if heartbeat is None:
+            return
+        heartbeat.stop()
+        try:
+            if published:
+                self.backend.finish_plan(job, self.node_id)
+            else:
+                self.backend.abandon_plan(job, self.node_id)
+        except Exception as e:
+            print(f"샤드 작업 계획 상태 기록 중 오류 발생: {str(e)}")
+
+    def abandon_plan(self, table_name):
+        """
+        계획을 올리지 못했을 때 다른 노드가 이어서 계획하도록 계획 임대를 반납합니다.
+
+        Args:
+            table_name (str): 업로드할 Supabase 테이블 이름
+        """
+        self._end_plan(self.get_job_name(table_name), published=False)
+
+    def run(self, table_name, numbers, run_shard, crawl_budget=None):
+        """
+        번호 목록을 샤드로 올리고, 남은 샤드가 없을 때까지 임대해 크롤링합니다.
+        다른 노드가 임대 중인 샤드가 남아 있으면 끝나거나 만료될 때까지 기다립니다.
+        acquire_plan으로 계획을 맡은 노드는 샤드를 올린 뒤 계획을 완료로 표시합니다.
+
+        Args:
+            table_name (str): 업로드할 Supabase 테이블 이름
+            numbers (iterable): 이 노드가 계획한 우선순위 순서의 크롤링할 번호 목록.
+                다른 노드의 계획을 나눠 받기만 하면 빈 목록
+            run_shard (function): (번호 목록, 샤드 이름)을 받아 크롤링하고
+                성공 여부를 반환하는 함수
+            crawl_budget (CrawlBudget, optional): 예산을 다 쓰면 샤드를 더 임대하지 않고,
+                중간에 멈춘 샤드는 다른 노드가 이어받도록 반납
+
+        Returns:
+            bool: 이 노드가 맡은 샤드를 모두 성공했고 실패한 샤드가 없으면 True
+        """
+        job = self.get_job_name(table_name)
+        try:
+            shards = split_into_shards(numbers, self.shard_span)
+            self.backend.publish(job, shards)
+        except Exception as e:
+            print(f"샤드 작업 등록 중 오류 발생: {str(e)}")
+            self._end_plan(job, published=False)
+            return False
+        self._end_plan(job, published=True)
+
+        if shards:
+            print(
+                f"샤드 작업 '{job}'에 샤드 {len(shards)}개를 등록했습니다. "
+                f"(노드: {self.node_id}, 샤드 구간: {self.shard_span})"
+            )
+
+        success = True
+        shard_count = 0
+        while not (crawl_budget and crawl_budget.exhausted()):
+            try:
+                lease = self.backend.claim(job, self.node_id, self.lease_seconds)
+                if lease is None:
+                    counts = self.backend.progress(job)
+                    if not counts.get("pending") and not counts.get("leased"):
+                        break
+                    time.sleep(min(30, self.lease_seconds / 4))
+                    continue
+            except Exception as e:
+                print(f"샤드 임대 중 오류 발생: {str(e)}")
+                return False
+
+            shard_count += 1
+            shard_id = lease["shard_id"]
+            shard_numbers = decode_numbers(lease["numbers"])
+            print(
+                f"\n샤드 {shard_id} 임대 (번호 {len(shard_numbers)}개, "
+                f"시도 {lease['attempts']}회)"
+            )
+
+            heartbeat = _LeaseHeartbeat(
+                self,
+                f"샤드 {shard_id}",
+                lambda: self.backend.heartbeat(
+                    job, shard_id, self.node_id, self.lease_seconds
+                ),
+            )
+            heartbeat.start()
+            try:
+                shard_success = run_shard(shard_numbers, f"shard{shard_id}")
+            except Exception as e:
+                print(f"샤드 {shard_id} 크롤링 중 오류 발생: {str(e)}")
+                shard_success = False
+            finally:
+                heartbeat.stop()
+
+            try:
+                if shard_success and crawl_budget and crawl_budget.stopped_reason:
+                    # 예산 때문에 미룬 번호가 남았을 수 있으므로 완료로 표시하지 않는다
+                    self.backend.release(job, shard_id, self.node_id, "pending")
+                elif shard_success:
+                    self.backend.complete(job, shard_id, self.node_id)
+                else:
+                    # 여러 번 실패한 샤드는 다른 노드도 실패할 가능성이 높으므로 멈춘다
+                    state = (
+                        "failed"
+                        if lease["attempts"] >= MAX_SHARD_ATTEMPTS
+                        else "pending"
+                    )
+                    self.backend.release(job, shard_id, self.node_id, state)
+                    success = False
+            except Exception as e:
+                print(f"샤드 {shard_id} 상태 기록 중 오류 발생: {str(e)}")
+                success = False
+
+        try:
+            counts = self.backend.progress(job)
+        except Exception as e:
+            # 이 노드가 맡은 샤드의 상태는 이미 기록했으므로 결과만 알 수 없다
+            print(f"샤드 작업 진행 상황 조회 중 오류 발생: {str(e)}")
+            print(f"샤드 작업 '{job}' 종료: 이 노드가 {shard_count}개 처리")
+            return success
+
+        print(
+            f"샤드 작업 '{job}' 종료: 이 노드가 {shard_count}개 처리, "
+            f"전체 완료 {counts.get('done', 0)}개, 실패 {counts.get('failed', 0)}개"
+        )
+        return success and not counts.get("failed")
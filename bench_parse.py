@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+
+"""
+HTML 추출 성능 비교 스크립트
+
+BeautifulSoup 셀렉터 경로와 미리 컴파일한 lxml XPath 경로의 추출 결과가 같은지
+확인하고, 페이지당 처리 시간을 비교합니다.
+"""
+
+import sys
+import time
+from all_songs import ky_crawler, tj_crawler
+from utils.archive import iter_archive
+
+REPEAT = 200  # 샘플 페이지 반복 횟수
+
+# 금영 검색 결과 샘플 페이지
+KY_SAMPLE_HTML = """
+<html><head><title>금영 노래방</title></head><body>
+<ul class="search_chart">
+  <li class="search_chart_list search_chart_head"><span>번호</span><span>곡명</span></li>
+  <li class="search_chart_list">
+    <span class="search_chart_num">1234</span>
+    <span class="search_chart_tit"><span class="tit">좋은 날</span><span class="sub">MR</span></span>
+    <span class="search_chart_sng">아이유</span>
+    <span class="search_chart_cmp">이민수</span>
+    <span class="search_chart_wrt">김이나</span>
+    <span class="search_chart_rel">2010-12-09</span>
+  </li>
+</ul>
+</body></html>
+"""
+
+# 태진 검색 결과 샘플 페이지
+TJ_SAMPLE_HTML = """
+<html><head><title>TJ미디어</title></head><body>
+<ul class="chart-list-area">
+  <li class="grid-container list-header"><div class="grid-item">헤더</div></li>
+  <li class="grid-container">
+    <div class="grid-item center"><p class="num2"><span class="highlight">1234</span></p></div>
+    <div class="grid-item title3">
+      <div class="flex-box"><p><span class="tag">MR</span></p><p><span>좋은 날</span></p></div>
+    </div>
+    <div class="grid-item title4 singer"><p><span>아이유</span></p></div>
+  </li>
+</ul>
+</body></html>
+"""
+
+
+def print_separator():
+    """구분선을 출력합니다."""
+    print("=" * 60)
+
+
+def measure(extract_func, pages):
+    """페이지 목록을 모두 추출하는 데 걸린 페이지당 시간(마이크로초)을 반환합니다."""
+    started = time.perf_counter()
+    for html in pages:
+        extract_func(html)
+    return (time.perf_counter() - started) / len(pages) * 1_000_000
+
+
+def compare(name, crawler, pages):
+    """한 크롤러의 두 추출 경로를 비교합니다."""
+    print(f"[{name}] 페이지 {len(pages)}개")
+
+    # 결과가 다르면 속도 비교는 의미가 없으므로 먼저 확인
+    mismatches = sum(
+        1
+        for html in pages
+        if crawler._extract_song_rows_lxml(html) != crawler._extract_song_rows_bs4(html)
+    )
+    if mismatches:
+        print(f"  결과 불일치: {mismatches}개 페이지")
+
+    bs4_time = measure(crawler._extract_song_rows_bs4, pages)
+    lxml_time = measure(crawler._extract_song_rows_lxml, pages)
+
+    print(f"  BeautifulSoup: {bs4_time:.1f}µs/페이지")
+    print(f"  lxml XPath:    {lxml_time:.1f}µs/페이지")
+    print(f"  속도 향상:     {bs4_time / lxml_time:.1f}배")
+    print_separator()
+
+
+def load_archive_pages(path):
+    """재생 아카이브에서 크롤러별 검색 결과 페이지를 읽어옵니다."""
+    pages = {"금영": [], "태진": []}
+    for record in iter_archive(path):
+        if record["status"] != 200:
+            continue
+        if "kysing.kr/search" in record["url"]:
+            pages["금영"].append(record["content"].decode("utf-8", "replace"))
+        elif "tjmedia.com/song" in record["url"]:
+            pages["태진"].append(record["content"].decode("utf-8", "replace"))
+    return pages
+
+
+def main():
+    # 커맨드 라인에서 아카이브 경로를 받은 경우 실제 페이지로 비교
+    if len(sys.argv) > 1:
+        print(f"==== 아카이브 페이지로 추출 성능 비교: {sys.argv[1]} ====")
+        pages = load_archive_pages(sys.argv[1])
+    # 샘플 페이지 사용
+    else:
+        print("==== 샘플 페이지로 추출 성능 비교 ====")
+        print("실제 페이지로 비교하려면: python bench_parse.py <아카이브 경로>\n")
+        pages = {
+            "금영": [KY_SAMPLE_HTML] * REPEAT,
+            "태진": [TJ_SAMPLE_HTML] * REPEAT,
+        }
+
+    crawlers = {"금영": ky_crawler, "태진": tj_crawler}
+    for name, crawler in crawlers.items():
+        if pages[name]:
+            compare(name, crawler, pages[name])
+
+
+if __name__ == "__main__":
+    main()
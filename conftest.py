@@ -0,0 +1,29 @@
+"""
+pytest 공통 설정
+
+utils 패키지는 가져올 때 Supabase 클라이언트를 만들므로, 연결 정보가 없으면
+테스트용 값을 넣어 둡니다. 테스트는 실제 Supabase에 요청하지 않습니다.
+"""
+
+import os
+import threading
+import pytest
+
+os.environ.setdefault("SUPABASE_URL", "http://127.0.0.1:9")
+os.environ.setdefault(
+    "SUPABASE_KEY",
+    "eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9.eyJyb2xlIjoiYW5vbiJ9.test",
+)
+
+
+@pytest.fixture
+def state_dir(tmp_path, monkeypatch):
+    """크롤러 상태 파일(저널, 캐시, 미러 등)을 테스트마다 임시 디렉터리에 둡니다."""
+    import utils.state
+    import utils.mirror
+    import utils.http_cache
+
+    monkeypatch.setattr(utils.state, "STATE_DIR", str(tmp_path))
+    monkeypatch.setattr(utils.mirror, "_local", threading.local())
+    monkeypatch.setattr(utils.http_cache, "_local", threading.local())
+    return tmp_path
@@ -1,39 +1,238 @@
 #!/usr/bin/env python
 
 import sys
+import time
 import argparse
 from datetime import datetime
-from all_songs import crawl_kumyoung, crawl_taejin
+from all_songs import crawl_kumyoung, crawl_taejin, refresh_kumyoung, refresh_taejin
 from popular_songs import crawl_kumyoung_popular, crawl_taejin_popular
+from all_songs.utils import ShardQueue, CrawlBudget, open_shard_backend
+from utils import configure_transport, reset_transport_stats
 
 
 def main():
     parser = argparse.ArgumentParser(description="노래방 크롤링 도구")
     parser.add_argument(
         "service",
-        choices=["kumyoung", "taejin", "all", "ky_popular", "tj_popular"],
-        help="크롤링할 노래방 서비스: 'kumyoung', 'taejin', 'all', 'ky_popular', 'tj_popular'",
+        choices=["kumyoung", "taejin", "all", "ky_popular", "tj_popular", "refresh"],
+        help="크롤링할 노래방 서비스: 'kumyoung', 'taejin', 'all', 'ky_popular', "
+        "'tj_popular', 'refresh'(기존 곡을 다시 확인해 바뀐 행만 업서트)",
+    )
+    parser.add_argument(
+        "--engine",
+        choices=["process", "async", "pipeline"],
+        default="process",
+        help="전체곡 크롤링 엔진: 'process'(멀티프로세싱), 'async'(asyncio/aiohttp), "
+        "'pipeline'(비동기 요청 + 프로세스 풀 파싱)",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=None,
+        help="async/pipeline 엔진의 최대 동시 요청 수 (기본값: 크롤러 설정)",
+    )
+    parser.add_argument(
+        "--parse-processes",
+        type=int,
+        default=None,
+        help="pipeline 엔진의 파싱 프로세스 수 (기본값: CPU 수)",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="전체곡 결과를 모으지 않고 도착하는 대로 업로드 (엑셀 저장 생략)",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="이전 실행의 체크포인트 저널을 복원하고 남은 번호부터 이어서 크롤링",
+    )
+    parser.add_argument(
+        "--full-scan",
+        action="store_true",
+        help="금영 전체곡을 번호 탐색 없이 설정된 범위 전체에서 크롤링",
+    )
+    parser.add_argument(
+        "--http2",
+        action="store_true",
+        help="httpx/h2 기반 HTTP/2 세션으로 요청",
+    )
+    parser.add_argument(
+        "--ky-max-rps",
+        type=float,
+        default=None,
+        help="kysing.kr 초당 최대 요청 수 (0이면 제한 없음, 기본값: KY_MAX_RPS 또는 20)",
+    )
+    parser.add_argument(
+        "--tj-max-rps",
+        type=float,
+        default=None,
+        help="tjmedia.com 초당 최대 요청 수 (0이면 제한 없음, 기본값: TJ_MAX_RPS 또는 20)",
+    )
+    parser.add_argument(
+        "--cache",
+        choices=["off", "revalidate", "reuse"],
+        default=None,
+        help="원본 HTML 캐시: 'off', 'revalidate'(TTL/ETag 재검증), 'reuse'(있으면 항상 사용)",
+    )
+    parser.add_argument(
+        "--cache-ttl",
+        type=float,
+        default=None,
+        help="검증자 없는 캐시 응답을 그대로 쓸 시간(초, 기본값: CRAWLER_CACHE_TTL 또는 86400)",
+    )
+    parser.add_argument(
+        "--time-budget",
+        type=float,
+        default=None,
+        help="전체곡 크롤링에 쓸 시간(초). 마감 전에 새 요청을 멈추고 받은 결과를 업로드한 뒤 "
+        "미룬 번호를 보고 (번호 계획 시간 포함)",
+    )
+    parser.add_argument(
+        "--request-budget",
+        type=int,
+        default=None,
+        help="전체곡 크롤링에서 요청할 최대 번호 수 (재시도 포함, 여러 서비스가 나눠 씀)",
+    )
+    parser.add_argument(
+        "--refresh-limit",
+        type=int,
+        default=None,
+        help="refresh에서 노래방마다 다시 확인할 기존 곡 수 (기본값: REFRESH_LIMIT 또는 2000)",
+    )
+    parser.add_argument(
+        "--refresh-max-rps",
+        type=float,
+        default=2.0,
+        help="refresh의 호스트별 초당 최대 요청 수. 탐색 크롤링과 함께 돌릴 수 있도록 "
+        "낮게 유지 (--ky-max-rps/--tj-max-rps가 우선, 기본값: 2)",
+    )
+    parser.add_argument(
+        "--shard-queue",
+        metavar="SPEC",
+        default=None,
+        help="전체곡 번호를 샤드로 나눠 여러 노드가 임대해 크롤링할 작업 큐: "
+        "'sqlite', 'sqlite:<파일 경로>'(로컬), 'supabase'(sql/crawl_shards.sql)",
+    )
+    parser.add_argument(
+        "--shard-job",
+        default=None,
+        help="샤드 작업 이름. 같은 이름을 쓰는 노드끼리 샤드를 나눠 가짐 (기본값: 오늘 날짜)",
+    )
+    parser.add_argument(
+        "--node-id",
+        default=None,
+        help="샤드를 임대하는 노드 이름 (기본값: 호스트 이름-프로세스 ID)",
+    )
+    parser.add_argument(
+        "--lease-seconds",
+        type=int,
+        default=300,
+        help="하트비트 없이 샤드 임대가 유지되는 시간(초, 기본값: 300)",
+    )
+    parser.add_argument(
+        "--shard-span",
+        type=int,
+        default=10000,
+        help="샤드 하나가 맡을 번호 구간 길이 (기본값: 10000)",
+    )
+    parser.add_argument(
+        "--chart-publish",
+        choices=["truncate", "generation"],
+        default="truncate",
+        help="인기 차트 업로드 방식: 'truncate'(테이블을 비우고 삽입) 또는 "
+        "'generation'(새 세대로 넣은 뒤 전환, sql/chart_generations.sql 필요)",
+    )
+    archive_group = parser.add_mutually_exclusive_group()
+    archive_group.add_argument(
+        "--record",
+        metavar="PATH",
+        default=None,
+        help="모든 HTTP 교환을 아카이브 파일(gzip JSONL)에 기록",
+    )
+    archive_group.add_argument(
+        "--replay",
+        metavar="PATH",
+        default=None,
+        help="네트워크 없이 아카이브 파일의 응답으로 파싱만 다시 실행",
     )
 
     args = parser.parse_args()
     service = args.service
 
+    rate_limits = {}
+    if args.ky_max_rps is not None:
+        rate_limits["kysing.kr"] = args.ky_max_rps
+    if args.tj_max_rps is not None:
+        rate_limits["tjmedia.com"] = args.tj_max_rps
+    if service == "refresh":
+        rate_limits.setdefault("kysing.kr", args.refresh_max_rps)
+        rate_limits.setdefault("tjmedia.com", args.refresh_max_rps)
+    configure_transport(
+        http2=args.http2 or None,
+        rate_limits=rate_limits,
+        cache_mode=args.cache,
+        cache_ttl=args.cache_ttl,
+        record_path=args.record,
+        replay_path=args.replay,
+    )
+    crawl_options = {
+        "engine": args.engine,
+        "concurrency": args.concurrency,
+        "parse_processes": args.parse_processes,
+        "stream": args.stream,
+        "resume": args.resume,
+        "dry_run": bool(args.replay),
+    }
+    if args.time_budget is not None or args.request_budget is not None:
+        crawl_options["crawl_budget"] = CrawlBudget(
+            deadline=(
+                time.time() + args.time_budget if args.time_budget is not None else None
+            ),
+            max_requests=args.request_budget,
+        )
+    if args.shard_queue and not args.replay and service != "refresh":
+        crawl_options["shard_queue"] = ShardQueue(
+            open_shard_backend(args.shard_queue),
+            job=args.shard_job,
+            node_id=args.node_id,
+            lease_seconds=args.lease_seconds,
+            shard_span=args.shard_span,
+        )
+    if args.replay:
+        # 아카이브의 응답은 다시 요청해도 바뀌지 않으므로 재시도하지 않는다
+        crawl_options["max_retry_rounds"] = 0
+    # 재생 모드는 파싱만 다시 실행하므로 Supabase에 업로드하지 않는다
+    chart_options = {"dry_run": bool(args.replay), "update_mode": args.chart_publish}
+
     start_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     print(f"\n--- 크롤링 시작: {start_time} ---\n")
 
     success = False
 
+    # 번호 탐색은 빈 구간이 많은 금영 전체곡에만 사용
+    ky_options = {**crawl_options, "full_scan": args.full_scan}
+
     if service == "kumyoung":
-        success = crawl_kumyoung()
+        success = crawl_kumyoung(**ky_options)
     elif service == "taejin":
-        success = crawl_taejin()
+        success = crawl_taejin(**crawl_options)
     elif service == "ky_popular":
-        success = crawl_kumyoung_popular()
+        success = crawl_kumyoung_popular(**chart_options)
     elif service == "tj_popular":
-        success = crawl_taejin_popular()
+        success = crawl_taejin_popular(**chart_options)
+    elif service == "refresh":
+        refresh_options = {**crawl_options, "limit": args.refresh_limit}
+        tj_success = refresh_taejin(**refresh_options)
+        # 태진 요청이 금영 연결 통계에 섞이지 않게 한다
+        reset_transport_stats()
+        ky_success = refresh_kumyoung(**refresh_options)
+        success = tj_success and ky_success
     elif service == "all":
-        tj_success = crawl_taejin()
-        ky_success = crawl_kumyoung()
+        tj_success = crawl_taejin(**crawl_options)
+        # 태진 요청이 금영 연결 통계에 섞이지 않게 한다
+        reset_transport_stats()
+        ky_success = crawl_kumyoung(**ky_options)
         success = tj_success and ky_success
 
     end_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
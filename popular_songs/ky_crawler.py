@@ -1,7 +1,14 @@
-import requests
 import datetime
 from bs4 import BeautifulSoup
 from dotenv import load_dotenv
+from utils import (
+    http_get,
+    has_class,
+    compile_xpath,
+    parse_html,
+    select_text,
+    extract_with_fallback,
+)
 from popular_songs.utils import run_chart_crawler
 
 # 환경 변수 로드
@@ -33,53 +40,74 @@ BROWSER_HEADERS = {
     "Connection": "keep-alive",
 }
 
+# 차트 항목 셀렉터 (BeautifulSoup 대체 경로용 CSS와 미리 컴파일한 XPath)
+CHART_FIELD_SELECTORS = {
+    "number": ".popular_chart_num",
+    "title": ".popular_chart_tit .tit",
+    "singer": ".popular_chart_sng",
+    "composer": ".popular_chart_cmp",
+    "lyricist": ".popular_chart_wrt",
+    "release_date": ".popular_chart_rel",
+}
+CHART_ITEMS_XPATH = compile_xpath(f"//*[{has_class('popular_chart_list')}]")
+CHART_FIELD_XPATHS = {
+    "number": compile_xpath(f".//*[{has_class('popular_chart_num')}]"),
+    "title": compile_xpath(
+        f".//*[{has_class('popular_chart_tit')}]//*[{has_class('tit')}]"
+    ),
+    "singer": compile_xpath(f".//*[{has_class('popular_chart_sng')}]"),
+    "composer": compile_xpath(f".//*[{has_class('popular_chart_cmp')}]"),
+    "lyricist": compile_xpath(f".//*[{has_class('popular_chart_wrt')}]"),
+    "release_date": compile_xpath(f".//*[{has_class('popular_chart_rel')}]"),
+}
+
+
+def _extract_chart_rows_lxml(html):
+    chart_items = CHART_ITEMS_XPATH(parse_html(html))
+
+    # 첫 번째 행은 헤더이므로 건너뛰기
+    return [
+        {field: select_text(item, xpath) for field, xpath in CHART_FIELD_XPATHS.items()}
+        for item in chart_items[1:]
+    ]
+
+
+def _extract_chart_rows_bs4(html):
+    soup = BeautifulSoup(html, "lxml")
+    chart_items = soup.select(".popular_chart_list")
+
+    # 첫 번째 행은 헤더이므로 건너뛰기
+    rows = []
+    for item in chart_items[1:]:
+        row = {}
+        for field, selector in CHART_FIELD_SELECTORS.items():
+            element = item.select_one(selector)
+            row[field] = element.text.strip() if element else None
+        rows.append(row)
+    return rows
+
+
+def extract_chart_rows(html):
+    """인기 차트 페이지의 항목별 원본 텍스트를 추출합니다."""
+    return extract_with_fallback(
+        _extract_chart_rows_lxml, _extract_chart_rows_bs4, html
+    )
+
 
 def crawl_page(range_num, start_rank):
     url = f"https://kysing.kr/popular/?period=m&range={range_num}"
     page_results = []
 
     try:
-        response = requests.get(url, headers=BROWSER_HEADERS, timeout=TIMEOUT)
+        response = http_get(url, headers=BROWSER_HEADERS, timeout=TIMEOUT)
         response.raise_for_status()
 
-        soup = BeautifulSoup(response.text, "lxml")
-        chart_items = soup.select(".popular_chart_list")
-
-        # 첫 번째 행은 헤더이므로 건너뛰기, 모든 항목 처리
-        for i, item in enumerate(chart_items[1:], 1):
-            try:
-                number_el = item.select_one(".popular_chart_num")
-                title_el = item.select_one(".popular_chart_tit .tit")
-                singer_el = item.select_one(".popular_chart_sng")
-                composer_el = item.select_one(".popular_chart_cmp")
-                lyricist_el = item.select_one(".popular_chart_wrt")
-                release_date_el = item.select_one(".popular_chart_rel")
-
-                rank = start_rank + i - 1
-                number = number_el.text.strip() if number_el else None
-                title = title_el.text.strip() if title_el else None
-                singer = singer_el.text.strip() if singer_el else None
-                composer = composer_el.text.strip() if composer_el else None
-                lyricist = lyricist_el.text.strip() if lyricist_el else None
-                release_date = release_date_el.text.strip() if release_date_el else None
-                created_at = datetime.date.today().isoformat()
-
-                page_results.append(
-                    {
-                        "rank": rank,
-                        "number": number,
-                        "title": title,
-                        "singer": singer,
-                        "composer": composer,
-                        "lyricist": lyricist,
-                        "release_date": release_date,
-                        "created_at": created_at,
-                    }
-                )
-
-            except Exception as e:
-                print(f"항목 {rank} 파싱 중 오류 발생: {str(e)}")
-                continue
+        created_at = datetime.date.today().isoformat()
+
+        # 모든 항목 처리
+        for i, row in enumerate(extract_chart_rows(response.text), 1):
+            rank = start_rank + i - 1
+            page_results.append({"rank": rank, **row, "created_at": created_at})
 
         return page_results
 
@@ -103,13 +131,14 @@ def crawl_popular_chart():
     return all_results
 
 
-def crawl_and_save():
+def crawl_and_save(**chart_options):
     return run_chart_crawler(
         crawler_func=crawl_popular_chart,
         output_file=OUTPUT_FILE,
         table_name=KY_POPULAR_TABLE_NAME,
         data_fields=DATA_FIELDS,
         service_name="금영 노래방 인기 차트",
+        **chart_options,
     )
 
 
@@ -1,7 +1,13 @@
-import requests
 import datetime
 from bs4 import BeautifulSoup
 from dotenv import load_dotenv
+from utils import (
+    http_get,
+    has_class,
+    compile_xpath,
+    parse_html,
+    extract_with_fallback,
+)
 from popular_songs.utils import run_chart_crawler
 
 # 환경 변수 로드
@@ -30,34 +36,53 @@ BROWSER_HEADERS = {
     "Connection": "keep-alive",
 }
 
+# 차트 테이블 셀렉터 (미리 컴파일한 XPath)
+CHART_ROWS_XPATH = compile_xpath(f"//table[{has_class('board_type1')}]//tr")
+CHART_COLUMNS_XPATH = compile_xpath(".//td")
+
+
+def _extract_chart_rows_lxml(html):
+    # 테이블에서 모든 tr 요소 가져오기 (첫 번째는 헤더이므로 제외)
+    rows = CHART_ROWS_XPATH(parse_html(html))[1:]
+    return [
+        [column.text_content().strip() for column in CHART_COLUMNS_XPATH(row)]
+        for row in rows
+    ]
+
+
+def _extract_chart_rows_bs4(html):
+    soup = BeautifulSoup(html, "lxml")
+
+    # 테이블에서 모든 tr 요소 가져오기 (첫 번째는 헤더이므로 제외)
+    rows = soup.select("table.board_type1 tr")[1:]
+    return [[column.text.strip() for column in row.select("td")] for row in rows]
+
+
+def extract_chart_rows(html):
+    """인기 차트 테이블의 행별 칸 텍스트 목록을 추출합니다."""
+    return extract_with_fallback(
+        _extract_chart_rows_lxml, _extract_chart_rows_bs4, html
+    )
+
 
 def crawl_popular_chart():
     url = "https://www.tjmedia.com/tjsong/song_monthPopular.asp"
     all_results = []
 
     try:
-        response = requests.get(url, headers=BROWSER_HEADERS, timeout=TIMEOUT)
+        response = http_get(url, headers=BROWSER_HEADERS, timeout=TIMEOUT)
         response.raise_for_status()
 
         # HTML 파싱 (인코딩 처리)
         html = response.content.decode("utf-8", "replace")
-        soup = BeautifulSoup(html, "lxml")
+        created_at = datetime.date.today().isoformat()
 
-        # 테이블에서 모든 tr 요소 가져오기 (첫 번째는 헤더이므로 제외)
-        rows = soup.select("table.board_type1 tr")[1:]
-
-        for row in rows:
+        for columns in extract_chart_rows(html):
             try:
-                columns = row.select("td")
-
                 if len(columns) < 4:
                     continue
 
-                rank = columns[0].text.strip()
-                number = columns[1].text.strip()
-                title = columns[2].text.strip()
-                singer = columns[3].text.strip()
-                created_at = datetime.date.today().isoformat()
+                rank, number, title, singer = columns[:4]
 
                 all_results.append(
                     {
@@ -81,13 +106,14 @@ def crawl_popular_chart():
         return []
 
 
-def crawl_and_save():
+def crawl_and_save(**chart_options):
     return run_chart_crawler(
         crawler_func=crawl_popular_chart,
         output_file=OUTPUT_FILE,
         table_name=TJ_POPULAR_TABLE_NAME,
         data_fields=DATA_FIELDS,
         service_name="태진 노래방 인기 차트",
+        **chart_options,
     )
 
 
@@ -8,6 +8,7 @@ from utils import (
     upload_to_supabase,
     filter_data_fields,
     calculate_elapsed_time,
+    print_transport_stats,
 )
 
 
@@ -18,6 +19,7 @@ def run_chart_crawler(
     data_fields,
     service_name="노래방 인기 차트",
     update_mode="truncate",
+    dry_run=False,
 ):
     """
     인기 차트 크롤러를 실행하고 결과를 처리합니다.
@@ -28,7 +30,9 @@ def run_chart_crawler(
         table_name (str): 업로드할 Supabase 테이블 이름
         data_fields (list): 데이터 필드 목록
         service_name (str): 크롤링 대상 서비스 이름
-        update_mode (str): Supabase 업로드 모드 (기본값: "truncate")
+        update_mode (str): Supabase 업로드 모드 (기본값: "truncate").
+            "generation"이면 새 세대로 넣은 뒤 포인터를 바꿔 업로드 중에도 이전 차트가 보임
+        dry_run (bool): True면 엑셀만 저장하고 Supabase 업로드는 건너뜀
 
     Returns:
         bool: 크롤링 및 저장 성공 여부
@@ -52,12 +56,18 @@ def run_chart_crawler(
     # 경과 시간 계산
     elapsed_time = calculate_elapsed_time(start_time)
     print(f"크롤링 완료! 총 {len(chart_results)}개 곡, 소요 시간: {elapsed_time:.2f}초")
+    print_transport_stats()
+
+    if dry_run:
+        print("dry-run 모드: Supabase 업로드를 건너뜁니다.")
+        return True
 
     # Supabase에 업로드
     print("\nSupabase에 데이터 업로드 중...")
     upload_data = filter_data_fields(chart_results, data_fields)
 
     # 인기차트는 테이블을 비우고 새로 데이터를 삽입하는 것이 기본
+    # (generation 모드는 테이블을 비우지 않고 새 세대로 교체)
     upload_success = upload_to_supabase(
         upload_data, table_name, update_mode=update_mode
     )
@@ -0,0 +1,132 @@
+-- 인기 차트 세대 발행 (main.py --chart-publish generation)
+-- 새 차트를 <차트>_generations 테이블에 새 세대 번호로 모두 넣은 뒤 포인터만 바꾼다.
+-- 읽는 쪽은 기존 차트 이름의 뷰로 현재 세대만 보므로 업로드 중에도 이전 차트가 보인다.
+
+CREATE TABLE IF NOT EXISTS chart_generations (
+    chart TEXT PRIMARY KEY,
+    generation BIGINT NOT NULL,
+    published_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+-- 기존 차트 테이블을 세대 테이블로 바꾸고 같은 이름의 뷰를 만든다
+-- (기존 행은 세대 0으로 발행된 상태로 남으므로 전환 중에도 빈 차트가 없음)
+DO $$
+DECLARE
+    chart TEXT;
+    generation_table TEXT;
+    con RECORD;
+    idx RECORD;
+BEGIN
+    FOREACH chart IN ARRAY ARRAY['tj_popular_songs', 'ky_popular_songs'] LOOP
+        generation_table := chart || '_generations';
+
+        IF to_regclass(generation_table) IS NULL THEN
+            EXECUTE format('ALTER TABLE %I RENAME TO %I', chart, generation_table);
+            EXECUTE format(
+                'ALTER TABLE %I ADD COLUMN generation BIGINT NOT NULL DEFAULT 0',
+                generation_table
+            );
+            EXECUTE format(
+                'CREATE INDEX %I ON %I (generation)',
+                chart || '_generation_idx', generation_table
+            );
+            INSERT INTO chart_generations (chart, generation)
+            VALUES (chart, 0)
+            ON CONFLICT DO NOTHING;
+        END IF;
+
+        -- 세대마다 같은 순위/번호가 다시 들어가므로, 세대를 포함하지 않는 기존 PK/유니크
+        -- 제약은 (기존 컬럼, generation)으로 다시 만든다 (이미 전환한 테이블도 함께 고침)
+        FOR con IN
+            SELECT c.conname,
+                   c.contype,
+                   string_agg(quote_ident(a.attname), ', ' ORDER BY k.ord) AS columns
+            FROM pg_constraint AS c
+            CROSS JOIN LATERAL unnest(c.conkey) WITH ORDINALITY AS k(attnum, ord)
+            JOIN pg_attribute AS a
+              ON a.attrelid = c.conrelid AND a.attnum = k.attnum
+            WHERE c.conrelid = generation_table::regclass
+              AND c.contype IN ('p', 'u')
+            GROUP BY c.conname, c.contype
+            HAVING NOT bool_or(a.attname = 'generation')
+        LOOP
+            EXECUTE format(
+                'ALTER TABLE %I DROP CONSTRAINT %I', generation_table, con.conname
+            );
+            EXECUTE format(
+                'ALTER TABLE %I ADD CONSTRAINT %I %s (%s, generation)',
+                generation_table,
+                con.conname,
+                CASE con.contype WHEN 'p' THEN 'PRIMARY KEY' ELSE 'UNIQUE' END,
+                con.columns
+            );
+        END LOOP;
+
+        -- 제약 없이 만든 유니크 인덱스도 같은 방식으로 다시 만든다
+        -- (식/부분 인덱스는 세대를 붙여 다시 만들 수 없으므로 지우기만 함)
+        FOR idx IN
+            SELECT ic.relname AS index_name,
+                   bool_and(k.attnum <> 0 AND i.indpred IS NULL) AS rebuildable,
+                   string_agg(quote_ident(a.attname), ', ' ORDER BY k.ord) AS columns
+            FROM pg_index AS i
+            JOIN pg_class AS ic ON ic.oid = i.indexrelid
+            CROSS JOIN LATERAL unnest(i.indkey::int2[]) WITH ORDINALITY AS k(attnum, ord)
+            LEFT JOIN pg_attribute AS a
+              ON a.attrelid = i.indrelid AND a.attnum = k.attnum
+            WHERE i.indrelid = generation_table::regclass
+              AND i.indisunique
+              AND NOT EXISTS (
+                  SELECT 1 FROM pg_constraint AS c WHERE c.conindid = i.indexrelid
+              )
+            GROUP BY i.indexrelid, ic.relname
+            HAVING NOT coalesce(bool_or(a.attname = 'generation'), false)
+        LOOP
+            EXECUTE format('DROP INDEX %I', idx.index_name);
+            IF idx.rebuildable THEN
+                EXECUTE format(
+                    'CREATE UNIQUE INDEX %I ON %I (%s, generation)',
+                    idx.index_name, generation_table, idx.columns
+                );
+            END IF;
+        END LOOP;
+
+        EXECUTE format(
+            'CREATE OR REPLACE VIEW %I WITH (security_invoker = true) AS '
+            'SELECT t.* FROM %I AS t '
+            'JOIN chart_generations AS g ON g.chart = %L AND t.generation = g.generation',
+            chart, generation_table, chart
+        );
+    END LOOP;
+END;
+$$;
+
+-- 포인터를 새 세대로 바꾼다 (늦게 끝난 이전 실행이 더 오래된 세대로 되돌리지 않음)
+CREATE OR REPLACE FUNCTION publish_chart_generation(p_chart TEXT, p_generation BIGINT)
+RETURNS VOID
+LANGUAGE sql AS $$
+    INSERT INTO chart_generations (chart, generation, published_at)
+    VALUES (p_chart, p_generation, now())
+    ON CONFLICT (chart) DO UPDATE
+    SET generation = EXCLUDED.generation,
+        published_at = EXCLUDED.published_at
+    WHERE chart_generations.generation < EXCLUDED.generation;
+$$;
+
+-- p_before보다 오래된 세대 중 현재 세대가 아닌 행을 지운다
+-- (업로드에 실패해 발행되지 않은 세대도 함께 지워지고, 진행 중인 더 새로운 세대는 남음)
+CREATE OR REPLACE FUNCTION gc_chart_generations(p_chart TEXT, p_before BIGINT)
+RETURNS BIGINT
+LANGUAGE plpgsql AS $$
+DECLARE
+    deleted BIGINT;
+BEGIN
+    EXECUTE format(
+        'DELETE FROM %I WHERE generation < $1 AND generation <> '
+        '(SELECT generation FROM chart_generations WHERE chart = $2)',
+        p_chart || '_generations'
+    )
+    USING p_before, p_chart;
+    GET DIAGNOSTICS deleted = ROW_COUNT;
+    RETURN deleted;
+END;
+$$;
@@ -0,0 +1,117 @@
+-- 여러 노드가 나눠 크롤링할 때 사용하는 샤드 작업 큐 (main.py --shard-queue supabase)
+-- 임대 만료는 DB 서버 시각으로 판단한다
+
+CREATE TABLE IF NOT EXISTS crawl_shards (
+    job TEXT NOT NULL,
+    shard_id INTEGER NOT NULL,
+    numbers JSONB NOT NULL,
+    state TEXT NOT NULL DEFAULT 'pending',
+    owner TEXT,
+    lease_expires TIMESTAMPTZ,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    priority INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (job, shard_id)
+);
+
+-- 우선순위 컬럼이 없던 예전 테이블 (샤드는 계획의 우선순위 순서대로 임대)
+ALTER TABLE crawl_shards ADD COLUMN IF NOT EXISTS priority INTEGER NOT NULL DEFAULT 0;
+
+-- 작업별 번호 계획(탐색) 임대. 계획을 맡은 노드 하나만 탐색하고 샤드를 올린다
+CREATE TABLE IF NOT EXISTS crawl_plans (
+    job TEXT PRIMARY KEY,
+    state TEXT NOT NULL,
+    owner TEXT,
+    lease_expires TIMESTAMPTZ
+);
+
+-- 대기 중이거나 임대가 만료된 샤드 하나를 임대한다
+-- (SKIP LOCKED로 동시에 임대하는 노드끼리 같은 샤드를 가져가지 않음)
+CREATE OR REPLACE FUNCTION claim_crawl_shard(
+    p_job TEXT, p_owner TEXT, p_lease_seconds INTEGER
+)
+RETURNS TABLE (shard_id INTEGER, numbers JSONB, attempts INTEGER)
+LANGUAGE sql AS $$
+    UPDATE crawl_shards AS s
+    SET state = 'leased',
+        owner = p_owner,
+        lease_expires = now() + make_interval(secs => p_lease_seconds),
+        attempts = s.attempts + 1
+    WHERE (s.job, s.shard_id) = (
+        SELECT c.job, c.shard_id
+        FROM crawl_shards AS c
+        WHERE c.job = p_job
+          AND (c.state = 'pending' OR (c.state = 'leased' AND c.lease_expires < now()))
+        ORDER BY c.priority, c.shard_id
+        LIMIT 1
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING s.shard_id, s.numbers, s.attempts;
+$$;
+
+-- 아직 임대를 가지고 있으면 만료 시각을 연장한다
+CREATE OR REPLACE FUNCTION renew_crawl_shard(
+    p_job TEXT, p_shard_id INTEGER, p_owner TEXT, p_lease_seconds INTEGER
+)
+RETURNS BOOLEAN
+LANGUAGE sql AS $$
+    WITH renewed AS (
+        UPDATE crawl_shards
+        SET lease_expires = now() + make_interval(secs => p_lease_seconds)
+        WHERE job = p_job AND shard_id = p_shard_id
+          AND owner = p_owner AND state = 'leased'
+        RETURNING 1
+    )
+    SELECT EXISTS (SELECT 1 FROM renewed);
+$$;
+
+-- 상태별 샤드 수 (만료된 임대는 대기 중으로 센다)
+CREATE OR REPLACE FUNCTION crawl_shard_progress(p_job TEXT)
+RETURNS TABLE (state TEXT, count BIGINT)
+LANGUAGE sql STABLE AS $$
+    SELECT CASE WHEN state = 'leased' AND lease_expires < now() THEN 'pending'
+                ELSE state END AS state,
+           COUNT(*)
+    FROM crawl_shards
+    WHERE job = p_job
+    GROUP BY 1;
+$$;
+
+-- 아직 계획이 없거나 계획하던 노드의 임대가 만료되었으면 계획을 맡는다
+-- 'planning': 이 노드가 계획, 'waiting': 다른 노드가 계획 중, 'published': 계획 있음
+CREATE OR REPLACE FUNCTION start_crawl_plan(
+    p_job TEXT, p_owner TEXT, p_lease_seconds INTEGER
+)
+RETURNS TEXT
+LANGUAGE sql AS $$
+    WITH taken AS (
+        INSERT INTO crawl_plans AS p (job, state, owner, lease_expires)
+        VALUES (
+            p_job, 'planning', p_owner, now() + make_interval(secs => p_lease_seconds)
+        )
+        ON CONFLICT (job) DO UPDATE
+        SET owner = EXCLUDED.owner, lease_expires = EXCLUDED.lease_expires
+        WHERE p.state = 'planning' AND p.lease_expires < now()
+        RETURNING 1
+    )
+    SELECT CASE
+        WHEN EXISTS (SELECT 1 FROM taken) THEN 'planning'
+        WHEN (SELECT state FROM crawl_plans WHERE job = p_job) = 'published'
+            THEN 'published'
+        ELSE 'waiting'
+    END;
+$$;
+
+-- 아직 계획 임대를 가지고 있으면 만료 시각을 연장한다
+CREATE OR REPLACE FUNCTION renew_crawl_plan(
+    p_job TEXT, p_owner TEXT, p_lease_seconds INTEGER
+)
+RETURNS BOOLEAN
+LANGUAGE sql AS $$
+    WITH renewed AS (
+        UPDATE crawl_plans
+        SET lease_expires = now() + make_interval(secs => p_lease_seconds)
+        WHERE job = p_job AND owner = p_owner AND state = 'planning'
+        RETURNING 1
+    )
+    SELECT EXISTS (SELECT 1 FROM renewed);
+$$;
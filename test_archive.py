@@ -0,0 +1,49 @@
+"""
+HTTP 교환 기록/재생 아카이브 테스트
+"""
+
+import pytest
+from utils import archive
+
+
+def record_pages(path, count):
+    for number in range(count):
+        archive.record_exchange(
+            str(path),
+            f"https://example.com/search?number={number % 50}",
+            200,
+            {"Content-Type": "text/html; charset=utf-8", "Server": "test"},
+            f"<html>{number} {'가' * (number % 300)}</html>".encode("utf-8"),
+        )
+
+
+@pytest.mark.parametrize("chunk_size", [archive.READ_CHUNK_SIZE, 37])
+def test_record_replay_round_trip(tmp_path, monkeypatch, chunk_size):
+    # 작은 청크에서는 멤버가 읽기 경계에 걸친다
+    monkeypatch.setattr(archive, "READ_CHUNK_SIZE", chunk_size)
+    monkeypatch.setattr(archive, "MEMBER_FEED_SIZE", 16)
+    path = tmp_path / f"exchanges-{chunk_size}.jsonl.gz"
+    record_pages(path, 120)
+
+    records = list(archive.iter_archive(str(path)))
+    assert [record["content"].decode("utf-8").split()[0] for record in records] == [
+        f"<html>{number}" for number in range(120)
+    ]
+    assert records[0]["headers"] == {"Content-Type": "text/html; charset=utf-8"}
+
+    # 같은 URL은 마지막으로 기록한 응답을 재생한다
+    response = archive.replay_response(str(path), "https://example.com/search?number=7")
+    assert response.status_code == 200
+    assert response.content.startswith("<html>107 ".encode("utf-8"))
+    assert archive.has_url(str(path), "https://example.com/search?number=49")
+    with pytest.raises(archive.ArchiveMissError):
+        archive.replay_response(str(path), "https://example.com/search?number=50")
+
+
+def test_truncated_last_member_is_ignored(tmp_path):
+    path = tmp_path / "exchanges.jsonl.gz"
+    record_pages(path, 3)
+    data = path.read_bytes()
+    path.write_bytes(data + data[: len(data) // 3 // 2])
+
+    assert len(list(archive.iter_archive(str(path)))) == 3
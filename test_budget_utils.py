@@ -0,0 +1,80 @@
+"""
+크롤링 예산과 멀티프로세싱 엔진 테스트
+"""
+
+import time
+from all_songs.utils import process_utils
+from all_songs.utils.budget_utils import CrawlBudget, BudgetedNumbers
+
+
+def crawl_number(number):
+    return {"number": str(number), "error": False}
+
+
+def crawl_slow_first(number):
+    if number == 0:
+        time.sleep(1.0)
+    return {"number": str(number), "error": False}
+
+
+def test_process_engine_does_not_read_ahead_of_results():
+    budget = CrawlBudget()
+    numbers = BudgetedNumbers(list(range(1000)), budget)
+    issued_at_result = []
+
+    def on_result(result):
+        budget.record(result)
+        issued_at_result.append(budget.issued)
+
+    assert process_utils.stream_with_multiprocessing(
+        crawl_number, numbers, processes=2, on_result=on_result, chunksize=4
+    )
+
+    # 풀이 번호 목록을 미리 다 읽지 않고, 결과를 받지 않은 번호는 일정 개수까지만 꺼낸다
+    feed_size = 2 * 4 * process_utils.FEED_CHUNKS_PER_PROCESS
+    assert max(
+        issued - completed
+        for completed, issued in enumerate(issued_at_result, start=1)
+    ) <= feed_size
+    assert len(issued_at_result) == budget.issued == 1000
+
+
+def test_slow_number_does_not_stall_other_workers():
+    order = []
+
+    assert process_utils.stream_with_multiprocessing(
+        crawl_slow_first,
+        range(200),
+        processes=2,
+        on_result=lambda result: order.append(result["number"]),
+        chunksize=1,
+    )
+
+    # 느린 번호 하나를 기다리는 동안 다른 워커는 계속 다음 번호를 크롤링한다
+    feed_size = 2 * process_utils.FEED_CHUNKS_PER_PROCESS
+    assert order.index("0") > feed_size * 4
+    assert len(order) == 200
+
+
+def test_process_engine_stops_at_request_budget():
+    budget = CrawlBudget(max_requests=50)
+    numbers = BudgetedNumbers(list(range(1000)), budget)
+    results = []
+
+    def on_result(result):
+        budget.record(result)
+        results.append(result)
+
+    assert process_utils.stream_with_multiprocessing(
+        crawl_number,
+        numbers,
+        processes=2,
+        on_result=on_result,
+        chunksize=4,
+        should_stop=budget.exhausted,
+    )
+
+    assert budget.issued == 50
+    assert budget.run_issued == 50
+    assert len(results) <= 50
+    assert budget.exhausted()
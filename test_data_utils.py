@@ -0,0 +1,43 @@
+"""
+변경 감지(select_changed_rows) 테스트
+"""
+
+from all_songs.utils import data_utils
+
+FIELDS = ["number", "title", "singer", "created_at"]
+
+
+def row(number, title, singer="가수", created_at="2024-01-01"):
+    return {
+        "number": str(number),
+        "title": title,
+        "singer": singer,
+        "created_at": created_at,
+    }
+
+
+def test_select_changed_rows(monkeypatch):
+    mirrored = {
+        "1": row(1, "노래 1"),
+        "2": row(2, "노래 2"),
+        "3": {**row(3, "노래 3"), "singer": None},
+    }
+    requested = []
+
+    def get_mirror_rows(table_name, keys):
+        keys = [str(key) for key in keys]
+        requested.extend(keys)
+        return {key: mirrored[key] for key in keys if key in mirrored}
+
+    monkeypatch.setattr(data_utils, "get_mirror_rows", get_mirror_rows)
+    crawled = [
+        row(1, "노래 1", created_at="2025-06-01"),  # 크롤링 날짜만 다름
+        row(2, "노래 2 (Remix)"),  # 곡명이 바뀜
+        row(3, "노래 3", singer=""),  # 빈 값과 NULL은 같은 값
+        row(4, "노래 4"),  # 미러에 없음
+    ]
+
+    changed = data_utils.select_changed_rows("test_songs", crawled, FIELDS)
+
+    assert [item["number"] for item in changed] == ["2", "4"]
+    assert requested == ["1", "2", "3", "4"]
@@ -0,0 +1,50 @@
+"""
+기존 곡 번호 조회 테스트
+"""
+
+from all_songs.utils import db_utils
+
+
+def fake_text_table(values):
+    """문자형 번호 컬럼을 키셋 페이지로 돌려주는 _fetch_numbers"""
+    rows = sorted(values)
+    requested = []
+
+    def fetch(table_name, filters, csv=True, limit=None, descending=False):
+        requested.append(filters)
+        page = rows
+        for column, condition in filters:
+            if condition.startswith("gt."):
+                page = [value for value in page if value > condition[3:]]
+        return page[: limit or db_utils.PAGE_SIZE]
+
+    return fetch, requested
+
+
+def test_scan_skips_malformed_numbers(monkeypatch):
+    values = [str(number) for number in range(1, 8)] + ["12-1", "abc", " 9 "]
+    fetch, requested = fake_text_table(values)
+    monkeypatch.setattr(db_utils, "_fetch_numbers", fetch)
+    monkeypatch.setattr(db_utils, "PAGE_SIZE", 3)
+    received = []
+
+    count = db_utils._scan_numbers("test_songs", [], received.extend)
+
+    assert sorted(received) == [1, 2, 3, 4, 5, 6, 7, 9]
+    assert count == 8
+    # 잘못된 값이 페이지 끝에 있어도 그 값 다음부터 이어서 조회한다
+    assert len(requested) == 4
+
+
+def test_load_existing_numbers_survives_malformed_value(monkeypatch, capsys):
+    fetch, _ = fake_text_table(["100", "abc", "101"])
+    monkeypatch.setattr(db_utils, "_fetch_numbers", fetch)
+    existing = set()
+
+    count = db_utils.load_existing_song_numbers(
+        "test_songs", existing.update, use_mirror=False
+    )
+
+    assert count == 2
+    assert existing == {100, 101}
+    assert "숫자가 아닌 곡 번호 1개" in capsys.readouterr().out
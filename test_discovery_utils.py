@@ -0,0 +1,122 @@
+"""
+곡 번호 탐색(디스커버리) 테스트
+"""
+
+import functools
+import threading
+from all_songs.utils import discovery_utils, make_no_result
+from all_songs.utils.budget_utils import CrawlBudget
+from all_songs.utils.negative_cache_utils import NegativeCache
+
+TABLE = "test_songs"
+
+
+class FakeCatalog:
+    """last_number까지만 곡이 있는 노래방처럼 응답하는 probe_func"""
+
+    def __init__(self, last_number, gaps=()):
+        self.last_number = last_number
+        self.gaps = gaps
+        self.probed = []
+        self.lock = threading.Lock()
+
+    def __call__(self, number):
+        with self.lock:
+            self.probed.append(number)
+        in_gap = any(start <= number <= end for start, end in self.gaps)
+        if number > self.last_number or in_gap:
+            return make_no_result(number)
+        return {"number": str(number), "title": f"노래 {number}", "error": False}
+
+
+def test_find_frontier_narrows_to_last_block():
+    catalog = FakeCatalog(last_number=5300)
+
+    frontier = discovery_utils.find_frontier(
+        catalog, high_water=1000, end_number=50000, block_size=100, samples=100
+    )
+
+    # 곡이 있는 마지막 블록의 끝은 실제 마지막 번호에서 한 블록 안쪽
+    assert 5300 <= frontier < 5300 + 100
+    assert max(catalog.probed) <= 50000
+
+
+def test_find_frontier_looks_past_an_empty_gap():
+    catalog = FakeCatalog(last_number=9000, gaps=[(2000, 4999)])
+
+    frontier = discovery_utils.find_frontier(
+        catalog, high_water=1000, end_number=20000, block_size=1000, samples=1000
+    )
+
+    assert 9000 <= frontier < 10000
+
+
+def test_find_frontier_treats_unprobed_numbers_as_hits():
+    frontier = discovery_utils.find_frontier(
+        lambda number: None,
+        high_water=1000,
+        end_number=9000,
+        block_size=1000,
+        samples=2,
+    )
+    assert frontier == 9000
+
+
+def discover(monkeypatch, catalog, existing, crawl_budget=None):
+    def fake_load(table_name, on_numbers, start_number, end_number):
+        on_numbers(list(existing))
+        return len(existing)
+
+    monkeypatch.setattr(discovery_utils, "load_existing_song_numbers", fake_load)
+    monkeypatch.setattr(
+        discovery_utils,
+        "NegativeCache",
+        functools.partial(NegativeCache, reprobe_ratio=0),
+    )
+    found = []
+    numbers = discovery_utils.discover_numbers_to_crawl(
+        TABLE,
+        1,
+        20000,
+        catalog,
+        block_size=1000,
+        samples=4,
+        margin=500,
+        crawl_budget=crawl_budget,
+        found_results=found,
+    )
+    return list(numbers), found
+
+
+def test_probe_results_are_kept(state_dir, monkeypatch):
+    catalog = FakeCatalog(last_number=6000, gaps=[(3000, 3999)])
+    budget = CrawlBudget()
+
+    numbers, found = discover(monkeypatch, catalog, range(1, 1001), budget)
+
+    found_numbers = {int(result["number"]) for result in found}
+    empty_numbers = set(catalog.probed) - found_numbers
+    assert found_numbers and empty_numbers
+    assert found_numbers <= set(range(1, 6001))
+
+    # 곡이 나온 번호와 빈 번호는 본 크롤링에서 다시 요청하지 않는다
+    assert not set(numbers) & set(catalog.probed)
+
+    # 빈 번호는 네거티브 캐시에 남는다
+    cache = NegativeCache(TABLE, reprobe_ratio=0)
+    assert cache.get_skip_numbers(1, 20000) == empty_numbers
+    cache.close()
+
+    # 탐색 요청도 크롤링 예산에 반영된다
+    assert budget.issued == len(catalog.probed)
+
+
+def test_probes_stop_at_request_budget(state_dir, monkeypatch):
+    catalog = FakeCatalog(last_number=6000)
+    budget = CrawlBudget(max_requests=3)
+
+    numbers, found = discover(monkeypatch, catalog, range(1, 1001), budget)
+
+    assert len(catalog.probed) == 3
+    assert budget.issued == 3
+    assert budget.exhausted()
@@ -0,0 +1,183 @@
+"""
+로컬 aiohttp 서버를 상대로 한 크롤링 엔진(async, pipeline)과 전송 계층 테스트
+"""
+
+import asyncio
+import threading
+import aiohttp
+import pytest
+from aiohttp import web
+from all_songs import ky_crawler
+from all_songs.utils import async_utils, pipeline_utils, is_no_result
+from utils import transport, http_get
+
+LAST_NUMBER = 20  # 서버에 곡이 있는 마지막 번호
+
+
+def song_page(number):
+    rows = ""
+    if number <= LAST_NUMBER:
+        rows = (
+            f"<li class='search_chart_list'>"
+            f"<span class='search_chart_num'>{number}</span>"
+            f"<div class='search_chart_tit'><span class='tit'>노래 {number}</span></div>"
+            f"<span class='search_chart_sng'>가수 {number}</span></li>"
+        )
+    return (
+        f"<html><body><ul><li class='search_chart_list'>헤더</li>{rows}</ul>"
+        f"</body></html>"
+    )
+
+
+class SongServer:
+    """금영 검색 페이지처럼 응답하는 로컬 서버. ETag 재검증과 429 응답을 흉내 낸다."""
+
+    def __init__(self):
+        self.throttled = 0  # 앞으로 429로 응답할 요청 수
+        self.requests = []
+        self.not_modified = 0
+
+    async def search(self, request):
+        number = int(request.query["keyword"])
+        self.requests.append(number)
+        if self.throttled:
+            self.throttled -= 1
+            return web.Response(status=429, headers={"Retry-After": "0"})
+
+        etag = f'"song-{number}"'
+        if request.headers.get("If-None-Match") == etag:
+            self.not_modified += 1
+            return web.Response(status=304, headers={"ETag": etag})
+        return web.Response(
+            text=song_page(number),
+            content_type="text/html",
+            charset="utf-8",
+            headers={"ETag": etag},
+        )
+
+
+@pytest.fixture
+def song_server(monkeypatch):
+    server = SongServer()
+    app = web.Application()
+    app.router.add_get("/search/", server.search)
+
+    loop = asyncio.new_event_loop()
+    runner = web.AppRunner(app)
+    loop.run_until_complete(runner.setup())
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    loop.run_until_complete(site.start())
+    port = site._server.sockets[0].getsockname()[1]
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+
+    server.url = f"http://127.0.0.1:{port}/search/"
+    monkeypatch.setattr(
+        ky_crawler,
+        "get_song_url",
+        lambda number: f"{server.url}?category=1&keyword={number}",
+    )
+    yield server
+
+    asyncio.run_coroutine_threadsafe(runner.cleanup(), loop).result()
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+    loop.close()
+
+
+def by_number(results):
+    return {int(result["number"]): result for result in results}
+
+
+def assert_catalog(results):
+    results = by_number(results)
+    assert sorted(results) == list(range(1, 31))
+    for number in range(1, LAST_NUMBER + 1):
+        assert results[number]["title"] == f"노래 {number}"
+        assert results[number]["singer"] == f"가수 {number}"
+    for number in range(LAST_NUMBER + 1, 31):
+        assert is_no_result(results[number])
+
+
+def test_async_engine_against_local_server(song_server):
+    results = []
+
+    assert async_utils.stream_with_asyncio(
+        ky_crawler.crawl_song_info_async,
+        range(1, 31),
+        concurrency=8,
+        on_result=results.append,
+    )
+
+    assert_catalog(results)
+    assert sorted(song_server.requests) == list(range(1, 31))
+
+
+def test_pipeline_engine_against_local_server(song_server):
+    results = []
+
+    assert pipeline_utils.stream_with_pipeline(
+        ky_crawler.fetch_song_html_async,
+        ky_crawler.parse_song_info,
+        range(1, 31),
+        concurrency=8,
+        processes=2,
+        on_result=results.append,
+    )
+
+    assert_catalog(results)
+
+
+def test_429_backs_off_and_releases_slots(song_server):
+    controller = transport.get_host_controller(song_server.url)
+    backoffs = controller.backoffs
+    song_server.throttled = 5
+    results = []
+
+    assert async_utils.stream_with_asyncio(
+        ky_crawler.crawl_song_info_async,
+        range(1, 11),
+        concurrency=4,
+        on_result=results.append,
+    )
+
+    throttled = [result for result in results if result.get("error")]
+    assert len(throttled) == 5
+    assert all(result.get("retryable") for result in throttled)
+    assert controller.backoffs > backoffs
+    assert controller.in_flight == 0
+
+
+@pytest.fixture
+def revalidating_cache(state_dir, monkeypatch):
+    monkeypatch.setitem(transport._config, "cache_mode", "revalidate")
+    monkeypatch.setitem(transport._config, "cache_ttl", 0)
+    transport.reset_transport_stats()
+
+
+def test_http_get_revalidates_with_304(song_server, revalidating_cache):
+    url = ky_crawler.get_song_url(1)
+
+    first = http_get(url)
+    second = http_get(url)
+
+    assert song_server.not_modified == 1
+    assert second.status_code == 200
+    assert second.content == first.content
+    assert transport.get_transport_stats()["cache_revalidated"] == 1
+
+
+def test_fetch_html_async_revalidates_with_304(song_server, revalidating_cache):
+    url = ky_crawler.get_song_url(2)
+
+    async def fetch_twice():
+        async with aiohttp.ClientSession() as session:
+            first = await async_utils.fetch_html_async(session, url)
+            second = await async_utils.fetch_html_async(session, url)
+            return first, second
+
+    first, second = asyncio.run(fetch_twice())
+
+    assert song_server.not_modified == 1
+    assert second == first
+    assert "노래 2" in second
@@ -0,0 +1,110 @@
+"""
+크롤링 저널과 --resume 재개 테스트
+"""
+
+import glob
+import json
+from all_songs.utils import main_utils, data_utils, make_no_result, make_error_result
+from all_songs.utils import journal_utils
+from all_songs.utils.journal_utils import CrawlJournal, resume_from_journal
+
+TABLE = "test_songs"
+FIELDS = ["number", "title"]
+
+
+class TransientError(Exception):
+    status = 503
+
+
+class Crash(Exception):
+    pass
+
+
+def make_crawler(calls, crash_at=None):
+    async def crawl(session, number):
+        calls.append(number)
+        if number == crash_at:
+            raise Crash(f"{number}번에서 중단")
+        if number == 2 and crash_at is not None:
+            return make_error_result(number, TransientError("503"))
+        if number == 3:
+            return make_no_result(number)
+        return {"number": str(number), "title": f"노래 {number}", "error": False}
+
+    return crawl
+
+
+def run(crawler, resume):
+    return main_utils.run_crawler(
+        crawler_func=None,
+        processes=1,
+        output_file="unused.xlsx",
+        table_name=TABLE,
+        data_fields=FIELDS,
+        custom_numbers=list(range(1, 9)),
+        engine="async",
+        async_crawler_func=crawler,
+        concurrency=1,
+        resume=resume,
+    )
+
+
+def test_resume_skips_finished_and_keeps_pending(state_dir, monkeypatch):
+    uploaded = []
+
+    def fake_upload(data, table_name, **kwargs):
+        uploaded.extend(int(row["number"]) for row in data)
+        return True
+
+    monkeypatch.setattr(data_utils, "upload_to_supabase", fake_upload)
+    monkeypatch.setattr(main_utils, "save_to_excel", lambda *args: None)
+
+    # 5번에서 프로세스가 죽은 것처럼 크롤링이 중단된다 (이미 받은 결과는 업로드됨)
+    first_calls = []
+    assert not run(make_crawler(first_calls, crash_at=5), resume=False)
+    assert first_calls == [1, 2, 3, 4, 5]
+    assert sorted(uploaded) == [1, 4]
+    uploaded.clear()
+
+    journal = CrawlJournal(TABLE)
+    recorded = {result["number"] for result in journal.load()}
+    assert recorded == {"1", "2", "3", "4"}
+
+    second_calls = []
+    assert run(make_crawler(second_calls), resume=True)
+
+    # 성공(1, 4)과 검색 결과 없음(3)은 다시 요청하지 않고, 일시적 오류(2)와 남은 번호만 크롤링
+    assert second_calls == [2, 5, 6, 7, 8]
+    assert sorted(uploaded) == [1, 2, 4, 5, 6, 7, 8]
+    # 업로드까지 끝났으므로 저널은 지워진다
+    assert journal.load() == []
+
+
+def test_resume_ignores_truncated_last_line(state_dir):
+    journal = CrawlJournal(TABLE)
+    journal.open()
+    journal.record({"number": "1", "title": "노래 1", "error": False})
+    journal.close()
+    with open(journal.path, "a", encoding="utf-8") as f:
+        f.write('{"number": "2", "tit')
+
+    replayed, remaining = resume_from_journal(journal, [1, 2, 3])
+
+    assert [result["number"] for result in replayed] == ["1"]
+    assert remaining == [2, 3]
+
+
+def test_fresh_run_keeps_previous_journal(state_dir, monkeypatch):
+    monkeypatch.setattr(journal_utils, "KEEP_ROTATED_JOURNALS", 2)
+    journal = CrawlJournal(TABLE)
+    for run_number in range(4):
+        journal.open()
+        journal.record({"number": str(run_number), "error": False})
+        journal.close()
+
+    # --resume 없이 새로 시작해도 이전 기록은 지우지 않고 옮겨 둔다
+    assert [result["number"] for result in journal.load()] == ["3"]
+    rotated = sorted(glob.glob(journal.path + ".*"))
+    assert len(rotated) == 2
+    with open(rotated[-1], encoding="utf-8") as f:
+        assert json.loads(f.read())["number"] == "2"
@@ -0,0 +1,114 @@
+"""
+크롤러 실행(run_crawler) 테스트
+"""
+
+import time
+import asyncio
+from all_songs.utils import main_utils, data_utils
+
+TABLE = "test_songs"
+FIELDS = ["number", "title"]
+
+
+def test_upload_starts_before_crawl_finishes(state_dir, monkeypatch):
+    uploaded = []
+    uploaded_before_last = []
+
+    def fake_upload(data, table_name, **kwargs):
+        uploaded.extend(int(row["number"]) for row in data)
+        return True
+
+    async def crawl(session, number):
+        if number == 20:
+            # 마지막 번호를 크롤링하기 전에 앞선 묶음이 업로드되는지 기다려 본다
+            deadline = time.monotonic() + 5
+            while not uploaded and time.monotonic() < deadline:
+                await asyncio.sleep(0.01)
+            uploaded_before_last.extend(uploaded)
+        return {"number": str(number), "title": f"노래 {number}", "error": False}
+
+    monkeypatch.setattr(data_utils, "upload_to_supabase", fake_upload)
+    monkeypatch.setattr(main_utils, "save_to_excel", lambda *args: None)
+
+    assert main_utils.run_crawler(
+        crawler_func=None,
+        processes=1,
+        output_file="unused.xlsx",
+        table_name=TABLE,
+        data_fields=FIELDS,
+        custom_numbers=list(range(1, 21)),
+        engine="async",
+        async_crawler_func=crawl,
+        concurrency=1,
+        flush_size=5,
+    )
+
+    assert uploaded_before_last[:5] == [1, 2, 3, 4, 5]
+    assert sorted(uploaded) == list(range(1, 21))
+
+
+def test_dry_run_does_not_upload(state_dir, monkeypatch):
+    saved = []
+
+    def fake_upload(data, table_name, **kwargs):
+        raise AssertionError("dry-run에서 업로드함")
+
+    async def crawl(session, number):
+        return {"number": str(number), "title": f"노래 {number}", "error": False}
+
+    monkeypatch.setattr(data_utils, "upload_to_supabase", fake_upload)
+    monkeypatch.setattr(
+        data_utils, "save_to_excel", lambda rows, *args: saved.extend(rows)
+    )
+
+    assert main_utils.run_crawler(
+        crawler_func=None,
+        processes=1,
+        output_file="unused.xlsx",
+        table_name=TABLE,
+        data_fields=FIELDS,
+        custom_numbers=list(range(1, 11)),
+        engine="async",
+        async_crawler_func=crawl,
+        concurrency=1,
+        flush_size=5,
+        dry_run=True,
+    )
+    assert len(saved) == 10
+
+
+def test_prefetched_results_are_uploaded_without_recrawl(state_dir, monkeypatch):
+    uploaded = []
+    crawled = []
+
+    async def crawl(session, number):
+        crawled.append(number)
+        return {"number": str(number), "title": f"노래 {number}", "error": False}
+
+    monkeypatch.setattr(
+        data_utils,
+        "upload_to_supabase",
+        lambda data, table_name, **kwargs: uploaded.extend(data) or True,
+    )
+    monkeypatch.setattr(main_utils, "save_to_excel", lambda *args: None)
+    prefetched = [
+        {"number": "7", "title": "노래 7", "error": False},
+        {"number": "8", "title": "노래 8", "error": False},
+    ]
+
+    assert main_utils.run_crawler(
+        crawler_func=None,
+        processes=1,
+        output_file="unused.xlsx",
+        table_name=TABLE,
+        data_fields=FIELDS,
+        custom_numbers=[9],
+        engine="async",
+        async_crawler_func=crawl,
+        concurrency=1,
+        prefetched_results=prefetched,
+    )
+
+    # 탐색 중에 받은 곡은 다시 요청하지 않고 함께 업로드한다
+    assert crawled == [9]
+    assert sorted(int(row["number"]) for row in uploaded) == [7, 8, 9]
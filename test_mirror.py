@@ -0,0 +1,177 @@
+"""
+로컬 SQLite 미러 동기화 테스트
+"""
+
+import re
+from utils import mirror
+
+TABLE = "test_songs"
+
+
+class FakeResponse:
+    def __init__(self, data, count=None):
+        self.data = data
+        self.count = count
+
+
+class FakeQuery:
+    """mirror가 쓰는 만큼만 흉내 낸 PostgREST 쿼리 빌더"""
+
+    def __init__(self, table):
+        self.table = table
+        self.filters = []
+        self.orders = []
+        self.limit_count = None
+        self.count = None
+        self.negate_next = False
+
+    def select(self, columns, count=None):
+        self.count = count
+        return self
+
+    @property
+    def not_(self):
+        self.negate_next = True
+        return self
+
+    def _add(self, test):
+        negate, self.negate_next = self.negate_next, False
+        self.filters.append((lambda row: not test(row)) if negate else test)
+        return self
+
+    def gt(self, column, value):
+        return self._add(lambda row: _compare(row, column, value) > 0)
+
+    def gte(self, column, value):
+        return self._add(lambda row: _compare(row, column, value) >= 0)
+
+    def is_(self, column, value):
+        return self._add(lambda row: row.get(column) is None)
+
+    def or_(self, filters):
+        self.table.or_filters.append(filters)
+        match = re.fullmatch(
+            r'(\w+)\.gt\."([^"]*)",and\(\1\.eq\."([^"]*)",(\w+)\.gt\."([^"]*)"\)',
+            filters,
+        )
+        assert match, filters
+        column, created_at, _, key_column, key = match.groups()
+        return self._add(
+            lambda row: _compare(row, column, created_at) > 0
+            or (
+                _compare(row, column, created_at) == 0
+                and _compare(row, key_column, key) > 0
+            )
+        )
+
+    def order(self, column):
+        self.orders.append(column)
+        return self
+
+    def limit(self, count):
+        self.limit_count = count
+        return self
+
+    def range(self, start, end):
+        raise AssertionError("오프셋 페이지네이션을 사용함")
+
+    def execute(self):
+        rows = [row for row in self.table.rows if all(f(row) for f in self.filters)]
+        for column in reversed(self.orders):
+            # PostgreSQL처럼 NULL은 오름차순 맨 뒤에 둔다
+            rows.sort(key=lambda row: (row[column] is None, row[column] or 0))
+        page = rows[: self.limit_count] if self.limit_count else rows
+        self.table.pages.append(page)
+        if self.table.on_page:
+            self.table.on_page(self.table)
+        return FakeResponse(page, len(rows) if self.count else None)
+
+
+def _compare(row, column, value):
+    current = row.get(column)
+    if current is None:
+        return -1
+    value = type(current)(value)
+    return (current > value) - (current < value)
+
+
+class FakeTable:
+    def __init__(self, rows):
+        self.rows = list(rows)
+        self.pages = []
+        self.or_filters = []
+        self.on_page = None
+
+
+class FakeClient:
+    def __init__(self, rows):
+        self.songs = FakeTable(rows)
+
+    def table(self, table_name):
+        return FakeQuery(self.songs)
+
+
+def song(number, created_at):
+    return {"number": number, "title": f"노래 {number}", "created_at": created_at}
+
+
+def mirrored_numbers():
+    numbers = []
+    mirror.load_mirror_numbers(TABLE, numbers.extend)
+    return numbers
+
+
+def test_incremental_sync_pages_by_keyset(state_dir, monkeypatch, capsys):
+    monkeypatch.setattr(mirror, "PAGE_SIZE", 3)
+    client = FakeClient([song(n, "2024-01-01T00:00:00+00:00") for n in range(1, 6)])
+    assert mirror.sync_mirror(client, TABLE)
+    assert mirrored_numbers() == [1, 2, 3, 4, 5]
+
+    # 같은 created_at의 행과 더 늦은 행이 페이지 여러 개에 걸쳐 추가된다
+    client.songs.rows += [song(n, "2024-01-01T00:00:00+00:00") for n in range(6, 9)]
+    client.songs.rows += [song(n, "2024-01-02T09:30:00+00:00") for n in range(9, 14)]
+    client.songs.pages.clear()
+    capsys.readouterr()
+
+    assert mirror.sync_mirror(client, TABLE)
+    assert mirrored_numbers() == list(range(1, 14))
+    assert "전체 동기화" not in capsys.readouterr().out
+    assert client.songs.or_filters[0] == (
+        'created_at.gt."2024-01-01T00:00:00+00:00",'
+        'and(created_at.eq."2024-01-01T00:00:00+00:00",number.gt."3")'
+    )
+
+
+def test_incremental_sync_does_not_skip_rows_when_table_changes(state_dir, monkeypatch):
+    monkeypatch.setattr(mirror, "PAGE_SIZE", 3)
+    client = FakeClient([song(n, "2024-01-01") for n in range(10, 13)])
+    assert mirror.sync_mirror(client, TABLE)
+    client.songs.rows += [song(n, "2024-01-01") for n in range(13, 20)]
+
+    def delete_before_cursor(table):
+        # 첫 페이지를 받은 직후, 이미 지나간 위치의 행이 삭제된다
+        if len(table.pages) == 1:
+            table.rows = [row for row in table.rows if row["number"] != 10]
+            table.on_page = None
+
+    client.songs.pages.clear()
+    client.songs.on_page = delete_before_cursor
+    connection = mirror._get_connection()
+    mirror._pull_since(client, connection, TABLE, "number", "2024-01-01")
+
+    # 오프셋이었다면 삭제된 행만큼 밀려 13번을 건너뛰었을 것이다
+    assert mirrored_numbers() == list(range(10, 20))
+
+
+def test_rows_without_key_do_not_force_full_sync(state_dir, capsys):
+    rows = [song(n, "2024-01-01") for n in range(1, 4)]
+    rows.append({"number": None, "title": "번호 없음", "created_at": "2024-01-01"})
+    client = FakeClient(rows)
+    assert mirror.sync_mirror(client, TABLE)
+    client.songs.rows.append(song(4, "2024-01-02"))
+    capsys.readouterr()
+
+    assert mirror.sync_mirror(client, TABLE)
+    output = capsys.readouterr().out
+    assert "전체 동기화" not in output
+    assert "(총 4개)" in output
@@ -0,0 +1,133 @@
+"""
+번호 계획(NumberPlanner, ChunkedNumbers)과 크롤링 우선순위 테스트
+"""
+
+import functools
+import numpy as np
+from all_songs.utils import NumberPlanner, ChunkedNumbers, NegativeCache
+from all_songs.utils import db_utils
+from all_songs.utils.planner_utils import EXISTING, NEGATIVE, IN_FLIGHT
+from all_songs.utils.priority_utils import take_prioritized
+
+
+def as_lists(chunks):
+    return [
+        list(chunk) if isinstance(chunk, range) else chunk.tolist() for chunk in chunks
+    ]
+
+
+def test_chunks_split_on_chunk_size_from_start_number():
+    planner = NumberPlanner(101, 2600)
+    chunks = list(planner.iter_chunks(1000))
+
+    assert chunks == [range(101, 1101), range(1101, 2101), range(2101, 2601)]
+    assert len(ChunkedNumbers(chunks)) == 2500
+
+
+def test_chunk_with_gap_becomes_array():
+    planner = NumberPlanner(1, 20)
+    planner.mark([5, 6], EXISTING)
+    chunks = list(planner.iter_chunks(10))
+
+    assert isinstance(chunks[0], np.ndarray)
+    assert as_lists(chunks) == [[1, 2, 3, 4, 7, 8, 9, 10], list(range(11, 21))]
+
+
+def test_fully_known_chunk_is_skipped():
+    planner = NumberPlanner(1, 30)
+    planner.mark(range(11, 21), EXISTING)
+
+    assert list(planner.iter_chunks(10)) == [range(1, 11), range(21, 31)]
+
+
+def test_known_and_negative_numbers_are_skipped_and_nothing_else():
+    planner = NumberPlanner(1, 5000)
+    existing = set(range(1, 5001, 3))
+    negative = set(range(2, 5001, 7)) | {0, 9999}  # 범위 밖 번호는 무시
+    planner.mark(sorted(existing), EXISTING)
+    planner.mark(sorted(negative), NEGATIVE)
+
+    taken = list(planner.take_pending(1000))
+
+    expected = set(range(1, 5001)) - existing - negative
+    assert taken == sorted(expected)
+    assert planner.pending_count() == 0
+    assert list(planner.take_pending(1000)) == []
+
+
+def test_range_mark_and_clear():
+    planner = NumberPlanner(10, 19)
+    planner.mark(range(0, 15), EXISTING)
+    assert planner.count(EXISTING) == 5
+
+    planner.clear(range(12, 14), EXISTING)
+    assert planner.select_pending([10, 12, 13, 14, 18, 99]).tolist() == [12, 13, 18]
+
+
+def test_chunked_numbers_mixes_ranges_and_arrays():
+    numbers = ChunkedNumbers([range(1, 4), np.array([7, 9], dtype=np.uint32)])
+
+    assert len(numbers) == 5
+    assert list(numbers) == [1, 2, 3, 7, 9]
+
+
+def test_priority_puts_popular_missing_numbers_first():
+    planner = NumberPlanner(1, 5000)
+    planner.mark(range(1, 1001), EXISTING)
+
+    numbers = take_prioritized(
+        planner, popular_numbers=[4500, 500, 4600], chunk_size=1000
+    )
+    order = list(numbers)
+
+    # DB에 이미 있는 500은 빼고, 인기 차트 누락 번호가 가장 먼저
+    assert order[:2] == [4500, 4600]
+    assert sorted(order) == [n for n in range(1001, 5001)]
+    assert planner.pending_count() == 0
+    assert planner.count(IN_FLIGHT) == 4000
+
+
+def test_priority_prefers_range_above_high_water_mark():
+    planner = NumberPlanner(1, 50000)
+    planner.mark(range(1, 20001), EXISTING)
+
+    chunks = take_prioritized(planner, chunk_size=1000).chunks
+
+    assert chunks[0] == range(20001, 21001)
+    firsts = [chunk[0] for chunk in chunks]
+    assert firsts.index(21001) < firsts.index(40001)
+
+
+def test_priority_puts_recently_probed_ranges_later():
+    planner = NumberPlanner(1, 3000)
+    probed_days = {number: 1.0 for number in range(1, 1001)}
+
+    chunks = take_prioritized(
+        planner, probed_days=probed_days, ttl_days=30, chunk_size=1000
+    ).chunks
+
+    assert chunks[-1] == range(1, 1001)
+
+
+def test_get_numbers_to_crawl_skips_existing_and_negative_cached(
+    state_dir, monkeypatch
+):
+    def load_existing(table_name, on_numbers, start_number, end_number):
+        on_numbers([1, 2, 3])
+        return 3
+
+    monkeypatch.setattr(db_utils, "load_existing_song_numbers", load_existing)
+    # 재확인 표본 없이 TTL 안의 빈 번호는 모두 건너뛰게 한다
+    monkeypatch.setattr(
+        db_utils, "NegativeCache", functools.partial(NegativeCache, reprobe_ratio=0)
+    )
+    cache = NegativeCache("ky_songs")
+    for number in (4, 5):
+        cache.record(
+            {"number": str(number), "error": True, "error_message": "검색 결과 없음"}
+        )
+    cache.close()
+
+    numbers = db_utils.get_numbers_to_crawl("ky_songs", 1, 10)
+
+    assert sorted(numbers) == [6, 7, 8, 9, 10]
@@ -0,0 +1,146 @@
+"""
+호스트별 동시성 컨트롤러(AIMD)와 비동기 요청의 슬롯 반납 테스트
+"""
+
+import time
+import asyncio
+import threading
+import pytest
+from utils import transport
+from utils.rate_limit import HostController, INITIAL_WINDOW
+from all_songs.utils.async_utils import fetch_html_async
+
+
+class FakeResponse:
+    status = 200
+    headers = {}
+
+    def __init__(self, read_error=None, encoding_error=None):
+        self.read_error = read_error
+        self.encoding_error = encoding_error
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    async def read(self):
+        if self.read_error:
+            raise self.read_error
+        return b"<html></html>"
+
+    def raise_for_status(self):
+        pass
+
+    def get_encoding(self):
+        if self.encoding_error:
+            raise self.encoding_error
+        return "utf-8"
+
+
+class FakeSession:
+    def __init__(self, response):
+        self.response = response
+
+    def get(self, url, headers=None, timeout=None):
+        return self.response
+
+
+@pytest.mark.parametrize(
+    "error",
+    [
+        asyncio.CancelledError(),
+        RuntimeError("인코딩을 알 수 없음"),
+        LookupError("unknown encoding"),
+    ],
+)
+def test_fetch_releases_slot_on_any_error(error):
+    url = "http://slot-leak.test/search"
+    controller = transport.get_host_controller(url)
+    if isinstance(error, asyncio.CancelledError):
+        response = FakeResponse(read_error=error)
+    else:
+        response = FakeResponse(encoding_error=error)
+
+    async def fetch():
+        with pytest.raises(type(error)):
+            await fetch_html_async(FakeSession(response), url)
+
+    # 슬롯이 새면 윈도우를 다 쓴 뒤 다음 요청이 영원히 기다린다
+    for _ in range(INITIAL_WINDOW + 1):
+        asyncio.run(fetch())
+        assert controller.in_flight == 0
+
+
+def test_fetch_releases_slot_on_success():
+    url = "http://slot-ok.test/search"
+    controller = transport.get_host_controller(url)
+
+    html = asyncio.run(fetch_html_async(FakeSession(FakeResponse()), url))
+
+    assert html == "<html></html>"
+    assert controller.in_flight == 0
+
+
+def test_backoff_halves_window_once_per_round_trip():
+    controller = HostController(max_window=64)
+    for _ in range(40):
+        controller.acquire()
+        controller.release(0.1, status_code=200)
+    grown = controller.window
+    assert grown > INITIAL_WINDOW
+
+    controller.acquire()
+    controller.acquire()
+    controller.release(0.1, status_code=429, retry_after=0.2)
+    # 같은 혼잡 구간의 429는 윈도우를 한 번만 줄인다
+    controller.release(0.1, status_code=429)
+
+    assert controller.window == grown / 2
+    assert controller.backoffs == 1
+    assert controller.in_flight == 0
+    assert controller._try_acquire() > 0  # Retry-After 동안 멈춘다
+
+
+class CountingController(HostController):
+    def __init__(self):
+        super().__init__(max_window=1)
+        self.attempts = 0
+
+    def _try_acquire(self):
+        self.attempts += 1
+        return super()._try_acquire()
+
+
+def release_later(controller, delay):
+    timer = threading.Timer(delay, controller.release, args=(0.1,))
+    timer.start()
+    return timer
+
+
+def test_acquire_waits_for_release_instead_of_polling():
+    controller = CountingController()
+    controller.acquire()
+    release_later(controller, 0.3)
+
+    started = time.monotonic()
+    controller.acquire()
+
+    assert 0.2 < time.monotonic() - started < 2
+    assert controller.attempts <= 3
+
+
+def test_acquire_async_is_woken_by_release_from_another_thread():
+    controller = CountingController()
+    controller.acquire()
+
+    async def acquire():
+        release_later(controller, 0.3)
+        started = time.monotonic()
+        await controller.acquire_async()
+        return time.monotonic() - started
+
+    assert 0.2 < asyncio.run(acquire()) < 2
+    assert controller.attempts <= 3
+    assert controller.async_waiters == []
@@ -0,0 +1,78 @@
+"""
+기존 곡 리프레시 진입점 테스트
+"""
+
+import pytest
+from all_songs import ky_crawler, tj_crawler
+from all_songs.utils import REFRESH_LIMIT, refresh_utils
+
+
+@pytest.mark.parametrize("crawler", [ky_crawler, tj_crawler])
+def test_refresh_uses_default_limit(crawler, monkeypatch):
+    calls = []
+    monkeypatch.setattr(
+        crawler,
+        "refresh_songs",
+        lambda table_name, data_fields, limit, **options: calls.append(limit) or True,
+    )
+
+    assert crawler.refresh() is True
+    assert calls == [REFRESH_LIMIT]
+
+
+@pytest.mark.parametrize("crawler", [ky_crawler, tj_crawler])
+def test_refresh_uses_given_limit(crawler, monkeypatch):
+    calls = []
+    monkeypatch.setattr(
+        crawler,
+        "refresh_songs",
+        lambda table_name, data_fields, limit, **options: calls.append(limit) or True,
+    )
+
+    crawler.refresh(limit=10)
+    assert calls == [10]
+
+
+def fake_refresh_run(monkeypatch, upload_success):
+    monkeypatch.setattr(refresh_utils, "sync_table_mirror", lambda table_name: True)
+    monkeypatch.setattr(
+        refresh_utils,
+        "load_mirror_numbers",
+        lambda table_name, on_numbers: on_numbers([1, 2, 3]),
+    )
+    monkeypatch.setattr(
+        refresh_utils, "select_changed_rows", lambda table_name, rows, fields: rows
+    )
+
+    def run_crawler(custom_numbers, upload_filter, **options):
+        # 고른 번호와 같은 페이지에서 함께 수집한 7번이 업로드 대상으로 넘어간다
+        upload_filter([{"number": "1"}, {"number": "7"}])
+        return upload_success
+
+    monkeypatch.setattr(refresh_utils, "run_crawler", run_crawler)
+    return refresh_utils.refresh_songs("test_songs", ["number"], limit=2)
+
+
+def checked_numbers():
+    state = refresh_utils.RefreshState("test_songs")
+    try:
+        return {
+            number
+            for (number,) in state.connection.execute(
+                "SELECT number FROM refreshed_numbers"
+            )
+        }
+    finally:
+        state.close()
+
+
+def test_failed_upload_does_not_mark_rows_checked(state_dir, monkeypatch):
+    assert fake_refresh_run(monkeypatch, upload_success=False) is False
+
+    # 다음 실행에서 같은 번호를 다시 확인해야 한다
+    assert checked_numbers() == set()
+
+
+def test_successful_upload_marks_crawled_rows_checked(state_dir, monkeypatch):
+    assert fake_refresh_run(monkeypatch, upload_success=True) is True
+    assert checked_numbers() == {1, 2, 7}
@@ -0,0 +1,224 @@
+"""
+샤드 작업 큐(임대, 만료, 재시도 제한) 테스트
+"""
+
+import sqlite3
+import threading
+from all_songs.utils.shard_utils import (
+    MAX_SHARD_ATTEMPTS,
+    SQLiteShardBackend,
+    ShardQueue,
+    split_into_shards,
+    decode_numbers,
+)
+
+JOB = "test/ky_songs"
+
+
+def make_backend(tmp_path):
+    return SQLiteShardBackend(str(tmp_path / "shards.sqlite"))
+
+
+def test_split_into_shards_round_trip():
+    numbers = [5, 6, 7, 15, 9999, 10000, 10001, 25000]
+    shards = split_into_shards(numbers, shard_span=10000)
+
+    assert shards == {
+        0: [[5, 7], [15, 15], [9999, 9999]],
+        1: [[10000, 10001]],
+        2: [[25000, 25000]],
+    }
+    decoded = [n for runs in shards.values() for n in decode_numbers(runs)]
+    assert decoded == numbers
+
+
+def test_claim_never_hands_out_same_shard_twice(tmp_path):
+    backend = make_backend(tmp_path)
+    backend.publish(JOB, {shard_id: [[shard_id, shard_id]] for shard_id in range(40)})
+
+    claimed = []
+    lock = threading.Lock()
+
+    def worker(owner):
+        while True:
+            lease = make_backend(tmp_path).claim(JOB, owner, 300)
+            if lease is None:
+                return
+            with lock:
+                claimed.append(lease["shard_id"])
+
+    threads = [threading.Thread(target=worker, args=(f"node{i}",)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(claimed) == list(range(40))
+    assert backend.progress(JOB) == {"leased": 40}
+
+
+def test_publish_keeps_first_plan_of_shard(tmp_path):
+    backend = make_backend(tmp_path)
+    backend.publish(JOB, {0: [[1, 10]]})
+    backend.publish(JOB, {0: [[1, 5]], 1: [[10000, 10000]]})
+
+    first = backend.claim(JOB, "a", 300)
+    assert first["numbers"] == [[1, 10]]
+    assert backend.claim(JOB, "a", 300)["shard_id"] == 1
+
+
+def test_expired_lease_is_reclaimed(tmp_path):
+    backend = make_backend(tmp_path)
+    backend.publish(JOB, {0: [[1, 10]]})
+
+    first = backend.claim(JOB, "dead-node", -1)
+    assert first["attempts"] == 1
+    assert backend.progress(JOB) == {"pending": 1}
+
+    second = backend.claim(JOB, "live-node", 300)
+    assert second["shard_id"] == 0
+    assert second["attempts"] == 2
+
+    # 임대를 잃은 노드는 더 이상 연장하거나 완료할 수 없다
+    assert not backend.heartbeat(JOB, 0, "dead-node", 300)
+    assert not backend.complete(JOB, 0, "dead-node")
+    assert backend.complete(JOB, 0, "live-node")
+    assert backend.progress(JOB) == {"done": 1}
+
+
+def test_active_lease_is_not_reclaimed(tmp_path):
+    backend = make_backend(tmp_path)
+    backend.publish(JOB, {0: [[1, 10]]})
+
+    assert backend.claim(JOB, "a", 300) is not None
+    assert backend.claim(JOB, "b", 300) is None
+
+
+def test_failing_shard_stops_after_max_attempts(tmp_path):
+    queue = ShardQueue(
+        make_backend(tmp_path), job="test", node_id="a", lease_seconds=300
+    )
+    calls = []
+
+    def run_shard(numbers, run_name):
+        calls.append(run_name)
+        return False
+
+    assert queue.run("ky_songs", [1, 2, 3], run_shard) is False
+    assert calls == ["shard0"] * MAX_SHARD_ATTEMPTS
+    assert queue.backend.progress(JOB) == {"failed": 1}
+
+
+def test_run_completes_all_shards(tmp_path):
+    queue = ShardQueue(make_backend(tmp_path), job="test", node_id="a", shard_span=10)
+    crawled = []
+
+    def run_shard(numbers, run_name):
+        crawled.extend(numbers)
+        return True
+
+    assert queue.run("ky_songs", [1, 2, 15, 31], run_shard) is True
+    assert sorted(crawled) == [1, 2, 15, 31]
+    assert queue.backend.progress(JOB) == {"done": 3}
+
+
+class FlakyProgressBackend(SQLiteShardBackend):
+    """진행 상황 조회가 두 번째부터 실패하는 저장소."""
+
+    progress_calls = 0
+
+    def progress(self, job):
+        self.progress_calls += 1
+        if self.progress_calls > 1:
+            raise ConnectionError("network down")
+        return super().progress(job)
+
+
+def test_progress_error_after_shards_does_not_raise(tmp_path):
+    backend = FlakyProgressBackend(str(tmp_path / "shards.sqlite"))
+    queue = ShardQueue(backend, job="test", node_id="a")
+
+    assert queue.run("ky_songs", [1, 2], lambda numbers, run_name: True) is True
+
+
+def test_split_into_shards_keeps_priority_order():
+    # 우선순위 순서: 최신 구간 → 인기 곡 → 오래된 구간
+    numbers = [25000, 25001, 25002, 7, 12000, 5, 6, 25001]
+    shards = split_into_shards(numbers, shard_span=10000)
+
+    assert list(shards) == [2, 0, 1]
+    assert shards[0] == [[7, 7], [5, 6]]
+    decoded = [n for runs in shards.values() for n in decode_numbers(runs)]
+    assert decoded == [25000, 25001, 25002, 7, 5, 6, 12000]
+
+
+def test_claims_follow_published_priority(tmp_path):
+    queue = ShardQueue(make_backend(tmp_path), job="test", node_id="a", shard_span=10)
+    order = []
+
+    def run_shard(numbers, run_name):
+        order.append(run_name)
+        return True
+
+    assert queue.run("ky_songs", [95, 96, 3, 41, 97], run_shard)
+    assert order == ["shard9", "shard0", "shard4"]
+
+
+def test_old_queue_file_gets_priority_column(tmp_path):
+    path = str(tmp_path / "shards.sqlite")
+    connection = sqlite3.connect(path)
+    connection.execute(
+        "CREATE TABLE crawl_shards (job TEXT NOT NULL, shard_id INTEGER NOT NULL, "
+        "numbers TEXT NOT NULL, state TEXT NOT NULL DEFAULT 'pending', owner TEXT, "
+        "lease_expires REAL, attempts INTEGER NOT NULL DEFAULT 0, "
+        "PRIMARY KEY (job, shard_id))"
+    )
+    connection.commit()
+    connection.close()
+
+    backend = SQLiteShardBackend(path)
+    backend.publish(JOB, {1: [[10, 10]], 0: [[1, 1]]})
+    assert backend.claim(JOB, "a", 300)["shard_id"] == 1
+
+
+def test_only_one_node_plans(tmp_path):
+    planner = ShardQueue(
+        make_backend(tmp_path), job="test", node_id="a", lease_seconds=4
+    )
+    follower = ShardQueue(
+        make_backend(tmp_path), job="test", node_id="b", lease_seconds=4
+    )
+    assert planner.acquire_plan("ky_songs") is True
+
+    # 계획이 올라올 때까지 다른 노드는 탐색하지 않고 기다린다
+    follower_plans = []
+    thread = threading.Thread(
+        target=lambda: follower_plans.append(follower.acquire_plan("ky_songs"))
+    )
+    thread.start()
+    thread.join(0.5)
+    assert thread.is_alive()
+
+    crawled = []
+    assert planner.run(
+        "ky_songs", [1, 2], lambda numbers, name: crawled.extend(numbers) or True
+    )
+    thread.join(5)
+    assert follower_plans == [False]
+    assert crawled == [1, 2]
+
+    # 계획이 올라온 뒤에 시작한 노드도 탐색하지 않는다
+    assert follower.acquire_plan("ky_songs") is False
+    assert follower.run("ky_songs", [], lambda numbers, name: True) is True
+
+
+def test_expired_plan_is_taken_over(tmp_path):
+    backend = make_backend(tmp_path)
+    assert backend.start_plan(JOB, "dead-node", -1) == "planning"
+
+    queue = ShardQueue(backend, job="test", node_id="live-node", lease_seconds=300)
+    assert queue.acquire_plan("ky_songs") is True
+    assert not backend.finish_plan(JOB, "dead-node")
+
+    queue.abandon_plan("ky_songs")
+    assert backend.start_plan(JOB, "other-node", 300) == "planning"
@@ -0,0 +1,140 @@
+"""
+금영/태진 검색 결과 페이지 파싱 테스트
+"""
+
+import pytest
+from all_songs import ky_crawler, tj_crawler
+from all_songs.utils import is_no_result, expand_harvested, NegativeCache
+
+
+def ky_row(number):
+    return (
+        f"<li class='search_chart_list'>"
+        f"<span class='search_chart_num'>{number}</span>"
+        f"<div class='search_chart_tit'><span class='tit'>노래 {number}</span></div>"
+        f"<span class='search_chart_sng'>가수 {number}</span>"
+        f"<span class='search_chart_cmp'>작곡</span>"
+        f"<span class='search_chart_wrt'>작사</span>"
+        f"<span class='search_chart_rel'>2020-01-01</span></li>"
+    )
+
+
+def ky_page(*numbers):
+    rows = "".join(ky_row(number) for number in numbers)
+    return (
+        f"<html><body><ul><li class='search_chart_list'>헤더</li>{rows}</ul>"
+        f"</body></html>"
+    )
+
+
+def tj_row(number):
+    return (
+        f"<li><ul class='grid-container list'>"
+        f"<li class='grid-item center pos-type'><p class='num2'>"
+        f"<span class='highlight'>{number}</span></p></li>"
+        f"<li class='grid-item title3'><div class='flex-box'><p>x</p>"
+        f"<p><span>노래 {number}</span></p></div></li>"
+        f"<li class='grid-item title4 singer'><p><span>가수 {number}</span></p></li>"
+        f"</ul></li>"
+    )
+
+
+def tj_page(*numbers):
+    rows = "".join(tj_row(number) for number in numbers)
+    return (
+        f"<html><body><ul class='chart-list-area'><li>헤더</li>{rows}</ul>"
+        f"</body></html>"
+    )
+
+
+def by_number(result):
+    return {item["number"]: item for item in expand_harvested(result)}
+
+
+def test_ky_uses_row_with_searched_number():
+    items = by_number(ky_crawler.parse_song_info(1231, ky_page(1230, 1231)))
+
+    assert items["1231"]["title"] == "노래 1231"
+    assert items["1230"]["title"] == "노래 1230"
+
+
+def test_ky_without_searched_number_harvests_rows_under_own_numbers():
+    items = by_number(ky_crawler.parse_song_info(123, ky_page(1230, 1231)))
+
+    assert is_no_result(items["123"])
+    assert items["1230"]["title"] == "노래 1230"
+    assert items["1231"]["title"] == "노래 1231"
+
+
+def test_tj_uses_row_with_searched_number():
+    items = by_number(tj_crawler.parse_song_info(1231, tj_page(1230, 1231)))
+
+    assert items["1231"]["title"] == "노래 1231"
+    assert items["1230"]["title"] == "노래 1230"
+
+
+def test_tj_without_searched_number_harvests_rows_under_own_numbers():
+    items = by_number(tj_crawler.parse_song_info(123, tj_page(1230, 1231)))
+
+    assert is_no_result(items["123"])
+    assert items["1230"]["title"] == "노래 1230"
+    assert items["1231"]["title"] == "노래 1231"
+
+
+BLOCKED_PAGE = "<html><body><h1>잠시 후 다시 시도해 주세요</h1></body></html>"
+
+
+def test_unrecognized_page_is_retryable_error():
+    for crawler in (ky_crawler, tj_crawler):
+        result = crawler.parse_song_info(123, BLOCKED_PAGE)
+
+        assert result["error"] is True
+        assert result["retryable"] is True
+        assert not is_no_result(result)
+
+
+def test_header_without_rows_is_no_result():
+    assert is_no_result(ky_crawler.parse_song_info(123, ky_page()))
+    assert is_no_result(tj_crawler.parse_song_info(123, tj_page()))
+
+
+def test_negative_cache_ignores_unrecognized_page(state_dir):
+    cache = NegativeCache("ky_songs")
+    cache.record(ky_crawler.parse_song_info(123, BLOCKED_PAGE))
+    cache.record(ky_crawler.parse_song_info(124, ky_page()))
+
+    assert [number for number, _ in cache.iter_probed_at(1, 1000)] == [124]
+
+
+KY_EDGE_ROW = (
+    "<li class='search_chart_list'>"
+    "<span class='search_chart_num'> 4321 </span>"
+    "<div class='search_chart_tit'><span class='tit'>Rock &amp; <b>Roll</b></span></div>"
+    "<span class='search_chart_sng'>\n  가수\n</span></li>"
+)
+TJ_EDGE_ROW = (
+    "<li><ul class='grid-container list'>"
+    "<li class='grid-item center pos-type'><p class='num2'>"
+    "<span class='highlight'>98765</span></p></li>"
+    "<li class='grid-item title3'><div class='flex-box'><p>x</p>"
+    "<p><span>Tom &amp; <i>Jerry</i></span></p></div></li>"
+    "</ul></li>"
+)
+
+
+@pytest.mark.parametrize(
+    "crawler, html",
+    [
+        (ky_crawler, ky_page(1230, 1231, 1232)),
+        (ky_crawler, ky_page()),
+        (ky_crawler, ky_page(7).replace("</ul>", KY_EDGE_ROW + "</ul>")),
+        (ky_crawler, "<html><body>점검 중</body></html>"),
+        (tj_crawler, tj_page(100, 101)),
+        (tj_crawler, tj_page()),
+        (tj_crawler, tj_page(5).replace("</ul></body>", TJ_EDGE_ROW + "</ul></body>")),
+        (tj_crawler, "<html><body>점검 중</body></html>"),
+    ],
+)
+def test_lxml_and_bs4_extract_same_rows(crawler, html):
+    # lxml 경로가 실패하면 bs4로 대체하므로 두 경로의 결과가 같아야 한다
+    assert crawler._extract_song_rows_lxml(html) == crawler._extract_song_rows_bs4(html)
@@ -0,0 +1,45 @@
+"""
+연결 재사용 통계 테스트
+"""
+
+import sys
+import main
+from utils import transport
+
+
+def test_reset_clears_counts_and_hosts(capsys):
+    transport.get_host_controller("https://a.example.com/search")
+    transport.record_transport_stats(request_count=5, connection_count=2)
+    transport.reset_transport_stats()
+
+    transport.get_host_controller("https://b.example.com/search")
+    transport.record_transport_stats(request_count=3, connection_count=1)
+
+    stats = transport.get_transport_stats()
+    assert stats["requests"] == 3
+    assert stats["connections"] == 1
+
+    transport.print_transport_stats()
+    output = capsys.readouterr().out
+    assert "b.example.com" in output
+    assert "a.example.com" not in output
+
+
+def test_all_reports_each_service_separately(monkeypatch):
+    reported = {}
+
+    def crawl(name, requests_count):
+        def run(**options):
+            transport.record_transport_stats(request_count=requests_count)
+            reported[name] = transport.get_transport_stats()["requests"]
+            return True
+
+        return run
+
+    monkeypatch.setattr(main, "crawl_taejin", crawl("taejin", 7))
+    monkeypatch.setattr(main, "crawl_kumyoung", crawl("kumyoung", 4))
+    monkeypatch.setattr(sys, "argv", ["main.py", "all"])
+    transport.reset_transport_stats()
+
+    assert main.main() == 0
+    assert reported == {"taejin": 7, "kumyoung": 4}
@@ -0,0 +1,142 @@
+"""
+Supabase 업로드 배치 크기 조절과 실패 처리 테스트
+"""
+
+import json
+import pytest
+import requests
+from utils import supabase as upload
+
+
+def make_response(status_code, code=""):
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = json.dumps({"code": code, "message": "test"}).encode()
+    return response
+
+
+@pytest.fixture
+def fresh_upload(state_dir, monkeypatch):
+    """테이블별 컨트롤러를 비우고 배치를 하나씩 순서대로 보내게 합니다."""
+    monkeypatch.setattr(upload, "_controllers", {})
+    monkeypatch.setattr(upload, "UPLOAD_WORKERS", 1)
+    monkeypatch.setattr(upload, "BACKOFF_BASE_SECONDS", 0.0)
+    return upload
+
+
+def test_fast_full_batches_grow():
+    controller = upload.UploadController()
+    controller.record(100, 10000, 0.1, throttled=False)
+    assert controller.batch_rows == 150
+    controller.record(150, 15000, 0.1, throttled=False)
+    assert controller.batch_rows == 225
+
+
+def test_partial_batch_does_not_grow():
+    controller = upload.UploadController()
+    controller.record(30, 3000, 0.1, throttled=False)
+    assert controller.batch_rows == upload.INITIAL_BATCH_ROWS
+
+
+def test_slow_batch_shrinks_to_target_time():
+    controller = upload.UploadController()
+    controller.batch_rows = 400
+    controller.record(400, 40000, upload.TARGET_BATCH_SECONDS * 4, throttled=False)
+    assert controller.batch_rows == 100
+
+
+def test_throttled_batch_halves_down_to_minimum():
+    controller = upload.UploadController()
+    controller.record(100, 10000, 0.1, throttled=True)
+    assert controller.batch_rows == 50
+    for _ in range(10):
+        controller.record(10, 1000, 0.1, throttled=True)
+    assert controller.batch_rows == upload.MIN_BATCH_ROWS
+
+
+def test_batch_size_capped_by_payload_bytes():
+    controller = upload.UploadController()
+    controller.batch_rows = upload.MAX_BATCH_ROWS
+    controller.record(10, 10 * 100 * 1024, 0.1, throttled=False)
+    assert controller.next_batch_size() == int(upload.MAX_BATCH_BYTES / (100 * 1024))
+
+
+def test_upload_adapts_and_stops_after_failure(fresh_upload, monkeypatch):
+    sizes = []
+    outcomes = iter(["ok", "ok", 429, "ok", 400])
+
+    def fake_send_batch(batch, body, *args):
+        sizes.append(len(batch))
+        outcome = next(outcomes)
+        if outcome != "ok":
+            raise upload.UploadResponseError(make_response(outcome))
+        return len(body), 0
+
+    monkeypatch.setattr(upload, "_send_batch", fake_send_batch)
+    data = [{"number": str(number)} for number in range(1000)]
+
+    assert upload.upload_to_supabase(data, "test_songs") is False
+
+    # 빠르면 1.5배씩 키우고, 스로틀링 뒤에는 절반으로 줄이며, 실패한 뒤에는 새 배치를 보내지 않는다
+    assert sizes == [100, 150, 225, 225, 112]
+    assert sum(sizes[:3]) < len(data)
+
+
+def test_throttle_retries_are_bounded(fresh_upload, monkeypatch):
+    calls = []
+
+    def fake_send_batch(batch, *args):
+        calls.append(len(batch))
+        raise upload.UploadResponseError(make_response(503))
+
+    monkeypatch.setattr(upload, "_send_batch", fake_send_batch)
+    data = [{"number": str(number)} for number in range(500)]
+
+    assert upload.upload_to_supabase(data, "test_songs") is False
+    assert calls == [100] * (upload.MAX_THROTTLE_RETRIES + 1)
+
+
+class GzipRejectingSession:
+    """압축한 요청 본문을 읽지 못하는 PostgREST처럼 응답하는 세션"""
+
+    def __init__(self, status_code, code):
+        self.status_code = status_code
+        self.code = code
+        self.encodings = []
+
+    def post(self, url, params=None, data=None, headers=None, timeout=None):
+        encoding = headers.get("Content-Encoding")
+        self.encodings.append(encoding)
+        if encoding == "gzip":
+            return make_response(self.status_code, self.code)
+        return make_response(201)
+
+
+@pytest.mark.parametrize("status_code, code", [(400, "PGRST102"), (415, "")])
+def test_gzip_rejection_falls_back_per_table(
+    fresh_upload, monkeypatch, status_code, code
+):
+    monkeypatch.setattr(upload, "UPLOAD_GZIP", True)
+    session = GzipRejectingSession(status_code, code)
+    monkeypatch.setattr(upload, "_get_session", lambda: session)
+    data = [{"number": str(number), "title": "노래" * 10} for number in range(300)]
+
+    assert upload.upload_to_supabase(data, "test_songs") is True
+
+    # 첫 배치만 압축해서 거부당하고, 같은 배치를 압축 없이 다시 보낸 뒤로는 압축하지 않는다
+    assert session.encodings[:2] == ["gzip", None]
+    assert set(session.encodings[2:]) == {None}
+    assert upload.get_upload_controller("test_songs").gzip is False
+    # 다른 테이블과 모듈 기본값은 그대로 둔다
+    assert upload.get_upload_controller("other_songs").gzip is True
+    assert upload.UPLOAD_GZIP is True
+
+
+def test_other_bad_request_is_not_retried_uncompressed(fresh_upload, monkeypatch):
+    monkeypatch.setattr(upload, "UPLOAD_GZIP", True)
+    session = GzipRejectingSession(400, "PGRST204")
+    monkeypatch.setattr(upload, "_get_session", lambda: session)
+    data = [{"number": str(number), "title": "노래" * 10} for number in range(100)]
+
+    assert upload.upload_to_supabase(data, "test_songs") is False
+    assert session.encodings == ["gzip"]
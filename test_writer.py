@@ -0,0 +1,65 @@
+"""
+백그라운드 업로드 작업자 테스트
+"""
+
+import threading
+from utils import BackgroundWriter
+
+
+def test_failed_batch_is_reported_on_close():
+    written = []
+    writer = BackgroundWriter(lambda rows: written.extend(rows) or rows != [2])
+
+    for batch in ([1], [2], [3]):
+        writer.put(batch)
+
+    # 실패한 묶음이 있어도 나머지 묶음은 계속 업로드한다
+    assert writer.close() is False
+    assert written == [1, 2, 3]
+
+
+def test_exception_in_writer_is_reported_on_close(capsys):
+    def write_rows(rows):
+        raise ConnectionError("network down")
+
+    writer = BackgroundWriter(write_rows)
+    writer.put([1])
+
+    assert writer.close() is False
+    assert "network down" in capsys.readouterr().out
+
+
+def test_successful_batches_close_true():
+    writer = BackgroundWriter(lambda rows: True)
+    writer.put([1])
+    assert writer.close() is True
+
+
+def test_put_blocks_when_queue_is_full():
+    started = threading.Event()
+    unblock = threading.Event()
+    written = []
+
+    def write_rows(rows):
+        started.set()
+        unblock.wait(5)
+        written.append(rows)
+        return True
+
+    writer = BackgroundWriter(write_rows, max_pending=1)
+    writer.put([1])
+    started.wait(5)
+    writer.put([2])  # 작업자가 [1]을 업로드하는 동안 큐의 한 자리를 채운다
+
+    producer = threading.Thread(target=writer.put, args=([3],))
+    producer.start()
+    producer.join(0.3)
+    # 업로드가 뒤처지면 크롤링 쪽이 기다린다
+    assert producer.is_alive()
+
+    unblock.set()
+    producer.join(5)
+    assert not producer.is_alive()
+    assert writer.close() is True
+    assert written == [[1], [2], [3]]
+    assert writer.blocked_seconds >= 0.2
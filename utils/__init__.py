@@ -1,5 +1,5 @@
 # 데이터 처리 유틸리티
-from .data import filter_data_fields
+from .data import filter_data_fields, row_fingerprint
 
 # 파일 저장 유틸리티
 from .file import save_to_excel
@@ -8,13 +8,89 @@ from .file import save_to_excel
 from .time import calculate_elapsed_time
 
 # Supabase 관련 유틸리티
-from .supabase import upload_to_supabase
+from .supabase import upload_to_supabase, sync_table_mirror
+
+# 백그라운드 업로드 유틸리티
+from .writer import BackgroundWriter
+
+# 로컬 미러 유틸리티
+from .mirror import (
+    mirror_rows,
+    reset_mirror,
+    count_mirror_rows,
+    load_mirror_numbers,
+    get_mirror_rows,
+)
+
+# 로컬 상태 파일 유틸리티
+from .state import get_state_path
+
+# HTTP 전송 유틸리티
+from .transport import (
+    http_get,
+    is_replaying,
+    is_archived,
+    get_replayed_response,
+    record_response,
+    check_cache,
+    update_cache,
+    get_host_controller,
+    configure_transport,
+    get_transport_config,
+    get_transport_stats,
+    reset_transport_stats,
+    print_transport_stats,
+    record_transport_stats,
+    create_shared_stats,
+    init_transport_worker,
+    merge_transport_stats,
+)
+
+# HTML 추출 유틸리티
+from .html_extract import (
+    has_class,
+    compile_xpath,
+    parse_html,
+    select_text,
+    extract_with_fallback,
+)
 
 
 # 외부에서 사용할 수 있도록 모든 함수 노출
 __all__ = [
     "calculate_elapsed_time",
     "upload_to_supabase",
+    "sync_table_mirror",
+    "BackgroundWriter",
+    "mirror_rows",
+    "reset_mirror",
+    "count_mirror_rows",
+    "load_mirror_numbers",
+    "get_mirror_rows",
     "save_to_excel",
     "filter_data_fields",
+    "row_fingerprint",
+    "get_state_path",
+    "http_get",
+    "is_replaying",
+    "is_archived",
+    "get_replayed_response",
+    "record_response",
+    "check_cache",
+    "update_cache",
+    "get_host_controller",
+    "configure_transport",
+    "get_transport_config",
+    "get_transport_stats",
+    "reset_transport_stats",
+    "print_transport_stats",
+    "record_transport_stats",
+    "create_shared_stats",
+    "init_transport_worker",
+    "merge_transport_stats",
+    "has_class",
+    "compile_xpath",
+    "parse_html",
+    "select_text",
+    "extract_with_fallback",
 ]
@@ -0,0 +1,187 @@
+"""
+HTTP 교환 기록/재생 아카이브 유틸리티
+
+크롤링 중 주고받은 응답을 한 파일에 기록하고, 나중에 네트워크 없이 그대로 재생합니다.
+레코드 하나(JSON 한 줄)를 독립된 gzip 멤버로 O_APPEND 쓰기 한 번에 덧붙이므로
+여러 워커 프로세스가 같은 파일에 동시에 기록해도 레코드가 섞이지 않고,
+파일 전체는 일반 gzip JSONL로 읽을 수 있습니다.
+"""
+
+import os
+import gzip
+import json
+import zlib
+import base64
+import threading
+from .http_cache import CachedResponse
+
+READ_CHUNK_SIZE = 1024 * 1024
+MEMBER_FEED_SIZE = 16 * 1024  # 압축 해제기에 한 번에 넘길 크기
+
+# 아카이브에 함께 저장할 응답 헤더
+ARCHIVED_HEADERS = ("Content-Type", "ETag", "Last-Modified")
+
+_record_files = {}
+_replay_indexes = {}
+_lock = threading.Lock()
+
+
+class ArchiveMissError(LookupError):
+    """재생 아카이브에 요청한 URL이 없을 때 발생하는 예외"""
+
+
+def record_exchange(path, url, status_code, headers, content):
+    """
+    HTTP 교환 하나를 아카이브에 덧붙입니다.
+
+    Args:
+        path (str): 아카이브 파일 경로
+        url (str): 요청 URL
+        status_code (int): 응답 상태 코드
+        headers (Mapping): 응답 헤더
+        content (bytes): 응답 본문
+    """
+    record = {
+        "url": url,
+        "status": status_code,
+        "headers": {
+            key: headers.get(key) for key in ARCHIVED_HEADERS if headers.get(key)
+        },
+        "body": base64.b64encode(content).decode("ascii"),
+    }
+    data = gzip.compress(json.dumps(record, ensure_ascii=False).encode("utf-8") + b"\n")
+
+    with _lock:
+        key = (path, os.getpid())
+        fd = _record_files.get(key)
+        if fd is None:
+            fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+            _record_files[key] = fd
+        os.write(fd, data)
+
+
+def _iter_members(path):
+    """
+    아카이브의 gzip 멤버를 (시작 위치, 길이, 내용) 형태로 순서대로 돌려줍니다.
+    마지막 멤버가 잘려 있으면 무시합니다.
+    """
+    with open(path, "rb") as f:
+        offset = 0
+        buffer = memoryview(b"")
+        position = 0  # buffer 안에서 아직 읽지 않은 위치
+        while True:
+            if position == len(buffer):
+                buffer = memoryview(f.read(READ_CHUNK_SIZE))
+                position = 0
+                if not buffer:
+                    return
+
+            start = offset
+            decompressor = zlib.decompressobj(wbits=31)
+            parts = []
+            while not decompressor.eof:
+                if position == len(buffer):
+                    buffer = memoryview(f.read(READ_CHUNK_SIZE))
+                    position = 0
+                    if not buffer:
+                        return
+                # 남은 버퍼 전체가 아니라 조금씩 넘겨서 unused_data 복사를 작게 유지한다
+                piece = buffer[position : position + MEMBER_FEED_SIZE]
+                parts.append(decompressor.decompress(piece))
+                used = len(piece) - len(decompressor.unused_data)
+                position += used
+                offset += used
+
+            yield start, offset - start, b"".join(parts)
+
+
+def iter_archive(path):
+    """
+    아카이브에 기록된 HTTP 교환을 순서대로 읽습니다.
+
+    Args:
+        path (str): 아카이브 파일 경로
+
+    Yields:
+        dict: url, status, headers, content(bytes)를 담은 레코드
+    """
+    for _, _, data in _iter_members(path):
+        yield _decode_record(data)
+
+
+def _decode_record(data):
+    record = json.loads(data)
+    record["content"] = base64.b64decode(record.pop("body"))
+    return record
+
+
+def _get_replay_index(path):
+    # URL별로 마지막 레코드의 위치만 기억하고 본문은 필요할 때 읽는다
+    with _lock:
+        index = _replay_indexes.get(path)
+        if index is None:
+            index = {}
+            for offset, length, data in _iter_members(path):
+                index[json.loads(data)["url"]] = (offset, length)
+            _replay_indexes[path] = index
+            print(f"재생 아카이브에서 {len(index)}개 URL을 불러왔습니다: {path}")
+        return index
+
+
+def load_replay_index(path):
+    """
+    재생 아카이브의 URL 인덱스를 미리 만듭니다.
+    멀티프로세싱 워커가 fork 전에 만든 인덱스를 그대로 물려받게 할 때 사용합니다.
+
+    Args:
+        path (str): 아카이브 파일 경로
+
+    Returns:
+        int: 아카이브에 있는 URL 수
+    """
+    return len(_get_replay_index(path))
+
+
+def has_url(path, url):
+    """
+    재생 아카이브에 URL이 있는지 확인합니다.
+
+    Args:
+        path (str): 아카이브 파일 경로
+        url (str): 요청 URL
+
+    Returns:
+        bool: URL 기록 여부
+    """
+    return url in _get_replay_index(path)
+
+
+def replay_response(path, url):
+    """
+    아카이브에 기록된 응답을 돌려줍니다.
+
+    Args:
+        path (str): 아카이브 파일 경로
+        url (str): 요청 URL
+
+    Returns:
+        CachedResponse: 기록된 응답
+
+    Raises:
+        ArchiveMissError: 아카이브에 URL이 없는 경우
+    """
+    position = _get_replay_index(path).get(url)
+    if position is None:
+        raise ArchiveMissError(f"재생 아카이브에 없는 URL: {url}")
+
+    offset, length = position
+    with open(path, "rb") as f:
+        f.seek(offset)
+        record = _decode_record(gzip.decompress(f.read(length)))
+
+    return CachedResponse(
+        url,
+        record["content"],
+        record["headers"].get("Content-Type"),
+        status_code=record["status"],
+    )
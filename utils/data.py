@@ -1,3 +1,7 @@
+import json
+import hashlib
+
+
 def filter_data_fields(data, fields):
     """
     데이터에서 지정한 필드만 추출합니다.
@@ -15,3 +19,26 @@ def filter_data_fields(data, fields):
         filtered_data.append(filtered_item)
 
     return filtered_data
+
+
+def row_fingerprint(row, fields, exclude=("created_at",)):
+    """
+    행의 지정한 필드 값으로 변경 감지용 해시를 계산합니다.
+    크롤링 날짜처럼 내용과 관계없이 바뀌는 필드는 제외합니다.
+
+    Args:
+        row (dict): 해시를 계산할 행
+        fields (list): 해시에 포함할 필드 목록
+        exclude (tuple): 제외할 필드 목록
+
+    Returns:
+        str: 필드 값의 SHA-1 해시 (16진수)
+    """
+    values = [
+        [field, "" if row.get(field) is None else str(row.get(field))]
+        for field in fields
+        if field not in exclude
+    ]
+    return hashlib.sha1(
+        json.dumps(values, ensure_ascii=False).encode("utf-8")
+    ).hexdigest()
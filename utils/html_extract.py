@@ -0,0 +1,95 @@
+"""
+HTML 추출 유틸리티
+
+CSS 셀렉터를 모듈 로드 시 한 번만 lxml XPath로 컴파일해 두고 lxml.html 트리에서
+바로 추출합니다. lxml 경로가 실패하면 BeautifulSoup 구현으로 대신 추출합니다.
+"""
+
+import os
+import lxml.html
+from lxml import etree
+
+# "lxml"(기본값) 또는 "bs4". bs4면 항상 BeautifulSoup 구현으로 추출
+HTML_PARSER = os.getenv("CRAWLER_HTML_PARSER", "lxml")
+
+
+def has_class(*names):
+    """
+    CSS 클래스 셀렉터(.a.b)에 해당하는 XPath 조건식을 만듭니다.
+
+    Args:
+        *names (str): 요소가 모두 가져야 하는 클래스 이름
+
+    Returns:
+        str: XPath 조건식
+    """
+    return " and ".join(
+        f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+        for name in names
+    )
+
+
+def compile_xpath(expression):
+    """
+    XPath 식을 컴파일합니다. 모듈 상수로 한 번만 만들어 재사용합니다.
+
+    Args:
+        expression (str): XPath 식
+
+    Returns:
+        lxml.etree.XPath: 컴파일된 XPath
+    """
+    return etree.XPath(expression)
+
+
+def parse_html(html):
+    """
+    HTML 문자열을 lxml 트리로 파싱합니다.
+
+    Args:
+        html (str or bytes): HTML 문서
+
+    Returns:
+        lxml.html.HtmlElement: 문서 루트 요소
+    """
+    return lxml.html.fromstring(html)
+
+
+def select_text(node, xpath):
+    """
+    컴파일된 XPath로 찾은 첫 요소의 텍스트를 반환합니다. BeautifulSoup의
+    select_one(...).text.strip()과 같은 결과입니다.
+
+    Args:
+        node (lxml.html.HtmlElement): 검색을 시작할 요소
+        xpath (lxml.etree.XPath): 컴파일된 XPath
+
+    Returns:
+        str: 공백을 제거한 텍스트 또는 None (요소가 없는 경우)
+    """
+    elements = xpath(node)
+    if not elements:
+        return None
+    return elements[0].text_content().strip()
+
+
+def extract_with_fallback(lxml_func, bs4_func, html):
+    """
+    lxml 추출 함수를 먼저 시도하고, 실패하면 BeautifulSoup 추출 함수를 사용합니다.
+
+    Args:
+        lxml_func (function): lxml 기반 추출 함수
+        bs4_func (function): BeautifulSoup 기반 추출 함수
+        html (str): HTML 문서
+
+    Returns:
+        추출 함수의 반환값
+    """
+    if HTML_PARSER == "bs4":
+        return bs4_func(html)
+
+    try:
+        return lxml_func(html)
+    except Exception:
+        # 빈 문서, 인코딩 선언이 있는 문자열 등 lxml이 거부하는 입력
+        return bs4_func(html)
@@ -0,0 +1,227 @@
+"""
+원본 HTML 응답 캐시 유틸리티
+
+응답 본문은 내용 해시로 주소를 정해 압축 저장하고(같은 본문은 한 번만 저장),
+URL별 인덱스는 SQLite에 보관합니다. ETag/Last-Modified가 있으면 조건부 요청으로
+재검증하고, 없으면 TTL 안에서만 캐시를 그대로 사용합니다.
+"""
+
+import os
+import gzip
+import time
+import sqlite3
+import hashlib
+import threading
+import requests
+from .state import get_state_path
+
+try:
+    import zstandard
+except ImportError:  # zstandard가 없으면 gzip으로 저장
+    zstandard = None
+
+CACHE_DIR = "http_cache"
+
+_local = threading.local()
+
+
+class CachedResponse:
+    """
+    캐시나 아카이브에서 꺼낸 응답. 크롤러가 사용하는 requests 응답의 속성만 제공합니다.
+
+    Args:
+        url (str): 요청 URL
+        content (bytes): 응답 본문
+        content_type (str): Content-Type 헤더 값
+        status_code (int): 응답 상태 코드
+    """
+
+    def __init__(self, url, content, content_type=None, status_code=200):
+        self.url = url
+        self.content = content
+        self.status_code = status_code
+        self.headers = {"Content-Type": content_type} if content_type else {}
+        self.encoding = _get_charset(content_type) or "utf-8"
+
+    @property
+    def text(self):
+        return self.content.decode(self.encoding, "replace")
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(
+                f"{self.status_code} Error for url: {self.url}", response=self
+            )
+
+
+def _get_charset(content_type):
+    if not content_type:
+        return None
+    for part in content_type.split(";")[1:]:
+        key, _, value = part.strip().partition("=")
+        if key.lower() == "charset" and value:
+            return value.strip('"')
+    return None
+
+
+def _get_connection():
+    # SQLite 연결은 스레드/프로세스 사이에 공유하지 않는다
+    if getattr(_local, "pid", None) != os.getpid():
+        connection = sqlite3.connect(
+            get_state_path(CACHE_DIR, "index.sqlite"), timeout=30
+        )
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                url TEXT PRIMARY KEY,
+                content_hash TEXT NOT NULL,
+                content_type TEXT,
+                etag TEXT,
+                last_modified TEXT,
+                fetched_at REAL NOT NULL
+            )
+            """)
+        _local.connection = connection
+        _local.pid = os.getpid()
+    return _local.connection
+
+
+def _object_path(content_hash):
+    extension = "zst" if zstandard else "gz"
+    return get_state_path(
+        CACHE_DIR, "objects", content_hash[:2], f"{content_hash}.{extension}"
+    )
+
+
+def lookup(url):
+    """
+    URL의 캐시 항목을 찾습니다.
+
+    Args:
+        url (str): 요청 URL
+
+    Returns:
+        dict: 캐시 항목 (content_hash, content_type, etag, last_modified, fetched_at)
+            또는 None (캐시에 없거나 본문 파일이 사라진 경우)
+    """
+    row = (
+        _get_connection()
+        .execute(
+            "SELECT content_hash, content_type, etag, last_modified, fetched_at "
+            "FROM responses WHERE url = ?",
+            (url,),
+        )
+        .fetchone()
+    )
+    if row is None or not os.path.exists(_object_path(row[0])):
+        return None
+
+    keys = ("content_hash", "content_type", "etag", "last_modified", "fetched_at")
+    return dict(zip(keys, row))
+
+
+def is_fresh(entry, ttl):
+    """
+    캐시 항목이 TTL 안에 있는지 확인합니다.
+
+    Args:
+        entry (dict): lookup으로 찾은 캐시 항목
+        ttl (float): 캐시 유효 시간(초)
+
+    Returns:
+        bool: 재검증 없이 사용해도 되는지 여부
+    """
+    return time.time() - entry["fetched_at"] < ttl
+
+
+def get_conditional_headers(entry):
+    """
+    재검증용 조건부 요청 헤더를 만듭니다.
+
+    Args:
+        entry (dict): lookup으로 찾은 캐시 항목
+
+    Returns:
+        dict: If-None-Match/If-Modified-Since 헤더. 검증자가 없으면 빈 딕셔너리
+    """
+    headers = {}
+    if entry.get("etag"):
+        headers["If-None-Match"] = entry["etag"]
+    if entry.get("last_modified"):
+        headers["If-Modified-Since"] = entry["last_modified"]
+    return headers
+
+
+def load_response(url, entry):
+    """
+    캐시 항목의 본문을 읽어 응답 객체로 만듭니다.
+
+    Args:
+        url (str): 요청 URL
+        entry (dict): lookup으로 찾은 캐시 항목
+
+    Returns:
+        CachedResponse: 캐시된 응답
+    """
+    with open(_object_path(entry["content_hash"]), "rb") as f:
+        data = f.read()
+
+    if zstandard:
+        content = zstandard.ZstdDecompressor().decompress(data)
+    else:
+        content = gzip.decompress(data)
+    return CachedResponse(url, content, entry["content_type"])
+
+
+def store(url, content, headers):
+    """
+    응답 본문을 압축 저장하고 URL 인덱스를 갱신합니다.
+
+    Args:
+        url (str): 요청 URL
+        content (bytes): 응답 본문
+        headers (Mapping): 응답 헤더
+    """
+    content_hash = hashlib.sha256(content).hexdigest()
+    path = _object_path(content_hash)
+
+    # 같은 본문은 한 번만 저장하고, 쓰다가 중단돼도 깨진 파일이 남지 않게 한다
+    if not os.path.exists(path):
+        if zstandard:
+            data = zstandard.ZstdCompressor().compress(content)
+        else:
+            data = gzip.compress(content)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, path)
+
+    connection = _get_connection()
+    with connection:
+        connection.execute(
+            "INSERT OR REPLACE INTO responses "
+            "(url, content_hash, content_type, etag, last_modified, fetched_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                url,
+                content_hash,
+                headers.get("Content-Type"),
+                headers.get("ETag"),
+                headers.get("Last-Modified"),
+                time.time(),
+            ),
+        )
+
+
+def touch(url):
+    """
+    304 응답으로 재검증된 캐시 항목의 저장 시각을 갱신합니다.
+
+    Args:
+        url (str): 요청 URL
+    """
+    connection = _get_connection()
+    with connection:
+        connection.execute(
+            "UPDATE responses SET fetched_at = ? WHERE url = ?", (time.time(), url)
+        )
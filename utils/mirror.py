@@ -0,0 +1,366 @@
+"""
+Supabase 곡 테이블의 로컬 SQLite 미러 유틸리티
+
+upload_to_supabase가 업서트한 행을 그대로 로컬 SQLite에 반영해 두고, 다음 실행에서는
+원격 테이블의 행 수와 created_at만 확인해 그동안 추가된 행만 받아 옵니다(증분 동기화).
+행 수가 맞지 않거나 마지막 전체 동기화가 오래되었으면 처음부터 다시 받습니다.
+플래너, 중복 제거, 변경 감지는 미러를 조회해 기존 곡을 밀리초 단위로 확인합니다.
+"""
+
+import os
+import json
+import sqlite3
+import datetime
+import threading
+from .state import get_state_path
+
+MIRROR_ENABLED = os.getenv("SUPABASE_MIRROR", "1") == "1"
+FULL_SYNC_HOURS = float(os.getenv("SUPABASE_MIRROR_FULL_SYNC_HOURS", "168"))
+PAGE_SIZE = 1000  # Supabase의 기본 제한
+CREATED_AT_COLUMN = "created_at"
+
+_local = threading.local()
+
+
+def _get_connection():
+    # SQLite 연결은 스레드/프로세스 사이에 공유하지 않는다
+    if getattr(_local, "pid", None) != os.getpid():
+        connection = sqlite3.connect(get_state_path("mirror.sqlite"), timeout=30)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("""
+            CREATE TABLE IF NOT EXISTS mirror_rows (
+                table_name TEXT NOT NULL,
+                key TEXT NOT NULL,
+                number INTEGER,
+                data TEXT NOT NULL,
+                PRIMARY KEY (table_name, key)
+            )
+            """)
+        connection.execute(
+            "CREATE INDEX IF NOT EXISTS mirror_rows_number "
+            "ON mirror_rows (table_name, number)"
+        )
+        connection.execute("""
+            CREATE TABLE IF NOT EXISTS mirror_meta (
+                table_name TEXT PRIMARY KEY,
+                key_column TEXT NOT NULL,
+                max_created_at TEXT,
+                full_synced_at TEXT NOT NULL
+            )
+            """)
+        _local.connection = connection
+        _local.pid = os.getpid()
+    return _local.connection
+
+
+def _to_number(key):
+    return int(key) if key.isdigit() else None
+
+
+def _store_rows(connection, table_name, rows, key_column):
+    connection.executemany(
+        "INSERT OR REPLACE INTO mirror_rows (table_name, key, number, data) "
+        "VALUES (?, ?, ?, ?)",
+        [
+            (
+                table_name,
+                str(row[key_column]),
+                _to_number(str(row[key_column])),
+                json.dumps(row, ensure_ascii=False, default=str),
+            )
+            for row in rows
+            if row.get(key_column) is not None
+        ],
+    )
+
+
+def mirror_rows(table_name, rows, key_column="number"):
+    """
+    원격 테이블에 업서트한 행을 미러에도 반영합니다.
+    아직 동기화한 적 없는 테이블이면 다음 동기화 때 전체를 받으므로 건너뜁니다.
+
+    Args:
+        table_name (str): 업서트한 Supabase 테이블 이름
+        rows (list): 업서트한 행 목록
+        key_column (str): 행을 구분하는 컬럼 (업서트 충돌 컬럼)
+    """
+    if not MIRROR_ENABLED or not rows:
+        return
+
+    try:
+        connection = _get_connection()
+        with connection:
+            meta = connection.execute(
+                "SELECT key_column FROM mirror_meta WHERE table_name = ?",
+                (table_name,),
+            ).fetchone()
+            if meta is None or meta[0] != key_column:
+                return
+            _store_rows(connection, table_name, rows, key_column)
+    except Exception as e:
+        print(f"로컬 미러 갱신 중 오류 발생: {str(e)}")
+
+
+def reset_mirror(table_name):
+    """
+    테이블의 미러를 지웁니다. 다음 동기화 때 원격 테이블 전체를 다시 받습니다.
+    키 없이 삽입하거나 테이블을 비운 경우에 사용합니다.
+
+    Args:
+        table_name (str): Supabase 테이블 이름
+    """
+    if not MIRROR_ENABLED:
+        return
+
+    try:
+        connection = _get_connection()
+        with connection:
+            connection.execute(
+                "DELETE FROM mirror_rows WHERE table_name = ?", (table_name,)
+            )
+            connection.execute(
+                "DELETE FROM mirror_meta WHERE table_name = ?", (table_name,)
+            )
+    except Exception as e:
+        print(f"로컬 미러 초기화 중 오류 발생: {str(e)}")
+
+
+def _remote_count(client, table_name, key_column):
+    # 미러는 키가 없는 행을 저장하지 않으므로 원격에서도 키가 있는 행만 센다
+    response = (
+        client.table(table_name)
+        .select(key_column, count="exact")
+        .not_.is_(key_column, "null")
+        .limit(1)
+        .execute()
+    )
+    return response.count
+
+
+def _pull_all(client, connection, table_name, key_column):
+    """키셋 페이지네이션으로 원격 테이블 전체를 받아 미러를 다시 만듭니다."""
+    max_created_at = None
+    after = None
+    count = 0
+    with connection:
+        connection.execute(
+            "DELETE FROM mirror_rows WHERE table_name = ?", (table_name,)
+        )
+        while True:
+            query = client.table(table_name).select("*").order(key_column)
+            if after is not None:
+                query = query.gt(key_column, after)
+            page = query.limit(PAGE_SIZE).execute().data
+            _store_rows(connection, table_name, page, key_column)
+            rows_created = [
+                row[CREATED_AT_COLUMN] for row in page if row.get(CREATED_AT_COLUMN)
+            ]
+            if rows_created:
+                max_created_at = max([max_created_at or ""] + rows_created)
+            count += len(page)
+            if len(page) < PAGE_SIZE:
+                break
+            after = page[-1][key_column]
+
+        connection.execute(
+            "INSERT OR REPLACE INTO mirror_meta "
+            "(table_name, key_column, max_created_at, full_synced_at) "
+            "VALUES (?, ?, ?, ?)",
+            (
+                table_name,
+                key_column,
+                max_created_at,
+                datetime.datetime.now().isoformat(timespec="seconds"),
+            ),
+        )
+    return count
+
+
+def _quote(value):
+    """PostgREST 논리 필터(or/and) 안에서 쓸 수 있도록 값을 따옴표로 감쌉니다."""
+    escaped = str(value).replace("\\", "\\\\").replace('"', '\\"')
+    return f'"{escaped}"'
+
+
+def _pull_since(client, connection, table_name, key_column, max_created_at):
+    """
+    마지막 동기화 때 본 가장 늦은 created_at 이후의 행만 받아 미러에 반영합니다.
+    created_at이 날짜 단위일 수 있으므로 같은 값의 행도 다시 받습니다.
+    페이지는 (created_at, 키) 키셋으로 넘기므로 받는 도중 행이 추가되어도 밀리지 않습니다.
+    """
+    after = None
+    count = 0
+    newest = max_created_at
+    with connection:
+        while True:
+            query = (
+                client.table(table_name)
+                .select("*")
+                .gte(CREATED_AT_COLUMN, max_created_at)
+            )
+            if after is not None:
+                created_at, key = (_quote(value) for value in after)
+                query = query.or_(
+                    f"{CREATED_AT_COLUMN}.gt.{created_at},"
+                    f"and({CREATED_AT_COLUMN}.eq.{created_at},{key_column}.gt.{key})"
+                )
+            page = (
+                query.order(CREATED_AT_COLUMN)
+                .order(key_column)
+                .limit(PAGE_SIZE)
+                .execute()
+                .data
+            )
+            _store_rows(connection, table_name, page, key_column)
+            if page:
+                newest = max(newest, page[-1][CREATED_AT_COLUMN])
+            count += len(page)
+            if len(page) < PAGE_SIZE:
+                break
+            after = (page[-1][CREATED_AT_COLUMN], page[-1][key_column])
+
+        connection.execute(
+            "UPDATE mirror_meta SET max_created_at = ? WHERE table_name = ?",
+            (newest, table_name),
+        )
+    return count
+
+
+def sync_mirror(client, table_name, key_column="number"):
+    """
+    미러를 원격 테이블과 맞춥니다.
+    - 마지막 created_at 이후에 추가된 행만 받아 반영 (증분 동기화)
+    - 그 뒤 원격 행 수와 로컬 행 수가 다르면(삭제, created_at 없는 테이블 등)
+      또는 마지막 전체 동기화가 FULL_SYNC_HOURS보다 오래되었으면 전체를 다시 받음
+
+    Args:
+        client (supabase.Client): Supabase 클라이언트
+        table_name (str): Supabase 테이블 이름
+        key_column (str): 행을 구분하는 컬럼
+
+    Returns:
+        bool: 미러를 사용할 수 있으면 True
+    """
+    if not MIRROR_ENABLED:
+        return False
+
+    try:
+        connection = _get_connection()
+        meta = connection.execute(
+            "SELECT key_column, max_created_at, full_synced_at FROM mirror_meta "
+            "WHERE table_name = ?",
+            (table_name,),
+        ).fetchone()
+
+        expired = (
+            meta is None
+            or meta[0] != key_column
+            or datetime.datetime.fromisoformat(meta[2])
+            < datetime.datetime.now() - datetime.timedelta(hours=FULL_SYNC_HOURS)
+        )
+
+        if not expired:
+            pulled = 0
+            if meta[1]:
+                pulled = _pull_since(
+                    client, connection, table_name, key_column, meta[1]
+                )
+            remote_count = _remote_count(client, table_name, key_column)
+            local_count = count_mirror_rows(table_name)
+            if remote_count == local_count:
+                print(
+                    f"로컬 미러 동기화: '{table_name}' 새 행 {pulled}개 반영 "
+                    f"(총 {local_count}개)"
+                )
+                return True
+            print(
+                f"로컬 미러 행 수가 원격과 다릅니다 "
+                f"(로컬: {local_count}, 원격: {remote_count}). 전체를 다시 받습니다."
+            )
+
+        print(f"로컬 미러 전체 동기화: '{table_name}' 테이블을 받는 중...")
+        count = _pull_all(client, connection, table_name, key_column)
+        print(f"로컬 미러 전체 동기화 완료: {count}개 행")
+        return True
+    except Exception as e:
+        print(f"로컬 미러 동기화 중 오류 발생: {str(e)}")
+        return False
+
+
+def count_mirror_rows(table_name):
+    """
+    미러에 있는 행 수를 반환합니다.
+
+    Args:
+        table_name (str): Supabase 테이블 이름
+
+    Returns:
+        int: 행 수
+    """
+    return (
+        _get_connection()
+        .execute("SELECT COUNT(*) FROM mirror_rows WHERE table_name = ?", (table_name,))
+        .fetchone()[0]
+    )
+
+
+def load_mirror_numbers(
+    table_name, on_numbers, start_number=None, end_number=None, batch_size=PAGE_SIZE
+):
+    """
+    미러에 있는 숫자 번호를 오름차순으로 batch_size개씩 on_numbers에 넘깁니다.
+
+    Args:
+        table_name (str): Supabase 테이블 이름
+        on_numbers (function): 번호(int) 목록 하나를 받아 처리하는 함수
+        start_number (int, optional): 조회할 최소 번호
+        end_number (int, optional): 조회할 최대 번호
+        batch_size (int): 한 번에 넘길 번호 수
+
+    Returns:
+        int: 넘긴 번호 수
+    """
+    cursor = _get_connection().execute(
+        "SELECT number FROM mirror_rows "
+        "WHERE table_name = ? AND number IS NOT NULL AND number BETWEEN ? AND ? "
+        "ORDER BY number",
+        (
+            table_name,
+            start_number if start_number is not None else -(2**63),
+            end_number if end_number is not None else 2**63 - 1,
+        ),
+    )
+    count = 0
+    while True:
+        numbers = [number for (number,) in cursor.fetchmany(batch_size)]
+        if not numbers:
+            return count
+        on_numbers(numbers)
+        count += len(numbers)
+
+
+def get_mirror_rows(table_name, keys):
+    """
+    미러에서 키에 해당하는 행을 조회합니다.
+
+    Args:
+        table_name (str): Supabase 테이블 이름
+        keys (iterable): 조회할 키 목록
+
+    Returns:
+        dict: 키(문자열)를 행으로 매핑한 딕셔너리 (미러에 없는 키는 제외)
+    """
+    connection = _get_connection()
+    keys = [str(key) for key in keys]
+    rows = {}
+    # SQLite 변수 개수 제한을 넘지 않도록 나눠서 조회
+    for i in range(0, len(keys), 500):
+        part = keys[i : i + 500]
+        placeholders = ", ".join("?" * len(part))
+        for key, data in connection.execute(
+            f"SELECT key, data FROM mirror_rows "
+            f"WHERE table_name = ? AND key IN ({placeholders})",
+            [table_name] + part,
+        ):
+            rows[key] = json.loads(data)
+    return rows
@@ -0,0 +1,180 @@
+"""
+호스트별 적응형 동시성 제어 유틸리티
+
+TCP 혼잡 제어처럼 응답이 건강하면 동시 요청 수를 조금씩 늘리고(가산 증가),
+429/5xx 응답이나 타임아웃이 나면 절반으로 줄입니다(승산 감소).
+호스트별 토큰 버킷으로 초당 요청 수 상한도 함께 적용합니다.
+"""
+
+import time
+import asyncio
+import threading
+
+# AIMD 설정
+INITIAL_WINDOW = 4  # 시작 동시 요청 수
+MIN_WINDOW = 1  # 최소 동시 요청 수
+MAX_WINDOW = 256  # 최대 동시 요청 수
+DECREASE_FACTOR = 0.5  # 혼잡 신호 시 곱할 비율
+LATENCY_TARGET = 2.0  # 이 시간(초)을 넘는 응답은 증가 근거로 삼지 않음
+
+# 혼잡 신호로 보는 응답 상태 코드
+BACKOFF_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class HostController:
+    """
+    한 호스트에 대한 동시 요청 수(혼잡 윈도우)와 초당 요청 수를 조절하는 컨트롤러.
+
+    Args:
+        max_rps (float): 초당 최대 요청 수. 0 또는 None이면 제한하지 않음
+        max_window (int): 혼잡 윈도우 상한
+    """
+
+    def __init__(self, max_rps=None, max_window=MAX_WINDOW):
+        self.max_rps = max_rps or 0
+        self.max_window = max_window
+        self.window = float(min(INITIAL_WINDOW, max_window))
+        self.in_flight = 0
+        self.tokens = max(1.0, self.max_rps)
+        self.last_refill = time.monotonic()
+        self.last_decrease = 0.0
+        self.paused_until = 0.0
+        self.srtt = None  # 평활화한 응답 시간
+        self.backoffs = 0
+        self.condition = threading.Condition()
+        self.async_waiters = []  # 슬롯 반납을 기다리는 (이벤트 루프, 퓨처) 목록
+
+    def _refill(self, now):
+        if not self.max_rps:
+            return
+        elapsed = now - self.last_refill
+        self.tokens = min(max(1.0, self.max_rps), self.tokens + elapsed * self.max_rps)
+        self.last_refill = now
+
+    def _try_acquire(self):
+        """
+        요청 슬롯을 즉시 얻을 수 있으면 얻고, 아니면 기다릴 시간을 반환합니다.
+
+        Returns:
+            float: 0이면 획득 성공, 양수면 다시 시도하기까지 기다릴 시간(초),
+                None이면 다른 요청이 슬롯을 반납할 때까지 대기
+        """
+        with self.condition:
+            now = time.monotonic()
+            if now < self.paused_until:
+                return self.paused_until - now
+            if self.in_flight >= int(self.window):
+                return None
+            self._refill(now)
+            if self.max_rps and self.tokens < 1.0:
+                return (1.0 - self.tokens) / self.max_rps
+            if self.max_rps:
+                self.tokens -= 1.0
+            self.in_flight += 1
+            return 0
+
+    def acquire(self):
+        """요청 슬롯을 얻을 때까지 현재 스레드를 대기시킵니다."""
+        with self.condition:
+            while True:
+                wait = self._try_acquire()
+                if wait == 0:
+                    return
+                # 확인과 대기를 같은 락 안에서 하므로 release의 알림을 놓치지 않는다
+                self.condition.wait(wait)
+
+    async def acquire_async(self):
+        """요청 슬롯을 얻을 때까지 현재 코루틴을 대기시킵니다."""
+        loop = asyncio.get_running_loop()
+        while True:
+            with self.condition:
+                wait = self._try_acquire()
+                if wait == 0:
+                    return
+                waiter = loop.create_future()
+                self.async_waiters.append((loop, waiter))
+            try:
+                await asyncio.wait([waiter], timeout=wait)
+            finally:
+                with self.condition:
+                    if (loop, waiter) in self.async_waiters:
+                        self.async_waiters.remove((loop, waiter))
+
+    def release(self, latency, status_code=None, failed=False, retry_after=None):
+        """
+        요청 결과를 반영해 혼잡 윈도우를 조절하고 슬롯을 반납합니다.
+
+        Args:
+            latency (float): 응답 시간(초)
+            status_code (int): 응답 상태 코드. 응답을 받지 못했으면 None
+            failed (bool): 타임아웃이나 연결 오류로 실패했는지 여부
+            retry_after (float): 서버가 알려준 재시도 대기 시간(초)
+        """
+        with self.condition:
+            self.in_flight = max(self.in_flight - 1, 0)
+            now = time.monotonic()
+
+            if failed or status_code in BACKOFF_STATUS_CODES:
+                # 같은 혼잡 구간에서 여러 번 줄이지 않도록 응답 시간 한 번에 한 번만 감소
+                if now - self.last_decrease >= (self.srtt or latency):
+                    self.window = max(MIN_WINDOW, self.window * DECREASE_FACTOR)
+                    self.last_decrease = now
+                    self.backoffs += 1
+                if retry_after:
+                    self.paused_until = max(self.paused_until, now + retry_after)
+            else:
+                self.srtt = (
+                    latency
+                    if self.srtt is None
+                    else 0.875 * self.srtt + 0.125 * latency
+                )
+                if latency <= LATENCY_TARGET:
+                    # 윈도우 하나만큼 응답이 돌아오면 1 증가
+                    self.window = min(self.max_window, self.window + 1.0 / self.window)
+
+            self.condition.notify_all()
+            waiters, self.async_waiters = self.async_waiters, []
+
+        # 다른 스레드의 이벤트 루프에서 기다리는 코루틴도 깨운다
+        for loop, waiter in waiters:
+            try:
+                loop.call_soon_threadsafe(_wake, waiter)
+            except RuntimeError:
+                # 이미 닫힌 이벤트 루프
+                pass
+
+    def get_stats(self):
+        """
+        컨트롤러 상태를 반환합니다.
+
+        Returns:
+            dict: 현재 윈도우, 감소 횟수, 평균 응답 시간, 초당 요청 상한
+        """
+        with self.condition:
+            return {
+                "window": int(self.window),
+                "backoffs": self.backoffs,
+                "srtt": self.srtt,
+                "max_rps": self.max_rps,
+            }
+
+
+def _wake(waiter):
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+def parse_retry_after(value):
+    """
+    Retry-After 헤더 값을 초 단위로 변환합니다. 날짜 형식은 무시합니다.
+
+    Args:
+        value (str): Retry-After 헤더 값
+
+    Returns:
+        float: 대기 시간(초) 또는 None
+    """
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None
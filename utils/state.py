@@ -0,0 +1,19 @@
+import os
+
+# 크롤러 로컬 상태(저널, 캐시 등)를 보관할 디렉터리
+STATE_DIR = os.getenv("CRAWL_STATE_DIR", ".crawl_state")
+
+
+def get_state_path(*parts):
+    """
+    크롤러 상태 디렉터리 아래의 경로를 반환합니다. 상위 디렉터리는 미리 만들어 둡니다.
+
+    Args:
+        *parts (str): 상태 디렉터리 기준 하위 경로
+
+    Returns:
+        str: 상태 파일 경로
+    """
+    path = os.path.join(STATE_DIR, *parts)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    return path
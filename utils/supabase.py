@@ -1,7 +1,19 @@
 import os
+import gzip
+import json
 import time
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+import requests
 from dotenv import load_dotenv
 from supabase import create_client
+from .mirror import mirror_rows, reset_mirror, sync_mirror
+
+try:
+    import orjson
+except ImportError:  # orjson이 없으면 표준 json으로 직렬화
+    orjson = None
 
 # 환경 변수 로드
 load_dotenv()
@@ -13,22 +25,358 @@ SUPABASE_KEY = os.getenv("SUPABASE_KEY")
 # Supabase 클라이언트 초기화
 supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
 
+# 업로드 엔진 설정
+UPLOAD_WORKERS = int(os.getenv("SUPABASE_UPLOAD_WORKERS", "4"))  # 동시 배치 요청 수
+INITIAL_BATCH_ROWS = 100  # 처음 배치 크기(행 수)
+MIN_BATCH_ROWS = 10  # 최소 배치 크기
+MAX_BATCH_ROWS = 5000  # 최대 배치 크기
+MAX_BATCH_BYTES = 2 * 1024 * 1024  # 배치 하나의 최대 요청 본문 크기(바이트)
+TARGET_BATCH_SECONDS = 2.0  # 배치 하나의 목표 응답 시간(초)
+GROWTH_FACTOR = 1.5  # 응답이 빠를 때 배치 크기에 곱할 비율
+MAX_THROTTLE_RETRIES = 6  # 스로틀링 응답에 대한 배치별 최대 재시도 횟수
+BACKOFF_BASE_SECONDS = 1.0  # 스로틀링 백오프 시작 대기 시간(초)
+BACKOFF_MAX_SECONDS = 60.0  # 스로틀링 백오프 최대 대기 시간(초)
+
+UPLOAD_TIMEOUT = 60  # 배치 요청 타임아웃(초)
+# 요청 본문 gzip 압축 여부. PostgREST는 압축된 본문을 풀지 않으므로(400 PGRST102)
+# 앞단 게이트웨이가 Content-Encoding: gzip을 풀어 주는 환경에서만 켠다
+UPLOAD_GZIP = os.getenv("SUPABASE_UPLOAD_GZIP", "0") == "1"
+GZIP_MIN_BYTES = 1024  # 이보다 작은 요청 본문은 압축하지 않음
+GZIP_LEVEL = 5  # 압축 수준 (높을수록 작지만 느림)
+GENERATION_TABLE_SUFFIX = "_generations"  # 세대 발행 모드에서 행을 넣을 테이블 접미사
+
+# 스로틀링으로 보는 응답 상태 코드와 PostgREST 오류 코드
+# (PGRST000~003은 PostgREST가 DB 연결 풀이 부족할 때 보내는 코드)
+THROTTLE_STATUS_CODES = {429, 503}
+THROTTLE_CODES = {"PGRST000", "PGRST001", "PGRST002", "PGRST003"}
+
+# 압축한 요청 본문을 읽지 못했다는 응답 (415 또는 본문을 JSON으로 해석하지 못한 400)
+GZIP_REJECTED_STATUS_CODES = {415}
+GZIP_REJECTED_CODES = {"PGRST102"}
+
+
+class UploadController:
+    """
+    한 테이블에 대한 업로드 배치 크기와 스로틀링 대기 시각을 조절하는 컨트롤러.
+    응답이 목표 시간보다 빠르면 배치를 키우고, 느리면 응답 시간에 비례해 줄이며,
+    요청 본문이 MAX_BATCH_BYTES를 넘지 않도록 행 하나의 평균 크기로 상한을 둡니다.
+    같은 테이블에 대한 다음 업로드(스트리밍 업로드의 다음 플러시 등)도 조절한 크기로 시작합니다.
+    서버가 gzip 요청 본문을 거부하면 이 테이블에 대해서는 압축을 끕니다.
+    """
+
+    def __init__(self):
+        self.batch_rows = INITIAL_BATCH_ROWS
+        self.bytes_per_row = None
+        self.paused_until = 0.0
+        self.gzip = UPLOAD_GZIP
+
+    def next_batch_size(self):
+        """
+        다음 배치에 담을 행 수를 반환합니다.
+
+        Returns:
+            int: 배치 크기
+        """
+        rows = self.batch_rows
+        if self.bytes_per_row:
+            rows = min(rows, int(MAX_BATCH_BYTES / self.bytes_per_row))
+        return max(MIN_BATCH_ROWS, rows)
+
+    def record(self, rows, payload_bytes, elapsed, throttled):
+        """
+        배치 하나의 결과를 반영해 다음 배치 크기를 조절합니다.
+
+        Args:
+            rows (int): 배치의 행 수
+            payload_bytes (int): 요청 본문 크기(바이트)
+            elapsed (float): 마지막 시도의 응답 시간(초)
+            throttled (bool): 스로틀링 응답을 받은 적이 있는지 여부
+        """
+        if rows:
+            per_row = payload_bytes / rows
+            self.bytes_per_row = (
+                per_row
+                if self.bytes_per_row is None
+                else 0.8 * self.bytes_per_row + 0.2 * per_row
+            )
+
+        if throttled:
+            self.batch_rows = max(MIN_BATCH_ROWS, self.batch_rows // 2)
+        elif elapsed > TARGET_BATCH_SECONDS:
+            # 응답 시간이 목표에 맞도록 비례해서 줄인다
+            self.batch_rows = max(
+                MIN_BATCH_ROWS, int(rows * TARGET_BATCH_SECONDS / elapsed)
+            )
+        elif elapsed < TARGET_BATCH_SECONDS / 2 and rows >= self.batch_rows:
+            # 꽉 찬 배치가 빨리 끝났을 때만 키운다 (마지막 자투리 배치는 근거로 삼지 않음)
+            self.batch_rows = min(MAX_BATCH_ROWS, int(self.batch_rows * GROWTH_FACTOR))
+
+    def pause(self, seconds):
+        """
+        스로틀링 응답을 받았을 때 모든 작업자가 새 배치를 보내지 않고 기다리게 합니다.
+
+        Args:
+            seconds (float): 기다릴 시간(초)
+        """
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    def wait_if_paused(self):
+        """스로틀링 대기 시각까지 현재 스레드를 대기시킵니다."""
+        delay = self.paused_until - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+
+_controllers = {}
+_controllers_lock = threading.Lock()
+
+
+def get_upload_controller(table_name):
+    """
+    테이블의 업로드 컨트롤러를 반환합니다. 없으면 새로 만듭니다.
+
+    Args:
+        table_name (str): Supabase 테이블 이름
+
+    Returns:
+        UploadController: 업로드 컨트롤러
+    """
+    with _controllers_lock:
+        if table_name not in _controllers:
+            _controllers[table_name] = UploadController()
+        return _controllers[table_name]
+
+
+class UploadResponseError(RuntimeError):
+    """
+    PostgREST가 배치 업로드 요청에 오류 상태 코드로 응답했을 때 발생하는 예외.
+
+    Args:
+        response (requests.Response): 오류 응답
+    """
+
+    def __init__(self, response):
+        self.status_code = response.status_code
+        self.retry_after = response.headers.get("Retry-After")
+        try:
+            self.code = str(response.json().get("code") or "")
+        except Exception:
+            self.code = ""
+        super().__init__(
+            f"업로드 요청 오류. 상태 코드: {response.status_code}, "
+            f"오류 내용: {response.text[:500]}"
+        )
+
+    @property
+    def throttled(self):
+        """bool: 서버가 요청을 줄이라고 응답했는지 여부"""
+        return self.status_code in THROTTLE_STATUS_CODES or self.code in THROTTLE_CODES
+
+    @property
+    def gzip_rejected(self):
+        """bool: 서버가 압축한 요청 본문을 읽지 못했는지 여부"""
+        return self.status_code in GZIP_REJECTED_STATUS_CODES or (
+            self.status_code == 400 and self.code in GZIP_REJECTED_CODES
+        )
+
+
+class UploadStats:
+    """
+    업로드 한 번에서 주고받은 바이트 수 합계.
+    """
+
+    def __init__(self):
+        self.batches = 0
+        self.raw_bytes = 0
+        self.sent_bytes = 0
+        self.received_bytes = 0
+
+    def add(self, raw_bytes, sent_bytes, received_bytes):
+        """
+        배치 하나의 전송량을 더합니다.
+
+        Args:
+            raw_bytes (int): 압축 전 요청 본문 크기
+            sent_bytes (int): 실제로 보낸 요청 본문 크기
+            received_bytes (int): 받은 응답 헤더와 본문 크기
+        """
+        self.batches += 1
+        self.raw_bytes += raw_bytes
+        self.sent_bytes += sent_bytes
+        self.received_bytes += received_bytes
+
+    def summary(self):
+        """
+        전송량 요약 문자열을 반환합니다.
+
+        Returns:
+            str: 요약 문자열
+        """
+        ratio = self.sent_bytes / self.raw_bytes if self.raw_bytes else 1.0
+        return (
+            f"배치 {self.batches}개, 보냄 {_format_bytes(self.sent_bytes)} "
+            f"(압축 전 {_format_bytes(self.raw_bytes)}, {ratio:.0%}), "
+            f"받음 {_format_bytes(self.received_bytes)}"
+        )
+
+
+def _format_bytes(size):
+    if size < 1024:
+        return f"{size}B"
+    if size < 1024 * 1024:
+        return f"{size / 1024:.1f}KB"
+    return f"{size / (1024 * 1024):.1f}MB"
+
+
+_session_local = threading.local()
+
+
+def _get_session():
+    # 작업자 스레드마다 연결을 재사용하는 세션을 하나씩 둔다
+    session = getattr(_session_local, "session", None)
+    if session is None:
+        session = requests.Session()
+        session.headers.update(
+            {
+                "apikey": SUPABASE_KEY,
+                "Authorization": f"Bearer {SUPABASE_KEY}",
+                "Content-Type": "application/json",
+            }
+        )
+        _session_local.session = session
+    return session
+
+
+def _encode_rows(rows):
+    """
+    행 목록을 JSON 바이트로 직렬화합니다. orjson이 있으면 orjson을 사용합니다.
+
+    Args:
+        rows (list): 직렬화할 행 목록
+
+    Returns:
+        bytes: UTF-8 JSON 바이트
+    """
+    if orjson is not None:
+        return orjson.dumps(rows, default=str)
+    return json.dumps(
+        rows, ensure_ascii=False, separators=(",", ":"), default=str
+    ).encode("utf-8")
+
+
+def _unique_columns(rows):
+    # 행마다 키가 달라도 PostgREST가 같은 컬럼 목록으로 삽입하도록 지정한다
+    columns = dict.fromkeys(key for row in rows for key in row)
+    return ",".join(columns)
+
+
+def _send_batch(batch, body, table_name, conflict_column, update_mode, controller):
+    """
+    배치 하나를 PostgREST에 직접 보냅니다. 삽입한 행을 돌려받지 않도록
+    return=minimal을 요청하고, 컨트롤러가 압축을 켜 두었고 요청 본문이 충분히 크면
+    gzip으로 압축합니다.
+
+    Returns:
+        tuple: (실제로 보낸 요청 본문 크기, 받은 응답 헤더와 본문 크기)
+    """
+    prefer = ["return=minimal"]
+    params = {"columns": _unique_columns(batch)}
+    if update_mode == "upsert":
+        prefer.append("resolution=merge-duplicates")
+        params["on_conflict"] = conflict_column
+    headers = {"Prefer": ",".join(prefer)}
+
+    payload = body
+    if controller.gzip and len(body) >= GZIP_MIN_BYTES:
+        payload = gzip.compress(body, compresslevel=GZIP_LEVEL)
+        headers["Content-Encoding"] = "gzip"
+
+    response = _get_session().post(
+        f"{SUPABASE_URL}/rest/v1/{table_name}",
+        params=params,
+        data=payload,
+        headers=headers,
+        timeout=UPLOAD_TIMEOUT,
+    )
+
+    if response.status_code >= 300:
+        error = UploadResponseError(response)
+        # 압축한 본문을 받지 않는 서버면 이 테이블의 압축을 끄고 다시 보낸다
+        if error.gzip_rejected and "Content-Encoding" in headers:
+            if controller.gzip:
+                print("서버가 gzip 요청 본문을 지원하지 않아 압축 없이 업로드합니다.")
+                controller.gzip = False
+            return _send_batch(
+                batch, body, table_name, conflict_column, update_mode, controller
+            )
+        raise error
+
+    received = len(response.content) + sum(
+        len(key) + len(value) + 4 for key, value in response.headers.items()
+    )
+    return len(payload), received
+
+
+def _retry_delay(error, attempt):
+    # 서버가 Retry-After로 기다릴 시간을 알려 주면 그 시간을 따른다
+    if error.retry_after and error.retry_after.isdigit():
+        return min(BACKOFF_MAX_SECONDS, float(error.retry_after))
+    delay = min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2**attempt)
+    return delay * random.uniform(0.5, 1.0)
+
+
+def _upload_batch(batch, table_name, conflict_column, update_mode, controller):
+    """
+    배치 하나를 업로드합니다. 스로틀링 응답이면 지수 백오프(지터 포함)로 재시도하고,
+    다른 오류는 그대로 올려 보냅니다.
+
+    Returns:
+        tuple: (마지막 시도의 응답 시간, 압축 전 요청 본문 크기, 보낸 바이트 수,
+            받은 바이트 수, 스로틀링 응답을 받았는지 여부)
+    """
+    body = _encode_rows(batch)
+    throttled = False
+    for attempt in range(MAX_THROTTLE_RETRIES + 1):
+        controller.wait_if_paused()
+        started = time.monotonic()
+        try:
+            sent, received = _send_batch(
+                batch, body, table_name, conflict_column, update_mode, controller
+            )
+            elapsed = time.monotonic() - started
+            return elapsed, len(body), sent, received, throttled
+        except UploadResponseError as e:
+            if not e.throttled or attempt == MAX_THROTTLE_RETRIES:
+                raise
+            throttled = True
+            delay = _retry_delay(e, attempt)
+            print(
+                f"업로드 스로틀링 응답({e.code or e.status_code}): "
+                f"{delay:.1f}초 후 다시 시도합니다. ({attempt + 1}/{MAX_THROTTLE_RETRIES})"
+            )
+            controller.pause(delay)
+
 
 def upload_to_supabase(
-    data, table_name, batch_size=100, conflict_column=None, update_mode="insert"
+    data, table_name, batch_size=None, conflict_column=None, update_mode="insert"
 ):
     """
-    Supabase에 데이터를 업로드합니다.
+    Supabase에 데이터를 업로드합니다. 배치를 UPLOAD_WORKERS개까지 동시에 PostgREST로
+    직접 보내고(return=minimal, SUPABASE_UPLOAD_GZIP=1이면 gzip 압축), 429/503 등 스로틀링 응답을 받았을 때만 백오프합니다.
+    업서트한 행은 로컬 미러에도 반영하고, 키 없이 삽입하거나 테이블을 비우면 로컬 미러를 지웁니다.
 
     Args:
         data (list): 업로드할 데이터 리스트
         table_name (str): 업로드할 테이블 이름
-        batch_size (int): 한 번에 업로드할 배치 크기
+        batch_size (int, optional): 처음 배치 크기. None이면 테이블별로 조절해 온 크기를 사용.
+            이후 배치 크기는 응답 시간과 요청 본문 크기에 맞춰 조절
         conflict_column (str): 충돌 검사 기준 컬럼. 'upsert' 모드에서 사용
         update_mode (str): 업데이트 방식
             - "insert": 기본값. 새 데이터 삽입
             - "upsert": conflict_column을 기준으로 업서트
             - "truncate": 테이블을 비우고 새 데이터 삽입
+            - "generation": <테이블>_generations에 새 세대로 삽입한 뒤 현재 세대 포인터를
+              바꾸고, 이전 세대는 백그라운드에서 정리 (sql/chart_generations.sql 필요)
 
     Returns:
         bool: 업로드 성공 여부
@@ -42,7 +390,7 @@ def upload_to_supabase(
         return False
 
     # 업데이트 모드 검증
-    valid_modes = ["insert", "upsert", "truncate"]
+    valid_modes = ["insert", "upsert", "truncate", "generation"]
     if update_mode not in valid_modes:
         print(f"유효하지 않은 업데이트 모드입니다. {valid_modes} 중 하나를 사용하세요.")
         return False
@@ -52,40 +400,134 @@ def upload_to_supabase(
         print("upsert 모드에서는 conflict_column이 필요합니다.")
         return False
 
+    if update_mode == "generation":
+        return _publish_generation(data, table_name, batch_size)
+
     # truncate 모드에서 테이블 비우기
     if update_mode == "truncate":
         try:
             # 항상 true인 조건으로 모든 레코드 삭제
             supabase.table(table_name).delete().neq("id", -99999).execute()
             print(f"'{table_name}' 테이블의 기존 데이터를 삭제했습니다.")
+            reset_mirror(table_name)
         except Exception as e:
             print(f"테이블 데이터 삭제 중 오류 발생: {str(e)}")
             return False
 
+    controller = get_upload_controller(table_name)
+    if batch_size:
+        controller.batch_rows = max(MIN_BATCH_ROWS, min(MAX_BATCH_ROWS, batch_size))
+    workers = max(1, UPLOAD_WORKERS)
+
+    stats = UploadStats()
     success_count = 0
-    for i in range(0, len(data), batch_size):
-        batch = data[i : i + batch_size]
-        try:
-            # 업서트 또는 삽입
-            if update_mode == "upsert":
-                response = (
-                    supabase.table(table_name)
-                    .upsert(batch, on_conflict=conflict_column)
-                    .execute()
+    offset = 0
+    pending = {}
+    failed = False
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        while pending or (offset < len(data) and not failed):
+            # 동시 요청 수 안에서 조절된 크기의 배치를 보낸다
+            while not failed and offset < len(data) and len(pending) < workers:
+                batch = data[offset : offset + controller.next_batch_size()]
+                offset += len(batch)
+                future = executor.submit(
+                    _upload_batch,
+                    batch,
+                    table_name,
+                    conflict_column,
+                    update_mode,
+                    controller,
                 )
-            else:  # insert or truncate
-                response = supabase.table(table_name).insert(batch).execute()
-            if hasattr(response, "error") and response.error:
-                print(f"업로드 실패 (배치 {i//batch_size + 1}): {response.error}")
-                return False
+                pending[future] = batch
 
-            success_count += len(batch)
-            print(f"업로드 진행 중: {success_count}/{len(data)} 완료")
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                batch = pending.pop(future)
+                try:
+                    elapsed, payload_bytes, sent, received, throttled = future.result()
+                except Exception as e:
+                    print(f"업로드 중 오류 발생: {str(e)}")
+                    failed = True
+                    continue
 
-            time.sleep(0.5)
+                controller.record(len(batch), payload_bytes, elapsed, throttled)
+                stats.add(payload_bytes, sent, received)
 
-        except Exception as e:
-            print(f"업로드 중 오류 발생: {str(e)}")
-            return False
+                # 원격에 반영된 행을 로컬 미러에도 반영
+                if update_mode == "upsert":
+                    mirror_rows(table_name, batch, conflict_column)
+                elif update_mode == "insert":
+                    reset_mirror(table_name)
+
+                success_count += len(batch)
+                print(
+                    f"업로드 진행 중: {success_count}/{len(data)} 완료 "
+                    f"(배치 {len(batch)}행, {elapsed:.2f}초, "
+                    f"보냄 {_format_bytes(sent)}, 받음 {_format_bytes(received)})"
+                )
+
+    if stats.batches:
+        print(f"업로드 전송량: {stats.summary()}")
+    if failed:
+        return False
+    return True
+
+
+def _publish_generation(data, table_name, batch_size=None):
+    """
+    새 세대 번호로 모든 행을 넣은 뒤 한 번의 RPC로 현재 세대를 바꿉니다.
+    업로드가 끝날 때까지 읽는 쪽은 이전 세대를 보므로 빈 차트가 보이지 않습니다.
+    """
+    # 여러 노드/실행 사이에서도 나중에 시작한 실행이 더 큰 세대 번호를 갖도록 시각을 쓴다
+    generation = int(time.time() * 1000)
+    generation_table = f"{table_name}{GENERATION_TABLE_SUFFIX}"
+    rows = [{**row, "generation": generation} for row in data]
+
+    if not upload_to_supabase(rows, generation_table, batch_size, update_mode="insert"):
+        print(f"새 세대 업로드에 실패해 '{table_name}'의 현재 차트를 그대로 둡니다.")
+        return False
 
+    try:
+        supabase.rpc(
+            "publish_chart_generation",
+            {"p_chart": table_name, "p_generation": generation},
+        ).execute()
+    except Exception as e:
+        print(f"세대 전환 중 오류 발생: {str(e)}")
+        return False
+    print(f"'{table_name}' 차트를 세대 {generation}(으)로 전환했습니다.")
+    reset_mirror(table_name)
+
+    # 이전 세대 정리는 기다리지 않는다 (프로세스는 정리가 끝난 뒤 종료)
+    threading.Thread(
+        target=_collect_old_generations,
+        args=(table_name, generation),
+        name=f"chart-gc-{table_name}",
+    ).start()
     return True
+
+
+def _collect_old_generations(table_name, generation):
+    try:
+        response = supabase.rpc(
+            "gc_chart_generations", {"p_chart": table_name, "p_before": generation}
+        ).execute()
+        print(f"'{table_name}' 이전 세대 행 {response.data}개를 정리했습니다.")
+    except Exception as e:
+        print(f"이전 세대 정리 중 오류 발생: {str(e)}")
+
+
+def sync_table_mirror(table_name, key_column="number"):
+    """
+    테이블의 로컬 미러를 원격 테이블과 맞춥니다.
+
+    Args:
+        table_name (str): Supabase 테이블 이름
+        key_column (str): 행을 구분하는 컬럼
+
+    Returns:
+        bool: 미러를 사용할 수 있으면 True
+    """
+    if not SUPABASE_URL or not SUPABASE_KEY:
+        return False
+    return sync_mirror(supabase, table_name, key_column)
@@ -0,0 +1,524 @@
+"""
+HTTP 전송 유틸리티
+
+호스트별로 keep-alive 연결 풀을 가진 세션을 프로세스마다 하나씩 유지하고,
+연결 재사용 통계를 집계합니다.
+"""
+
+import os
+import time
+import threading
+import multiprocessing
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+from .rate_limit import HostController, parse_retry_after
+from . import http_cache
+from . import archive
+
+# 연결 풀 설정
+POOL_CONNECTIONS = 4  # 세션당 유지할 호스트 풀 수
+POOL_MAXSIZE = 32  # 호스트당 유지할 최대 연결 수
+
+# 전송 설정 (워커 프로세스에 그대로 전달됨)
+_config = {
+    "http2": os.getenv("CRAWLER_HTTP2", "") == "1",
+    # 호스트별 초당 최대 요청 수 (0이면 제한 없음)
+    "rate_limits": {
+        "kysing.kr": float(os.getenv("KY_MAX_RPS", "20")),
+        "tjmedia.com": float(os.getenv("TJ_MAX_RPS", "20")),
+    },
+    # 여러 프로세스가 상한을 나눠 쓸 때 곱할 비율
+    "rate_scale": 1.0,
+    # 원본 HTML 캐시 모드
+    #   - "off": 캐시 사용 안 함
+    #   - "revalidate": TTL 안에서는 캐시 사용, 지나면 ETag/Last-Modified로 재검증
+    #   - "reuse": 캐시에 있으면 나이와 상관없이 사용 (파서 수정 후 재파싱용)
+    "cache_mode": os.getenv("CRAWLER_CACHE", "off"),
+    "cache_ttl": float(os.getenv("CRAWLER_CACHE_TTL", "86400")),  # 초
+    # HTTP 교환을 기록할 아카이브 경로, 네트워크 대신 재생할 아카이브 경로
+    "record_path": None,
+    "replay_path": None,
+}
+
+_sessions = {}
+_controllers = {}
+_sessions_pid = None
+_lock = threading.Lock()
+
+# 연결 재사용 통계
+_stats = {"requests": 0, "connections": 0, "cache_hits": 0, "cache_revalidated": 0}
+_shared_stats = None
+_run_hosts = set()  # 통계를 초기화한 뒤 요청한 호스트 (호스트별 상태 출력 대상)
+
+
+def configure_transport(
+    http2=None,
+    rate_limits=None,
+    cache_mode=None,
+    cache_ttl=None,
+    record_path=None,
+    replay_path=None,
+):
+    """
+    전송 설정을 변경합니다. 기존 세션은 닫고 다음 요청부터 새 설정을 사용합니다.
+
+    Args:
+        http2 (bool): True면 httpx/h2 기반 HTTP/2 세션 사용
+        rate_limits (dict): 호스트별 초당 최대 요청 수. 기존 설정에 덮어씀
+        cache_mode (str): 원본 HTML 캐시 모드 ("off", "revalidate", "reuse")
+        cache_ttl (float): 검증자 없이 캐시를 그대로 사용할 시간(초)
+        record_path (str): 모든 HTTP 교환을 기록할 아카이브 경로
+        replay_path (str): 네트워크 대신 응답을 재생할 아카이브 경로
+    """
+    if http2 is not None:
+        _config["http2"] = bool(http2)
+    if rate_limits:
+        _config["rate_limits"] = {**_config["rate_limits"], **rate_limits}
+    if cache_mode is not None:
+        _config["cache_mode"] = cache_mode
+    if cache_ttl is not None:
+        _config["cache_ttl"] = cache_ttl
+    if record_path is not None:
+        _config["record_path"] = record_path
+    if replay_path is not None:
+        _config["replay_path"] = replay_path
+        # fork되는 워커가 인덱스를 물려받도록 미리 만든다
+        archive.load_replay_index(replay_path)
+    close_sessions()
+
+
+def get_transport_config():
+    """
+    현재 전송 설정을 반환합니다.
+
+    Returns:
+        dict: 전송 설정
+    """
+    return dict(_config)
+
+
+def _create_session():
+    if _config["http2"]:
+        import httpx
+
+        limits = httpx.Limits(
+            max_connections=POOL_MAXSIZE, max_keepalive_connections=POOL_MAXSIZE
+        )
+        return httpx.Client(http2=True, limits=limits, follow_redirects=True)
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.connection_count = 0
+    return session
+
+
+def _reset_after_fork():
+    global _sessions_pid
+
+    # fork된 프로세스는 부모의 연결과 컨트롤러 상태를 공유하지 않도록 새로 만든다
+    if _sessions_pid != os.getpid():
+        _sessions.clear()
+        _controllers.clear()
+        _sessions_pid = os.getpid()
+
+
+def get_session(url):
+    """
+    URL의 호스트에 해당하는 세션을 반환합니다. 없으면 새로 만듭니다.
+
+    Args:
+        url (str): 요청할 URL
+
+    Returns:
+        requests.Session or httpx.Client: 호스트 전용 세션
+    """
+    host = urlsplit(url).netloc
+    with _lock:
+        _reset_after_fork()
+
+        session = _sessions.get(host)
+        if session is None:
+            session = _create_session()
+            _sessions[host] = session
+        return session
+
+
+def get_host_controller(url):
+    """
+    URL의 호스트에 해당하는 동시성 컨트롤러를 반환합니다. 없으면 새로 만듭니다.
+
+    Args:
+        url (str): 요청할 URL
+
+    Returns:
+        HostController: 호스트 전용 컨트롤러
+    """
+    host = urlsplit(url).hostname or ""
+    with _lock:
+        _reset_after_fork()
+
+        _run_hosts.add(host)
+        controller = _controllers.get(host)
+        if controller is None:
+            max_rps = 0
+            for domain, limit in _config["rate_limits"].items():
+                if host == domain or host.endswith("." + domain):
+                    max_rps = limit * _config["rate_scale"]
+            controller = HostController(max_rps=max_rps)
+            _controllers[host] = controller
+        return controller
+
+
+def close_sessions():
+    """현재 프로세스의 모든 세션을 닫고 컨트롤러 상태를 초기화합니다."""
+    with _lock:
+        if _sessions_pid == os.getpid():
+            for session in _sessions.values():
+                session.close()
+        _sessions.clear()
+        _controllers.clear()
+
+
+def _count_pool_connections(session):
+    # urllib3 연결 풀은 새로 연 연결 수를 num_connections로 기록한다
+    total = 0
+    for adapter in session.adapters.values():
+        pools = adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is not None:
+                total += pool.num_connections
+    return total
+
+
+def is_replaying():
+    """
+    재생 모드인지 확인합니다.
+
+    Returns:
+        bool: 네트워크 대신 아카이브를 재생하는지 여부
+    """
+    return bool(_config["replay_path"])
+
+
+def is_archived(url):
+    """
+    재생 아카이브에 URL이 기록되어 있는지 확인합니다.
+
+    Args:
+        url (str): 요청할 URL
+
+    Returns:
+        bool: 재생 모드이고 아카이브에 URL이 있으면 True
+    """
+    return is_replaying() and archive.has_url(_config["replay_path"], url)
+
+
+def get_replayed_response(url):
+    """
+    재생 모드면 아카이브에 기록된 응답을 돌려줍니다.
+
+    Args:
+        url (str): 요청할 URL
+
+    Returns:
+        CachedResponse: 기록된 응답 또는 None (재생 모드가 아닌 경우)
+
+    Raises:
+        ArchiveMissError: 재생 모드인데 아카이브에 URL이 없는 경우
+    """
+    if not _config["replay_path"]:
+        return None
+    return archive.replay_response(_config["replay_path"], url)
+
+
+def record_response(url, status_code, headers, content):
+    """
+    기록 모드면 HTTP 교환을 아카이브에 덧붙입니다.
+
+    Args:
+        url (str): 요청한 URL
+        status_code (int): 응답 상태 코드
+        headers (Mapping): 응답 헤더
+        content (bytes): 응답 본문
+    """
+    if _config["record_path"]:
+        archive.record_exchange(
+            _config["record_path"], url, status_code, headers, content
+        )
+
+
+def check_cache(url):
+    """
+    캐시 모드에 따라 네트워크 요청 없이 쓸 수 있는 캐시 응답을 찾습니다.
+
+    Args:
+        url (str): 요청할 URL
+
+    Returns:
+        tuple: (바로 쓸 수 있는 캐시 응답 또는 None, 재검증할 캐시 항목 또는 None)
+    """
+    if _config["cache_mode"] == "off":
+        return None, None
+
+    entry = http_cache.lookup(url)
+    if entry is None:
+        return None, None
+
+    if _config["cache_mode"] == "reuse" or http_cache.is_fresh(
+        entry, _config["cache_ttl"]
+    ):
+        record_transport_stats(cache_hit_count=1)
+        return http_cache.load_response(url, entry), None
+
+    # 검증자가 없으면 재검증할 수 없으므로 새로 받는다
+    if not http_cache.get_conditional_headers(entry):
+        return None, None
+    return None, entry
+
+
+def update_cache(url, entry, status_code, content, headers):
+    """
+    응답을 캐시에 반영합니다. 304 응답이면 캐시된 응답을 돌려줍니다.
+
+    Args:
+        url (str): 요청한 URL
+        entry (dict): check_cache가 돌려준 재검증 대상 캐시 항목
+        status_code (int): 응답 상태 코드
+        content (bytes): 응답 본문
+        headers (Mapping): 응답 헤더
+
+    Returns:
+        CachedResponse: 재검증된 캐시 응답 또는 None
+    """
+    if _config["cache_mode"] == "off":
+        return None
+
+    if entry is not None and status_code == 304:
+        http_cache.touch(url)
+        record_transport_stats(cache_revalidated_count=1)
+        return http_cache.load_response(url, entry)
+
+    if status_code == 200:
+        http_cache.store(url, content, headers)
+    return None
+
+
+def http_get(url, headers=None, timeout=10, **kwargs):
+    """
+    호스트별 keep-alive 세션으로 GET 요청을 보냅니다.
+    재생 모드면 네트워크 대신 아카이브에서 응답을 꺼내고, 캐시 모드가 켜져 있으면
+    원본 HTML 캐시를 먼저 확인하고 재검증합니다. 기록 모드면 응답을 아카이브에 남깁니다.
+
+    Args:
+        url (str): 요청할 URL
+        headers (dict): 요청 헤더
+        timeout (int): 요청 타임아웃(초)
+        **kwargs: 세션의 get에 그대로 전달할 추가 인자
+
+    Returns:
+        requests.Response, httpx.Response or CachedResponse: 응답 객체
+    """
+    replayed_response = get_replayed_response(url)
+    if replayed_response is not None:
+        return replayed_response
+
+    cached_response, entry = check_cache(url)
+    if cached_response is not None:
+        return cached_response
+
+    if entry is not None:
+        headers = {**(headers or {}), **http_cache.get_conditional_headers(entry)}
+
+    response = _controlled_get(url, headers, timeout, **kwargs)
+    record_response(url, response.status_code, response.headers, response.content)
+
+    revalidated = update_cache(
+        url, entry, response.status_code, response.content, response.headers
+    )
+    return revalidated or response
+
+
+def _controlled_get(url, headers, timeout, **kwargs):
+    # 호스트 컨트롤러가 허용할 때까지 기다린 뒤 요청하고, 결과를 컨트롤러에 반영한다
+    controller = get_host_controller(url)
+    controller.acquire()
+    started = time.monotonic()
+
+    try:
+        response = _send_get(url, headers, timeout, **kwargs)
+    except (requests.ConnectionError, requests.Timeout) as e:
+        controller.release(time.monotonic() - started, failed=True)
+        raise e
+    except Exception as e:
+        # httpx 전송 오류도 혼잡 신호로 본다
+        failed = type(e).__module__.startswith("httpx")
+        controller.release(time.monotonic() - started, failed=failed)
+        raise e
+
+    controller.release(
+        time.monotonic() - started,
+        status_code=response.status_code,
+        retry_after=parse_retry_after(response.headers.get("Retry-After")),
+    )
+    return response
+
+
+def _send_get(url, headers, timeout, **kwargs):
+    session = get_session(url)
+
+    if isinstance(session, requests.Session):
+        response = session.get(url, headers=headers, timeout=timeout, **kwargs)
+        with _lock:
+            connections = _count_pool_connections(session)
+            new_connections = connections - session.connection_count
+            session.connection_count = connections
+        record_transport_stats(request_count=1, connection_count=new_connections)
+        return response
+
+    new_connections = []
+
+    def trace(event_name, info):
+        if event_name == "connection.connect_tcp.complete":
+            new_connections.append(event_name)
+
+    response = session.get(
+        url, headers=headers, timeout=timeout, extensions={"trace": trace}, **kwargs
+    )
+    record_transport_stats(request_count=1, connection_count=len(new_connections))
+    return response
+
+
+def record_transport_stats(
+    request_count=0, connection_count=0, cache_hit_count=0, cache_revalidated_count=0
+):
+    """
+    요청 수, 새로 연 연결 수, 캐시 사용 수를 통계에 더합니다.
+
+    Args:
+        request_count (int): 보낸 요청 수
+        connection_count (int): 새로 연 연결 수
+        cache_hit_count (int): 요청 없이 캐시로 응답한 수
+        cache_revalidated_count (int): 304 응답으로 재검증된 수
+    """
+    counts = (
+        ("requests", request_count),
+        ("connections", connection_count),
+        ("cache_hits", cache_hit_count),
+        ("cache_revalidated", cache_revalidated_count),
+    )
+    with _lock:
+        for key, value in counts:
+            _stats[key] += value
+
+    if _shared_stats is not None:
+        for key, value in counts:
+            with _shared_stats[key].get_lock():
+                _shared_stats[key].value += value
+
+
+def create_shared_stats():
+    """
+    워커 프로세스끼리 공유할 통계 카운터를 만듭니다.
+
+    Returns:
+        dict: 프로세스 간 공유 카운터
+    """
+    return {key: multiprocessing.Value("q", 0) for key in _stats}
+
+
+def init_transport_worker(config, shared_stats=None):
+    """
+    멀티프로세싱 워커 초기화 함수. 부모의 전송 설정과 공유 통계를 연결합니다.
+
+    Args:
+        config (dict): 부모 프로세스의 전송 설정
+        shared_stats (dict): create_shared_stats로 만든 공유 카운터
+    """
+    global _shared_stats
+
+    _config.update(config)
+    _shared_stats = shared_stats
+
+
+def merge_transport_stats(shared_stats):
+    """
+    워커 프로세스들의 공유 통계를 현재 프로세스 통계에 합칩니다.
+
+    Args:
+        shared_stats (dict): create_shared_stats로 만든 공유 카운터
+    """
+    with _lock:
+        for key in _stats:
+            _stats[key] += shared_stats[key].value
+
+
+def reset_transport_stats():
+    """
+    연결 재사용 통계를 0으로 되돌립니다. 서비스마다 실행을 시작할 때 호출해
+    한 프로세스에서 여러 서비스를 크롤링해도 보고에 이전 서비스의 요청이 섞이지 않게 합니다.
+    호스트별 동시성 컨트롤러의 상태는 그대로 둡니다.
+    """
+    with _lock:
+        for key in _stats:
+            _stats[key] = 0
+        _run_hosts.clear()
+
+
+def get_transport_stats():
+    """
+    연결 재사용 통계를 반환합니다.
+
+    Returns:
+        dict: 요청 수, 새 연결 수, 재사용된 요청 수, 재사용률, 캐시 적중/재검증 수
+    """
+    with _lock:
+        requests_count = _stats["requests"]
+        connections = _stats["connections"]
+        cache_hits = _stats["cache_hits"]
+        cache_revalidated = _stats["cache_revalidated"]
+
+    reused = max(requests_count - connections, 0)
+    reuse_rate = reused / requests_count if requests_count else 0.0
+    return {
+        "requests": requests_count,
+        "connections": connections,
+        "reused": reused,
+        "reuse_rate": reuse_rate,
+        "cache_hits": cache_hits,
+        "cache_revalidated": cache_revalidated,
+    }
+
+
+def print_transport_stats():
+    """연결 재사용 통계와 현재 프로세스의 호스트별 동시성 상태를 출력합니다."""
+    stats = get_transport_stats()
+    if stats["cache_hits"] or stats["cache_revalidated"]:
+        print(
+            f"HTML 캐시 적중 {stats['cache_hits']}건, "
+            f"재검증(304) {stats['cache_revalidated']}건"
+        )
+    if not stats["requests"]:
+        return
+
+    print(
+        f"HTTP 요청 {stats['requests']}건, 새 연결 {stats['connections']}개 "
+        f"(연결 재사용률: {stats['reuse_rate'] * 100:.1f}%)"
+    )
+
+    with _lock:
+        controllers = [
+            (host, controller)
+            for host, controller in _controllers.items()
+            if host in _run_hosts
+        ]
+    for host, controller in controllers:
+        host_stats = controller.get_stats()
+        srtt = host_stats["srtt"] or 0.0
+        print(
+            f"  {host}: 동시 요청 {host_stats['window']}, 백오프 {host_stats['backoffs']}회, "
+            f"평균 응답 {srtt:.2f}초, 초당 상한 {host_stats['max_rps'] or '없음'}"
+        )
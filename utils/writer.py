@@ -0,0 +1,76 @@
+"""
+백그라운드 업로드 작업자 유틸리티
+
+크롤링 쪽은 업로드할 행 묶음을 크기가 제한된 큐에 넣기만 하고, 작업자 스레드 하나가
+큐에서 꺼내 Supabase에 업로드합니다. 크롤링과 업로드가 겹쳐 진행되므로 전체 실행 시간은
+(크롤링 + 업로드) 대신 둘 중 긴 쪽에 가까워지고, DB가 뒤처져 큐가 가득 찼을 때만
+크롤링 쪽이 기다립니다(배압).
+"""
+
+import time
+import queue
+import threading
+
+MAX_PENDING_BATCHES = 2  # 업로드를 기다릴 수 있는 최대 행 묶음 수
+
+_CLOSE = object()
+
+
+class BackgroundWriter:
+    """
+    행 묶음을 받아 별도 스레드에서 업로드하는 작업자.
+
+    Args:
+        write_rows (function): 행 목록 하나를 받아 업로드하고 성공 여부(bool)를 반환하는 함수
+        max_pending (int): 큐에 쌓아 둘 수 있는 최대 행 묶음 수. 가득 차면 put이 기다림
+        name (str): 작업자 스레드 이름
+    """
+
+    def __init__(
+        self, write_rows, max_pending=MAX_PENDING_BATCHES, name="background-writer"
+    ):
+        self.write_rows = write_rows
+        self.queue = queue.Queue(maxsize=max(1, max_pending))
+        self.success = True
+        self.blocked_seconds = 0.0
+        self.thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        while True:
+            rows = self.queue.get()
+            if rows is _CLOSE:
+                return
+            try:
+                if not self.write_rows(rows):
+                    self.success = False
+            except Exception as e:
+                print(f"백그라운드 업로드 중 오류 발생: {str(e)}")
+                self.success = False
+
+    def put(self, rows):
+        """
+        업로드할 행 묶음을 큐에 넣습니다. 큐가 가득 차 있으면 자리가 날 때까지 기다립니다.
+
+        Args:
+            rows (list): 업로드할 행 목록
+        """
+        try:
+            self.queue.put_nowait(rows)
+        except queue.Full:
+            started = time.monotonic()
+            self.queue.put(rows)
+            self.blocked_seconds += time.monotonic() - started
+
+    def close(self):
+        """
+        큐에 남은 행 묶음을 모두 업로드할 때까지 기다린 뒤 작업자를 종료합니다.
+
+        Returns:
+            bool: 모든 업로드가 성공했으면 True
+        """
+        self.queue.put(_CLOSE)
+        self.thread.join()
+        if self.blocked_seconds >= 0.1:
+            print(f"업로드가 뒤처져 크롤링이 기다린 시간: {self.blocked_seconds:.1f}초")
+        return self.success